@@ -1,8 +1,14 @@
-from fastapi import FastAPI, HTTPException, Query, Path
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Path, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from typing import List, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import json
+import os
+import secrets
 import sys
 from pathlib import Path as PathLib
 
@@ -10,6 +16,8 @@ sys.path.insert(0, str(PathLib(__file__).parent.parent))
 
 from database.db import Database
 from models.internship import Internship
+from services import export_service, webhook_service
+from utils import gazetteer, metrics
 
 # Initializing FastAPI
 app = FastAPI(
@@ -23,6 +31,16 @@ app = FastAPI(
 # Database instance
 db = Database()
 
+# /internships/stream: change log poll interval, keepalive comment interval (seconds),
+# entries read per poll, and the reconnect delay suggested to EventSource clients (ms)
+STREAM_POLL_SECONDS = 1.0
+STREAM_KEEPALIVE_SECONDS = 15.0
+STREAM_BATCH_SIZE = 100
+STREAM_RETRY_MS = 3000
+
+# Bearer token guarding the write endpoints (webhook registration)
+ADMIN_TOKEN_ENV = "CRAWLER_ADMIN_TOKEN"
+
 # Pydantic models for request/response
 class InternshipResponse(BaseModel):
     id: Optional[int] = None
@@ -31,10 +49,13 @@ class InternshipResponse(BaseModel):
     location: Optional[str] = None
     url: str
     posted_date: str
-    description: str
+    description: Optional[str] = None
     requirements: List[str] = []
     created_at: str
     notified: bool = False
+    last_seen_at: Optional[str] = None
+    closed_at: Optional[str] = None
+    canonical_id: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -44,18 +65,94 @@ class InternshipsListResponse(BaseModel):
     internships: List[InternshipResponse]
     filters: dict = {}
 
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class FacetsResponse(BaseModel):
+    total: int
+    companies: List[FacetCount]
+    countries: List[FacetCount]
+    weeks: List[FacetCount]
+    filters: dict = {}
+
+class WebhookCreate(BaseModel):
+    url: str
+    secret: Optional[str] = None
+    companies: List[str] = []
+    country: Optional[str] = None
+
+class WebhookResponse(BaseModel):
+    id: int
+    url: str
+    secret: str
+    companies: List[str] = []
+    country_code: Optional[str] = None
+    created_at: str
+
+class ScraperPerformance(BaseModel):
+    scraper: str
+    runs: int
+    p50_seconds: Optional[float] = None
+    p90_seconds: Optional[float] = None
+    p95_seconds: Optional[float] = None
+    p99_seconds: Optional[float] = None
+    max_seconds: Optional[float] = None
+    avg_items_seen: Optional[float] = None
+    avg_items_new: Optional[float] = None
+    errors: int = 0
+    error_rate: float = 0.0
+    avg_bytes_fetched: Optional[float] = None
+
+class ScraperDailyTrend(BaseModel):
+    scraper: str
+    day: str
+    runs: int
+    avg_seconds: Optional[float] = None
+    items_seen: int = 0
+    items_new: int = 0
+    errors: int = 0
+
+class ScraperPerformanceResponse(BaseModel):
+    days: int
+    scrapers: List[ScraperPerformance]
+    trend: List[ScraperDailyTrend]
+
+def _to_response(internship: Internship) -> InternshipResponse:
+    return InternshipResponse(
+        id=internship.id,
+        company=internship.company,
+        title=internship.title,
+        location=internship.location,
+        url=internship.url,
+        posted_date=internship.posted_date.isoformat(),
+        description=internship.description,
+        requirements=internship.requirements,
+        created_at=internship.created_at.isoformat(),
+        notified=internship.notified,
+        last_seen_at=internship.last_seen_at.isoformat() if internship.last_seen_at else None,
+        closed_at=internship.closed_at.isoformat() if internship.closed_at else None,
+        canonical_id=internship.canonical_id
+    )
+
 # Endpoints
 @app.get("/internships", response_model=InternshipsListResponse)
 def get_internships(
-    country: Optional[str] = Query(None, description="Filter by country/location"),
-    posted_date: Optional[str] = Query(None, description="Filter by date range: 'past_hour', 'past_week', or 'past_month'")
+    country: Optional[str] = Query(None, description="Filter by country (name, alias or ISO code) or location text"),
+    posted_date: Optional[str] = Query(None, description="Filter by date range: 'past_hour', 'past_week', or 'past_month'"),
+    include_closed: bool = Query(False, description="Also return postings that are no longer listed"),
+    include_archived: bool = Query(False, description="Also search postings moved to the archive"),
+    include_description: bool = Query(True, description="Include descriptions (null otherwise; fetch one via /internships/{id})")
 ):
     """
     Get all internships with optional filtering by country and date range.
     
     Query Parameters:
-    - country: Filter by location/country (case-insensitive)
+    - country: Filter by country name, alias or ISO code (e.g. "USA", "uk"); other text matches the location
     - posted_date: Filter by date range ('past_hour', 'past_week', 'past_month')
+    - include_closed: Include closed postings (default: open postings only)
+    - include_archived: Include archived postings (slower; reads the archive table)
+    - include_description: Set to false for lighter listings; descriptions are then null
     
     Returns sorted list of internships in JSON format.
     """
@@ -69,24 +166,12 @@ def get_internships(
         )
     
     # Get filtered internships from database
-    internships = db.get_internships_with_filters(country=country, date_filter=posted_date)
+    internships = db.get_internships_with_filters(country=country, date_filter=posted_date,
+                                                  include_closed=include_closed, include_archived=include_archived,
+                                                  include_description=include_description)
     
     # Convert to response format
-    internship_responses = [
-        InternshipResponse(
-            id=internship.id,
-            company=internship.company,
-            title=internship.title,
-            location=internship.location,
-            url=internship.url,
-            posted_date=internship.posted_date.isoformat(),
-            description=internship.description,
-            requirements=internship.requirements,
-            created_at=internship.created_at.isoformat(),
-            notified=internship.notified
-        )
-        for internship in internships
-    ]
+    internship_responses = [_to_response(internship) for internship in internships]
     
     # Build filters info for response
     filters = {}
@@ -94,9 +179,231 @@ def get_internships(
         filters['country'] = country
     if posted_date:
         filters['posted_date'] = posted_date
+    if include_closed:
+        filters['include_closed'] = True
+    if include_archived:
+        filters['include_archived'] = True
+    if not include_description:
+        filters['include_description'] = False
     
     return InternshipsListResponse(
         total=len(internship_responses),
         internships=internship_responses,
         filters=filters
     )
+
+
+@app.get("/internships/export")
+def export_internships(
+    format: str = Query("ndjson", description="Output format: 'csv' or 'ndjson'"),
+    compression: str = Query("none", description="Compression: 'none', 'gzip' or 'zstd' (if installed)"),
+    since: Optional[int] = Query(None, ge=0, description="Only postings added or changed after this revision (the previous watermark)"),
+    include_closed: bool = Query(True, description="Include postings that are no longer listed"),
+    include_archived: bool = Query(False, description="Include archived postings")
+):
+    """
+    Stream the internships table for analytics, straight from a database cursor.
+    
+    Memory use is constant regardless of export size. For incremental pulls, pass the
+    `X-Export-Watermark` response header of the previous export as `since`.
+    """
+    if format not in export_service.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Must be one of: {', '.join(export_service.FORMATS)}")
+    if compression not in export_service.available_compressions():
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid compression. Must be one of: {', '.join(export_service.available_compressions())}"
+        )
+    
+    # Fix the upper bound before streaming so rows written meanwhile go to the next pull
+    watermark = db.get_export_watermark()
+    rows = db.iter_internships(since=since, until=watermark, include_closed=include_closed,
+                               include_archived=include_archived)
+    headers = {
+        'Content-Disposition': f'attachment; filename="{export_service.export_filename(format, compression)}"',
+        'X-Export-Watermark': str(watermark)
+    }
+    
+    return StreamingResponse(
+        export_service.export_internships(rows, format, compression),
+        media_type=export_service.media_type(format, compression),
+        headers=headers
+    )
+
+
+@app.get("/internships/facets", response_model=FacetsResponse)
+def get_internship_facets(
+    country: Optional[str] = Query(None, description="Filter by country (name, alias or ISO code) or location text"),
+    posted_date: Optional[str] = Query(None, description="Filter by date range: 'past_hour', 'past_week', or 'past_month'"),
+    include_closed: bool = Query(False, description="Also count postings that are no longer listed"),
+    include_archived: bool = Query(False, description="Also count postings moved to the archive")
+):
+    """
+    Posting counts by company, country and week (the Monday it starts), with the same
+    filters as /internships.
+    
+    Served from incrementally maintained summary rows rather than by grouping every
+    posting. A posting listed in several countries counts once per country.
+    """
+    valid_date_filters = ['past_hour', 'past_week', 'past_month']
+    if posted_date and posted_date not in valid_date_filters:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid posted_date filter. Must be one of: {', '.join(valid_date_filters)}"
+        )
+    
+    facets = db.get_facets(country=country, date_filter=posted_date,
+                           include_closed=include_closed, include_archived=include_archived)
+    
+    filters = {}
+    if country:
+        filters['country'] = country
+    if posted_date:
+        filters['posted_date'] = posted_date
+    if include_closed:
+        filters['include_closed'] = True
+    if include_archived:
+        filters['include_archived'] = True
+    
+    return FacetsResponse(filters=filters, **facets)
+
+
+@app.get("/internships/stream")
+async def stream_internships(
+    request: Request,
+    country: Optional[str] = Query(None, description="Only postings in this country (name, alias or ISO code) or location text"),
+    last_event_id: Optional[str] = Header(None, description="Resume after this event id (sent by EventSource on reconnect)")
+):
+    """
+    Server-Sent Events feed of newly persisted internships.
+    
+    Each event is an `internship` with the posting as JSON and its change log id as the
+    event id. Without `Last-Event-ID` the feed starts at the newest posting; with it,
+    everything logged since that id is sent first. The change log keeps 7 days.
+    """
+    if last_event_id is not None and not last_event_id.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    
+    country_code = gazetteer.country_code(country) if country else None
+    
+    def matches(internship: Internship) -> bool:
+        if not country:
+            return True
+        if country_code:
+            return country_code in gazetteer.location_countries(internship.location)
+        return country.lower() in (internship.location or '').lower()
+    
+    async def events():
+        last_id = int(last_event_id) if last_event_id is not None else await run_in_threadpool(db.get_latest_change_id)
+        idle = 0.0
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+        
+        # Every instance tails the same table from its own high-water mark, so API
+        # processes need no coordination with the crawler or each other
+        while not await request.is_disconnected():
+            changes = await run_in_threadpool(db.get_changes, last_id, STREAM_BATCH_SIZE)
+            for event_id, internship in changes:
+                last_id = event_id
+                if matches(internship):
+                    yield f"id: {event_id}\nevent: internship\ndata: {_to_response(internship).model_dump_json()}\n\n"
+            if changes:
+                idle = 0.0
+                continue
+            
+            if idle >= STREAM_KEEPALIVE_SECONDS:
+                # Comment line: keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                idle = 0.0
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+            idle += STREAM_POLL_SECONDS
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+# Registered after the fixed /internships/... routes, which it would otherwise shadow
+@app.get("/internships/{internship_id}", response_model=InternshipResponse)
+def get_internship(internship_id: int = Path(..., description="Internship id")):
+    """
+    Get a single internship, including its description, whether open, closed or archived.
+    """
+    internship = db.get_internship(internship_id)
+    if internship is None:
+        raise HTTPException(status_code=404, detail="Internship not found")
+    return _to_response(internship)
+
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    """Bearer token check for the write endpoints; they stay disabled until CRAWLER_ADMIN_TOKEN is set"""
+    token = os.environ.get(ADMIN_TOKEN_ENV)
+    if not token:
+        raise HTTPException(status_code=503, detail=f"Set {ADMIN_TOKEN_ENV} to enable this endpoint")
+    scheme, _, supplied = (authorization or '').partition(' ')
+    if scheme.lower() != 'bearer' or not secrets.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+        raise HTTPException(status_code=401, detail="Invalid admin token", headers={'WWW-Authenticate': 'Bearer'})
+
+
+@app.post("/webhooks", response_model=WebhookResponse, status_code=201, dependencies=[Depends(require_admin)])
+def create_webhook(webhook: WebhookCreate):
+    """
+    Register an endpoint to receive new postings as batched JSON POSTs.
+    
+    Filters are optional: `companies` (names, case-insensitive) and `country` (name, alias or ISO
+    code). Each request is signed with the `secret` (generated if omitted): the
+    `X-Crawler-Signature` header is `sha256=` + HMAC-SHA256 of
+    `"<X-Crawler-Timestamp>.<body>"`. The secret is only returned here.
+    
+    Requires `Authorization: Bearer <CRAWLER_ADMIN_TOKEN>`. The url must resolve to public
+    addresses only (see CRAWLER_WEBHOOK_ALLOW_PRIVATE).
+    """
+    problem = webhook_service.url_problem(webhook.url)
+    if problem:
+        raise HTTPException(status_code=400, detail=problem)
+    
+    country_code = None
+    if webhook.country:
+        country_code = gazetteer.country_code(webhook.country)
+        if country_code is None:
+            raise HTTPException(status_code=400, detail=f"Unknown country: {webhook.country}")
+    
+    created = db.add_webhook(webhook.url, webhook.secret or secrets.token_hex(32),
+                             companies=webhook.companies, country_code=country_code)
+    return WebhookResponse(**dict(created, created_at=created['created_at'].isoformat()))
+
+
+@app.delete("/webhooks/{webhook_id}", status_code=204, dependencies=[Depends(require_admin)])
+def delete_webhook(webhook_id: int = Path(..., description="Id returned when the webhook was registered")):
+    """Stop delivering to a webhook (admin token required)"""
+    if not db.delete_webhook(webhook_id):
+        raise HTTPException(status_code=404, detail="Webhook not found")
+
+
+@app.get("/crawl-runs/performance", response_model=ScraperPerformanceResponse)
+def get_crawl_performance(
+    days: int = Query(30, ge=1, le=365, description="Look-back window in days")
+):
+    """
+    Per-scraper latency percentiles (p50/p90/p95/p99), error rate and daily yield from the crawl history.
+    
+    Use this to spot a scraper whose runtime or yield changed after a site update.
+    """
+    performance = db.get_scraper_performance(days=days)
+    return ScraperPerformanceResponse(days=days, **performance)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Prometheus metrics: this API process's database timings plus the
+    per-stage summary of the last completed crawl.
+    """
+    body = metrics.registry.render_prometheus()
+
+    summary_path = os.environ.get("CRAWL_METRICS_PATH", "crawl_metrics.json")
+    try:
+        with open(summary_path, encoding='utf-8') as f:
+            body += metrics.render_run_summary(json.load(f))
+    except (OSError, ValueError):
+        pass
+
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
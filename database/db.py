@@ -1,7 +1,98 @@
+import json
 import sqlite3
-from typing import List, Optional, Dict
+from typing import Dict, Iterator, List, Optional, Tuple
 from models.internship import Internship
 from datetime import datetime, timedelta
+from utils.dates import normalize_datetime, parse_date, utc_now
+from utils import gazetteer, simhash
+from utils.metrics import db_timed
+from utils.text_codec import MIN_COMPRESS_CHARS, TextCodec, train_dictionary
+
+# Columns shared by the hot and archive tables, in _row_to_internship order
+INTERNSHIP_COLUMNS = (
+    "id, company, title, location, url, posted_date, description, requirements, "
+    "created_at, notified, last_seen_at, closed_at, signature, canonical_id"
+)
+
+# Retention: closed postings and postings no scraper has listed for a while move to
+# internships_archive, keeping the hot table and its indexes small
+# Stored in PRAGMA user_version; bumped when posting_signature changes, so existing rows
+# are signed and grouped again
+SIGNATURE_VERSION = 1
+
+ARCHIVE_CLOSED_AFTER_DAYS = 30
+ARCHIVE_UNSEEN_AFTER_DAYS = 90
+ARCHIVE_BATCH_SIZE = 500
+# Change log entries older than this are dropped by run_maintenance; SSE clients that
+# were away longer resume from the oldest entry left
+CHANGE_LOG_RETENTION_DAYS = 7
+
+# Facet counts are kept per (company, country, posted day, state); this country_code
+# row counts every posting once, whatever its countries
+ALL_COUNTRIES = '*'
+_FACET_STATE = "CASE WHEN closed_at IS NULL THEN 'open' ELSE 'closed' END"
+# Archived rows keep their own states: postings archived unseen but never closed still
+# count as open, and so are listed without include_closed
+_ARCHIVE_FACET_STATE = "CASE WHEN closed_at IS NULL THEN 'archived' ELSE 'archived_closed' END"
+
+# Descriptions are stored compressed (see utils.text_codec). run_maintenance trains the
+# shared dictionary once this many descriptions exist, from the newest DICTIONARY_SAMPLES
+DICTIONARY_MIN_SAMPLES = 100
+DICTIONARY_SAMPLES = 2000
+COMPRESS_BATCH_SIZE = 500
+
+
+def _encode_requirements(requirements: List[str]) -> Optional[str]:
+    # JSON list: requirements keep their commas and line breaks
+    return json.dumps(requirements, ensure_ascii=False) if requirements else None
+
+
+def _decode_requirements(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    if value.startswith('['):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    # Older rows: one requirement per newline-terminated line, or comma-separated
+    return value.rstrip('\n').split('\n') if '\n' in value else value.split(',')
+
+
+def _internship_columns(include_description: bool = True) -> str:
+    # A NULL description keeps the column order of _row_to_internship
+    return INTERNSHIP_COLUMNS if include_description else INTERNSHIP_COLUMNS.replace("description", "NULL AS description")
+
+
+def _date_cutoff(date_filter: Optional[str]) -> Optional[datetime]:
+    """Earliest posted_date matched by a date filter ('past_hour', 'past_week', 'past_month')"""
+    now = utc_now()
+    if date_filter == 'past_hour':
+        return now - timedelta(hours=1)
+    if date_filter == 'past_week':
+        return now - timedelta(weeks=1)
+    if date_filter == 'past_month':
+        return now - timedelta(days=30)
+    return None
+
+
+def _facet_counts(rows, key) -> List[Dict]:
+    counts: Dict[str, int] = {}
+    for row in rows:
+        value = key(row)
+        if value:
+            counts[value] = counts.get(value, 0) + row[3]
+    facets = [{'value': value, 'count': count} for value, count in counts.items() if count > 0]
+    return sorted(facets, key=lambda facet: (-facet['count'], facet['value']))
+
+
+def _week(day: str) -> Optional[str]:
+    # Monday of the posting's ISO week
+    if not day:
+        return None
+    date = datetime.strptime(day, '%Y-%m-%d').date()
+    return (date - timedelta(days=date.weekday())).isoformat()
+
 
 class Database:
     def __init__(self, db_path: str = "internships.db"):
@@ -13,6 +104,11 @@ class Database:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        # auto_vacuum can only be chosen before the first table exists; older databases
+        # are converted once by run_maintenance
+        if not cursor.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS internships (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -37,41 +133,613 @@ class Database:
             )
         """)
         
+        # Webhook subscriptions; companies is a JSON list, empty/NULL filters match everything
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS webhooks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                secret TEXT NOT NULL,
+                companies TEXT,
+                country_code TEXT,
+                created_at TEXT NOT NULL
+            )
+        """)
+        
+        # Batches a webhook did not accept, redelivered with the next notification round
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS webhook_failures (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                webhook_id INTEGER NOT NULL,
+                internship_ids TEXT NOT NULL,
+                error TEXT,
+                rounds INTEGER NOT NULL DEFAULT 1,
+                failed_at TEXT NOT NULL
+            )
+        """)
+        
+        # Preset dictionaries for compressed descriptions; values name the id they used
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS text_dictionaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                data BLOB NOT NULL,
+                samples INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """)
+        self._load_text_codec(cursor)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                duration_seconds REAL,
+                items_seen INTEGER DEFAULT 0,
+                items_new INTEGER DEFAULT 0,
+                errors INTEGER DEFAULT 0,
+                bytes_fetched INTEGER DEFAULT 0
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scraper_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                crawl_run_id INTEGER REFERENCES crawl_runs(id),
+                scraper TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                duration_seconds REAL,
+                items_seen INTEGER DEFAULT 0,
+                items_new INTEGER DEFAULT 0,
+                errors INTEGER DEFAULT 0,
+                bytes_fetched INTEGER DEFAULT 0
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scraper_runs_scraper_started
+            ON scraper_runs (scraper, started_at)
+        """)
+        
+        # Circuit breaker state per scraper, kept across runs (see services.scraper_health)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scraper_health (
+                scraper TEXT PRIMARY KEY,
+                state TEXT NOT NULL DEFAULT 'closed',
+                consecutive_failures INTEGER DEFAULT 0,
+                opened_at TEXT,
+                last_error TEXT,
+                updated_at TEXT
+            )
+        """)
+        
+        # Recent request/navigation latencies per scraper, for adaptive timeouts
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scraper_latencies (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scraper TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                seconds REAL NOT NULL
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scraper_latencies_scraper_kind
+            ON scraper_latencies (scraper, kind, id)
+        """)
+        
+        # Near-duplicate index: each row's SimHash split into bands (see utils.simhash)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS internship_signatures (
+                internship_id INTEGER NOT NULL REFERENCES internships(id),
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_internship_signatures_band_bucket
+            ON internship_signatures (band, bucket)
+        """)
+        
+        self._migrate_internships(cursor)
+        
+        # Same columns as internships, plus when the row was moved
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS internships_archive (
+                id INTEGER PRIMARY KEY,
+                company TEXT NOT NULL,
+                title TEXT NOT NULL,
+                location TEXT,
+                url TEXT UNIQUE NOT NULL,
+                posted_date TEXT,
+                description TEXT,
+                requirements TEXT,
+                created_at TEXT,
+                notified BOOLEAN DEFAULT 0,
+                last_seen_at TEXT,
+                closed_at TEXT,
+                signature INTEGER,
+                canonical_id INTEGER,
+                archived_at TEXT NOT NULL,
+                revision INTEGER
+            )
+        """)
+        
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < SIGNATURE_VERSION:
+            self._resign_postings(cursor)
+            cursor.execute(f"PRAGMA user_version = {SIGNATURE_VERSION}")
+        
+        # Country index: one row per (ISO country, posting), resolved from the location
+        # text by utils.gazetteer at insert time. Ids are stable across archiving, so
+        # rows stay put when a posting moves to or from the archive.
+        has_locations = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'internship_locations'"
+        ).fetchone()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS internship_locations (
+                country_code TEXT NOT NULL,
+                internship_id INTEGER NOT NULL,
+                PRIMARY KEY (country_code, internship_id)
+            ) WITHOUT ROWID
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_internship_locations_internship
+            ON internship_locations (internship_id)
+        """)
+        
+        if not has_locations:
+            self._backfill_locations(cursor)
+        
+        # Facet counts maintained on every write that adds, moves, closes or reopens a
+        # posting, so /internships/facets reads a few summary rows instead of the table
+        has_facets = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'internship_facets'"
+        ).fetchone()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS internship_facets (
+                company TEXT NOT NULL,
+                country_code TEXT NOT NULL,
+                day TEXT NOT NULL,
+                state TEXT NOT NULL,
+                postings INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (company, country_code, day, state)
+            ) WITHOUT ROWID
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_internship_facets_country_day
+            ON internship_facets (country_code, day)
+        """)
+        
+        if not has_facets:
+            self._update_facets(cursor, "internships", "1=1", [], 1)
+            self._update_facets(cursor, "internships_archive", "1=1", [], 1)
+        elif not cursor.execute("SELECT 1 FROM internship_facets WHERE state = 'archived_closed' LIMIT 1").fetchone() \
+                and cursor.execute("SELECT 1 FROM internships_archive WHERE closed_at IS NOT NULL LIMIT 1").fetchone():
+            # Archive counts used to be kept under one state; split them by closed_at
+            cursor.execute("DELETE FROM internship_facets WHERE state = 'archived'")
+            self._update_facets(cursor, "internships_archive", "1=1", [], 1)
+        
+        # Facet queries count the first day of a date filter exactly from these
+        for table in ("internships", "internships_archive"):
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{table}_posted_day
+                ON {table} (date(posted_date))
+            """)
+        
+        # Change log of new postings, tailed by the API's /internships/stream. The trigger
+        # fires for rows with a fresh AUTOINCREMENT id only: sqlite_sequence still holds
+        # the previous high-water mark while AFTER INSERT triggers run, and postings
+        # restored from the archive keep their old, lower id
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS internship_changes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                internship_id INTEGER NOT NULL,
+                change TEXT NOT NULL,
+                changed_at TEXT NOT NULL
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_internships_change_log
+            AFTER INSERT ON internships
+            WHEN NEW.id > COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'internships'), 0)
+            BEGIN
+                INSERT INTO internship_changes (internship_id, change, changed_at)
+                VALUES (NEW.id, 'created', strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+            END
+        """)
+        
+        # Export revision: a counter bumped by triggers whenever a posting is inserted or an
+        # exported field changes (last_seen_at aside, as every crawl moves it). SQLite has
+        # one writer at a time, so revisions follow commit order, unlike created_at, which
+        # is set when a posting is normalized; incremental exports page on it
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS internship_revision (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                value INTEGER NOT NULL
+            )
+        """)
+        
+        for table in ("internships", "internships_archive"):
+            if 'revision' not in {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN revision INTEGER")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_revision ON {table} (revision)")
+        cursor.execute("DROP INDEX IF EXISTS idx_internships_created_at")
+        
+        if not cursor.execute("SELECT 1 FROM internship_revision").fetchone():
+            self._backfill_revisions(cursor)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_internships_revision_insert
+            AFTER INSERT ON internships
+            BEGIN
+                UPDATE internship_revision SET value = value + 1;
+                UPDATE internships SET revision = (SELECT value FROM internship_revision) WHERE id = NEW.id;
+            END
+        """)
+        
+        # Enrichment sets requirements along with description; compression, which only
+        # rewrites description, is not a change
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_internships_revision_update
+            AFTER UPDATE OF title, location, requirements, notified, closed_at, canonical_id ON internships
+            BEGIN
+                UPDATE internship_revision SET value = value + 1;
+                UPDATE internships SET revision = (SELECT value FROM internship_revision) WHERE id = NEW.id;
+            END
+        """)
+        
+        # Open postings per company: the working set for crawl diffs and API reads
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_internships_open_company
+            ON internships (company) WHERE closed_at IS NULL
+        """)
+        
         conn.commit()
         conn.close()
     
+    def _load_text_codec(self, cursor: sqlite3.Cursor):
+        self.text_codec = TextCodec(dict(cursor.execute("SELECT id, data FROM text_dictionaries").fetchall()))
+    
+    def _decode_text(self, value) -> Optional[str]:
+        try:
+            return self.text_codec.decode(value)
+        except KeyError:
+            # Written with a dictionary trained by another process since this one loaded
+            conn = sqlite3.connect(self.db_path)
+            try:
+                self._load_text_codec(conn.cursor())
+            finally:
+                conn.close()
+            return self.text_codec.decode(value)
+    
+    def _migrate_internships(self, cursor: sqlite3.Cursor):
+        """Add lifecycle columns to databases created before they existed"""
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(internships)")}
+        
+        if 'last_seen_at' not in columns:
+            cursor.execute("ALTER TABLE internships ADD COLUMN last_seen_at TEXT")
+            cursor.execute("UPDATE internships SET last_seen_at = created_at")
+        if 'closed_at' not in columns:
+            cursor.execute("ALTER TABLE internships ADD COLUMN closed_at TEXT")
+        if 'signature' not in columns:
+            cursor.execute("ALTER TABLE internships ADD COLUMN signature INTEGER")
+            cursor.execute("ALTER TABLE internships ADD COLUMN canonical_id INTEGER")
+            self._backfill_signatures(cursor)
+    
+    def _backfill_signatures(self, cursor: sqlite3.Cursor, batch_size: int = 1000):
+        """Sign and group existing rows, oldest first, so the earliest posting is canonical"""
+        last_id = 0
+        while True:
+            rows = cursor.execute("""
+                SELECT id, company, title FROM internships
+                WHERE id > ? ORDER BY id LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            for internship_id, company, title in rows:
+                self._link_signature(cursor, internship_id, company, simhash.posting_signature(title))
+            last_id = rows[-1][0]
+    
+    def _resign_postings(self, cursor: sqlite3.Cursor):
+        """Recompute every signature and regroup near-duplicates after posting_signature changed"""
+        cursor.execute("DELETE FROM internship_signatures")
+        cursor.execute("UPDATE internships SET canonical_id = NULL")
+        self._backfill_signatures(cursor)
+        archived = cursor.execute("SELECT id, title FROM internships_archive").fetchall()
+        cursor.executemany(
+            "UPDATE internships_archive SET signature = ? WHERE id = ?",
+            [(simhash.to_signed(simhash.posting_signature(title)), internship_id) for internship_id, title in archived]
+        )
+    
+    def _backfill_revisions(self, cursor: sqlite3.Cursor):
+        """Number rows stored before export revisions existed in created_at order"""
+        cursor.execute("""
+            CREATE TEMP TABLE numbered_postings AS
+            SELECT id, ROW_NUMBER() OVER (ORDER BY created_at, id) AS revision
+            FROM (SELECT id, created_at FROM internships UNION ALL SELECT id, created_at FROM internships_archive)
+        """)
+        for table in ("internships", "internships_archive"):
+            cursor.execute(f"""
+                UPDATE {table} SET revision = n.revision
+                FROM numbered_postings n
+                WHERE n.id = {table}.id
+            """)
+        cursor.execute("INSERT INTO internship_revision (id, value) SELECT 1, COUNT(*) FROM numbered_postings")
+        cursor.execute("DROP TABLE numbered_postings")
+    
+    def _backfill_locations(self, cursor: sqlite3.Cursor):
+        """Index the countries of rows stored before internship_locations existed"""
+        rows = cursor.execute("""
+            SELECT id, location FROM internships
+            UNION ALL
+            SELECT id, location FROM internships_archive
+        """).fetchall()
+        for internship_id, location in rows:
+            self._index_locations(cursor, internship_id, location)
+    
+    def _index_locations(self, cursor: sqlite3.Cursor, internship_id: int, location: Optional[str]):
+        """(Re)write a posting's rows in internship_locations from its location text"""
+        cursor.execute("DELETE FROM internship_locations WHERE internship_id = ?", (internship_id,))
+        cursor.executemany(
+            "INSERT OR IGNORE INTO internship_locations (country_code, internship_id) VALUES (?, ?)",
+            [(code, internship_id) for code in gazetteer.location_countries(location)]
+        )
+    
+    def _facet_rows_sql(self, table: str, condition: str, state_sql: str) -> str:
+        """Rows of (company, country_code, day, state, n) for the matching postings;
+        `condition` appears twice, so its parameters must be passed twice"""
+        return f"""
+            SELECT company, '{ALL_COUNTRIES}' AS country_code, COALESCE(date(posted_date), '') AS day,
+                   {state_sql} AS state, COUNT(*) AS n
+            FROM {table} WHERE {condition}
+            GROUP BY 1, 3, 4
+            UNION ALL
+            SELECT company, internship_locations.country_code, COALESCE(date(posted_date), ''), {state_sql}, COUNT(*)
+            FROM {table} JOIN internship_locations ON internship_locations.internship_id = {table}.id
+            WHERE {condition}
+            GROUP BY 1, 2, 3, 4
+        """
+    
+    def _update_facets(self, cursor: sqlite3.Cursor, table: str, condition: str, params: list, sign: int,
+                       state: Optional[str] = None):
+        """Add (sign=1) or remove (sign=-1) the matching postings from internship_facets
+        
+        Call with sign=-1 before a write changes a posting's state, location or table,
+        and with sign=1 after. `state` overrides the state derived from closed_at.
+        """
+        if state:
+            state_sql = f"'{state}'"
+        else:
+            state_sql = _ARCHIVE_FACET_STATE if table == "internships_archive" else _FACET_STATE
+        cursor.execute(f"""
+            INSERT INTO internship_facets (company, country_code, day, state, postings)
+            SELECT company, country_code, day, state, n * ?
+            FROM ({self._facet_rows_sql(table, condition, state_sql)})
+            WHERE true
+            ON CONFLICT (company, country_code, day, state) DO UPDATE SET postings = postings + excluded.postings
+        """, [sign] + list(params) * 2)
+    
+    @db_timed("save_internship")
     def save_internship(self, internship: Internship) -> Optional[int]:
         """Save new internship if it doesn't exist"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
         try:
-            cursor.execute("""
-                INSERT INTO internships 
-                (company, title, location, url, posted_date, description, requirements, created_at, notified)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                internship.company,
-                internship.title,
-                internship.location,
-                internship.url,
-                internship.posted_date.isoformat(),
-                internship.description,
-                ','.join(internship.requirements),
-                internship.created_at.isoformat(),
-                internship.notified
-            ))
+            internship_id = self._insert_internship(cursor, internship)
+            conn.commit()
+            return internship_id
+        
+        finally:
+            conn.close()
+    
+    @db_timed("save_internships")
+    def save_internships(self, internships: List[Internship]) -> List[Internship]:
+        """Save a batch of internships in one transaction
+        
+        Returns:
+            The internships that were new, with their ids set; existing URLs are skipped
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            new_internships = []
+            for internship in internships:
+                internship_id = self._insert_internship(cursor, internship)
+                if internship_id:
+                    internship.id = internship_id
+                    new_internships.append(internship)
             
             conn.commit()
-            return cursor.lastrowid
+            return new_internships
         
-        except sqlite3.IntegrityError:
-            # Internship already exists
+        finally:
+            conn.close()
+    
+    def _insert_internship(self, cursor: sqlite3.Cursor, internship: Internship) -> Optional[int]:
+        """Insert one internship; returns its id, or None if it already exists"""
+        # An archived posting that is listed again moves back rather than counting as new
+        self._restore_archived(cursor, internship.url)
+        
+        cursor.execute("""
+            INSERT OR IGNORE INTO internships 
+            (company, title, location, url, posted_date, description, requirements, created_at, notified, last_seen_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            internship.company,
+            internship.title,
+            internship.location,
+            internship.url,
+            normalize_datetime(internship.posted_date).isoformat(),
+            self.text_codec.encode(internship.description),
+            _encode_requirements(internship.requirements),
+            normalize_datetime(internship.created_at).isoformat(),
+            internship.notified,
+            normalize_datetime(internship.last_seen_at or internship.created_at).isoformat()
+        ))
+        
+        # Internship already exists
+        if cursor.rowcount != 1:
             return None
         
+        internship_id = cursor.lastrowid
+        self._index_locations(cursor, internship_id, internship.location)
+        self._update_facets(cursor, "internships", "id = ?", [internship_id], 1)
+        signature = simhash.posting_signature(internship.title)
+        internship.canonical_id = self._link_signature(cursor, internship_id, internship.company, signature)
+        return internship_id
+    
+    def _restore_archived(self, cursor: sqlite3.Cursor, url: str) -> bool:
+        """Move a posting back from the archive to the hot table, if it is archived"""
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO internships ({INTERNSHIP_COLUMNS})
+            SELECT {INTERNSHIP_COLUMNS} FROM internships_archive WHERE url = ?
+        """, (url,))
+        if cursor.rowcount != 1:
+            return False
+        
+        internship_id = cursor.lastrowid
+        self._update_facets(cursor, "internships_archive", "url = ?", [url], -1)
+        self._update_facets(cursor, "internships", "id = ?", [internship_id], 1)
+        row = cursor.execute("SELECT signature FROM internships WHERE id = ?", (internship_id,)).fetchone()
+        if row[0] is not None:
+            cursor.executemany(
+                "INSERT INTO internship_signatures (internship_id, band, bucket) VALUES (?, ?, ?)",
+                [(internship_id, band, bucket) for band, bucket in enumerate(simhash.bands(simhash.from_signed(row[0])))]
+            )
+        cursor.execute("DELETE FROM internships_archive WHERE url = ?", (url,))
+        return True
+    
+    def _link_signature(self, cursor: sqlite3.Cursor, internship_id: int, company: str, signature: int) -> int:
+        """Index a row's signature and point it at the canonical posting it duplicates
+        
+        Candidates come from the (band, bucket) index, so the lookup touches only rows
+        sharing a band with this one rather than the whole table. Only open postings
+        count: a role relisted after it closed is new again. Returns the canonical id,
+        which is the row's own id when no near-duplicate exists.
+        """
+        buckets = simhash.bands(signature)
+        cursor.execute(f"""
+            SELECT DISTINCT i.id, i.signature, i.canonical_id
+            FROM internship_signatures s
+            JOIN internships i ON i.id = s.internship_id
+            WHERE ({' OR '.join(['(s.band = ? AND s.bucket = ?)'] * len(buckets))})
+              AND i.company = ? AND i.id != ? AND i.closed_at IS NULL
+            ORDER BY i.id
+        """, [value for band in enumerate(buckets) for value in band] + [company, internship_id])
+        
+        canonical_id = internship_id
+        for candidate_id, candidate_signature, candidate_canonical in cursor.fetchall():
+            if simhash.distance(signature, simhash.from_signed(candidate_signature)) <= simhash.MAX_DISTANCE:
+                canonical_id = candidate_canonical or candidate_id
+                break
+        
+        cursor.execute("UPDATE internships SET signature = ?, canonical_id = ? WHERE id = ?",
+                       (simhash.to_signed(signature), canonical_id, internship_id))
+        cursor.executemany(
+            "INSERT INTO internship_signatures (internship_id, band, bucket) VALUES (?, ?, ?)",
+            [(internship_id, band, bucket) for band, bucket in enumerate(buckets)]
+        )
+        return canonical_id
+    
+    @db_timed("get_export_watermark")
+    def get_export_watermark(self) -> int:
+        """Latest committed export revision; export up to it and pass it as the next `since`
+        
+        Every revision up to it is committed, and later inserts, updates and closures get
+        higher revisions, so consecutive exports miss nothing.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT value FROM internship_revision")
+        row = cursor.fetchone()
+        conn.close()
+        
+        return row[0] if row else 0
+    
+    def iter_internships(self, since: Optional[int] = None, until: Optional[int] = None,
+                         include_closed: bool = True, include_archived: bool = False,
+                         batch_size: int = 500) -> Iterator[Internship]:
+        """Stream internships in revision order without loading them all
+        
+        Rows are fetched `batch_size` at a time from an open cursor, so memory stays
+        constant however large the table is.
+        
+        Args:
+            since: Only rows added or changed after this revision (exclusive)
+            until: Only rows at or before this revision, e.g. a watermark
+            include_closed: Also return postings that are no longer listed
+            include_archived: Also stream the archive table, after the hot table
+        """
+        conditions = []
+        params = []
+        if since is not None:
+            conditions.append("revision > ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("revision <= ?")
+            params.append(until)
+        
+        if not include_closed:
+            conditions.append("closed_at IS NULL")
+        queries = [f"SELECT {INTERNSHIP_COLUMNS} FROM internships WHERE {' AND '.join(conditions) or '1=1'} ORDER BY revision"]
+        if include_archived:
+            queries.append(f"SELECT {INTERNSHIP_COLUMNS} FROM internships_archive WHERE {' AND '.join(conditions) or '1=1'} ORDER BY revision")
+        
+        # Streaming responses may resume the generator on a different worker thread
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            for query in queries:
+                cursor = conn.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield self._row_to_internship(row)
         finally:
             conn.close()
     
+    @db_timed("get_changes")
+    def get_changes(self, after_id: int = 0, limit: int = 100) -> List[Tuple[int, Internship]]:
+        """Change log entries after `after_id`, oldest first, with their postings
+        
+        Entries whose posting has since been archived are skipped.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""
+            SELECT c.id, {', '.join(f'i.{column.strip()}' for column in INTERNSHIP_COLUMNS.split(','))}
+            FROM internship_changes c
+            JOIN internships i ON i.id = c.internship_id
+            WHERE c.id > ?
+            ORDER BY c.id
+            LIMIT ?
+        """, (after_id, limit))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [(row[0], self._row_to_internship(row[1:])) for row in rows]
+    
+    @db_timed("get_latest_change_id")
+    def get_latest_change_id(self) -> int:
+        """High-water mark of the change log; new clients start tailing from here"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM internship_changes")
+        latest = cursor.fetchone()[0]
+        conn.close()
+        
+        return latest
+    
+    @db_timed("get_unnotified_internships")
     def get_unnotified_internships(self) -> List[Internship]:
         """Get all internships that haven't been notified"""
         conn = sqlite3.connect(self.db_path)
@@ -84,23 +752,48 @@ class Database:
         rows = cursor.fetchall()
         conn.close()
         
-        internships = []
-        for row in rows:
-            internships.append(Internship(
-                id=row[0],
-                company=row[1],
-                title=row[2],
-                location=row[3],
-                url=row[4],
-                posted_date=datetime.fromisoformat(row[5]),
-                description=row[6],
-                requirements=row[7].split(',') if row[7] else [],
-                created_at=datetime.fromisoformat(row[8]),
-                notified=bool(row[9])
-            ))
+        return [self._row_to_internship(row) for row in rows]
+    
+    def _row_to_internship(self, row) -> Internship:
+        """Build an Internship from an `internships` row, normalizing stored dates to UTC"""
+        return Internship(
+            id=row[0],
+            company=row[1],
+            title=row[2],
+            location=row[3],
+            url=row[4],
+            posted_date=parse_date(row[5]),
+            description=self._decode_text(row[6]),
+            requirements=_decode_requirements(row[7]),
+            created_at=parse_date(row[8]),
+            notified=bool(row[9]),
+            last_seen_at=parse_date(row[10]),
+            closed_at=parse_date(row[11]),
+            canonical_id=row[13]
+        )
+    
+    @db_timed("update_internship_details")
+    def update_internship_details(self, internships: List[Internship]):
+        """Store enriched descriptions and requirements for existing internships"""
+        if not internships:
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.executemany("""
+            UPDATE internships
+            SET description = ?, requirements = ?
+            WHERE id = ?
+        """, [
+            (self.text_codec.encode(internship.description), _encode_requirements(internship.requirements), internship.id)
+            for internship in internships
+        ])
         
-        return internships
+        conn.commit()
+        conn.close()
     
+    @db_timed("mark_as_notified")
     def mark_as_notified(self, internship_ids: List[int]):
         """Mark internships as notified"""
         conn = sqlite3.connect(self.db_path)
@@ -115,6 +808,7 @@ class Database:
         conn.commit()
         conn.close()
     
+    @db_timed("get_all_users")
     def get_all_users(self) -> List[Dict]:
         """Get all registered users"""
         conn = sqlite3.connect(self.db_path)
@@ -126,12 +820,216 @@ class Database:
         
         return [{'id': row[0], 'email': row[1], 'preferences': row[2]} for row in rows]
     
-    def get_internships_with_filters(self, country: Optional[str] = None, date_filter: Optional[str] = None) -> List[Internship]:
+    @db_timed("add_webhook")
+    def add_webhook(self, url: str, secret: str, companies: Optional[List[str]] = None,
+                    country_code: Optional[str] = None) -> Dict:
+        """Register a webhook endpoint and return it"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        created_at = utc_now()
+        cursor.execute("""
+            INSERT INTO webhooks (url, secret, companies, country_code, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (url, secret, json.dumps(companies) if companies else None, country_code, created_at.isoformat()))
+        webhook_id = cursor.lastrowid
+        
+        conn.commit()
+        conn.close()
+        
+        return {'id': webhook_id, 'url': url, 'secret': secret, 'companies': companies or [],
+                'country_code': country_code, 'created_at': created_at}
+    
+    @db_timed("delete_webhook")
+    def delete_webhook(self, webhook_id: int) -> bool:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("DELETE FROM webhooks WHERE id = ?", (webhook_id,))
+        deleted = cursor.rowcount > 0
+        cursor.execute("DELETE FROM webhook_failures WHERE webhook_id = ?", (webhook_id,))
+        
+        conn.commit()
+        conn.close()
+        
+        return deleted
+    
+    @db_timed("save_webhook_failures")
+    def save_webhook_failures(self, failures: List[Dict], rounds: int = 1):
+        """Store failed webhook batches ('webhook_id', 'internship_ids', 'error') for redelivery"""
+        if not failures:
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.executemany("""
+            INSERT INTO webhook_failures (webhook_id, internship_ids, error, rounds, failed_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, [
+            (failure['webhook_id'], json.dumps(failure['internship_ids']), failure['error'], rounds,
+             utc_now().isoformat())
+            for failure in failures
+        ])
+        
+        conn.commit()
+        conn.close()
+    
+    @db_timed("get_webhook_failures")
+    def get_webhook_failures(self) -> List[Dict]:
+        """Stored failed webhook batches, oldest first"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT id, webhook_id, internship_ids, error, rounds FROM webhook_failures ORDER BY id")
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [
+            {'id': row[0], 'webhook_id': row[1], 'internship_ids': json.loads(row[2]), 'error': row[3], 'rounds': row[4]}
+            for row in rows
+        ]
+    
+    @db_timed("delete_webhook_failures")
+    def delete_webhook_failures(self, failure_ids: List[int]):
+        if not failure_ids:
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(f"DELETE FROM webhook_failures WHERE id IN ({','.join(['?'] * len(failure_ids))})", failure_ids)
+        
+        conn.commit()
+        conn.close()
+    
+    @db_timed("get_webhooks")
+    def get_webhooks(self) -> List[Dict]:
+        """Get all registered webhooks"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT id, url, secret, companies, country_code, created_at FROM webhooks ORDER BY id")
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [
+            {'id': row[0], 'url': row[1], 'secret': row[2], 'companies': json.loads(row[3]) if row[3] else [],
+             'country_code': row[4], 'created_at': parse_date(row[5])}
+            for row in rows
+        ]
+    
+    @db_timed("sync_company_postings")
+    def sync_company_postings(self, company: str, postings: List[Tuple[str, str, str]], seen_at: datetime,
+                              close_missing: bool = True) -> Dict[str, int]:
+        """Reconcile a company's stored postings with the set a crawl just saw
+        
+        The crawled set is loaded into a temp table and diffed against the company's
+        rows with set-based statements: seen postings get last_seen_at (and are
+        reopened if they had been closed), changed titles/locations are updated, and
+        open postings that were not seen are closed.
+        
+        Args:
+            company: Company whose postings were crawled
+            postings: (url, title, location) of every posting the scraper returned this crawl
+            seen_at: Crawl time recorded as last_seen_at / closed_at
+            close_missing: Close unseen postings; pass False when the crawl was
+                incomplete (errors, empty result) so nothing is closed by mistake
+        
+        Returns:
+            Counts of 'updated', 'reopened' and 'closed' postings
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        seen_at = normalize_datetime(seen_at).isoformat()
+        
+        try:
+            # Reads come before the first write below; take the write lock up front so a
+            # concurrent writer can't deadlock with this transaction's read lock
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                CREATE TEMP TABLE crawled_postings (
+                    url TEXT PRIMARY KEY,
+                    title TEXT,
+                    location TEXT
+                )
+            """)
+            cursor.executemany(
+                "INSERT OR REPLACE INTO crawled_postings (url, title, location) VALUES (?, ?, ?)",
+                postings
+            )
+            
+            relocated = cursor.execute("""
+                SELECT i.id, c.location
+                FROM internships i
+                JOIN crawled_postings c ON c.url = i.url
+                WHERE i.company = ? AND i.location IS NOT c.location
+            """, (company,)).fetchall()
+            relocated_ids = [internship_id for internship_id, _ in relocated]
+            relocated_condition = f"id IN ({','.join(['?'] * len(relocated_ids))})"
+            if relocated_ids:
+                self._update_facets(cursor, "internships", relocated_condition, relocated_ids, -1)
+            
+            cursor.execute("""
+                UPDATE internships
+                SET title = c.title, location = c.location
+                FROM crawled_postings c
+                WHERE internships.url = c.url
+                  AND internships.company = ?
+                  AND (internships.title IS NOT c.title OR internships.location IS NOT c.location)
+            """, (company,))
+            updated = cursor.rowcount
+            for internship_id, location in relocated:
+                self._index_locations(cursor, internship_id, location)
+            if relocated_ids:
+                self._update_facets(cursor, "internships", relocated_condition, relocated_ids, 1)
+            
+            reopen_condition = """
+                company = ? AND closed_at IS NOT NULL
+                AND url IN (SELECT url FROM crawled_postings)
+            """
+            self._update_facets(cursor, "internships", reopen_condition, [company], -1)
+            self._update_facets(cursor, "internships", reopen_condition, [company], 1, state='open')
+            cursor.execute(f"UPDATE internships SET closed_at = NULL WHERE {reopen_condition}", (company,))
+            reopened = cursor.rowcount
+            
+            cursor.execute("""
+                UPDATE internships
+                SET last_seen_at = ?
+                WHERE company = ? AND url IN (SELECT url FROM crawled_postings)
+            """, (seen_at, company))
+            
+            closed = 0
+            if close_missing:
+                close_condition = """
+                    company = ? AND closed_at IS NULL
+                    AND url NOT IN (SELECT url FROM crawled_postings)
+                """
+                self._update_facets(cursor, "internships", close_condition, [company], -1)
+                self._update_facets(cursor, "internships", close_condition, [company], 1, state='closed')
+                cursor.execute(f"UPDATE internships SET closed_at = ? WHERE {close_condition}", (seen_at, company))
+                closed = cursor.rowcount
+            
+            conn.commit()
+            return {'updated': updated, 'reopened': reopened, 'closed': closed}
+        
+        finally:
+            conn.close()
+    
+    @db_timed("get_internships_with_filters")
+    def get_internships_with_filters(self, country: Optional[str] = None, date_filter: Optional[str] = None,
+                                     include_closed: bool = False, include_archived: bool = False,
+                                     include_description: bool = True) -> List[Internship]:
         """Get internships with optional filtering by country and date range
         
         Args:
-            country: Filter by location/country (case-insensitive)
+            country: Filter by country; names, aliases and ISO codes ("USA", "United
+                States", "us") use the country index, anything else matches the
+                location text
             date_filter: Filter by date range ('past_hour', 'past_week', 'past_month')
+            include_closed: Also return postings that are no longer listed
+            include_archived: Also search postings moved to the archive table
+            include_description: Load descriptions; without them (None) nothing is decompressed
         
         Returns:
             List of filtered internships
@@ -139,52 +1037,529 @@ class Database:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        query = "SELECT * FROM internships WHERE 1=1"
+        conditions = []
         params = []
         
         # Add country filter
         if country:
-            query += " AND location LIKE ?"
-            params.append(f"%{country}%")
+            country_code = gazetteer.country_code(country)
+            if country_code:
+                conditions.append("id IN (SELECT internship_id FROM internship_locations WHERE country_code = ?)")
+                params.append(country_code)
+            else:
+                conditions.append("location LIKE ?")
+                params.append(f"%{country}%")
         
         # Add date filter
-        if date_filter:
-            now = datetime.now()
-            if date_filter == 'past_hour':
-                cutoff_date = now - timedelta(hours=1)
-            elif date_filter == 'past_week':
-                cutoff_date = now - timedelta(weeks=1)
-            elif date_filter == 'past_month':
-                cutoff_date = now - timedelta(days=30)
-            else:
-                cutoff_date = None
-            
-            if cutoff_date:
-                query += " AND datetime(posted_date) >= ?"
-                params.append(cutoff_date.isoformat())
+        cutoff_date = _date_cutoff(date_filter)
+        if cutoff_date:
+            conditions.append("datetime(posted_date) >= datetime(?)")
+            params.append(cutoff_date.isoformat())
+        
+        columns = _internship_columns(include_description)
+        if not include_closed:
+            conditions.insert(0, "closed_at IS NULL")
+        query = f"SELECT {columns} FROM internships WHERE {' AND '.join(conditions) or '1=1'}"
+        query_params = list(params)
+        
+        # Archived rows are only read when explicitly asked for
+        if include_archived:
+            query += f"""
+                UNION ALL
+                SELECT {columns} FROM internships_archive WHERE {' AND '.join(conditions) or '1=1'}
+            """
+            query_params += params
         
         # Sort by posted_date descending (newest first)
-        query += " ORDER BY datetime(posted_date) DESC"
+        query = f"SELECT * FROM ({query}) ORDER BY datetime(posted_date) DESC"
         
-        cursor.execute(query, params)
+        cursor.execute(query, query_params)
         rows = cursor.fetchall()
         conn.close()
         
-        internships = []
-        for row in rows:
-            internships.append(Internship(
-                id=row[0],
-                company=row[1],
-                title=row[2],
-                location=row[3],
-                url=row[4],
-                posted_date=datetime.fromisoformat(row[5]),
-                description=row[6],
-                requirements=row[7].split(',') if row[7] else [],
-                created_at=datetime.fromisoformat(row[8]),
-                notified=bool(row[9])
-            ))
+        return [self._row_to_internship(row) for row in rows]
+    
+    @db_timed("get_internship")
+    def get_internship(self, internship_id: int) -> Optional[Internship]:
+        """A single posting by id, from the hot table or the archive"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
         
-        return internships
-
-
+        cursor.execute(f"""
+            SELECT {INTERNSHIP_COLUMNS} FROM internships WHERE id = ?
+            UNION ALL
+            SELECT {INTERNSHIP_COLUMNS} FROM internships_archive WHERE id = ?
+        """, (internship_id, internship_id))
+        row = cursor.fetchone()
+        conn.close()
+        
+        return self._row_to_internship(row) if row else None
+    
+    @db_timed("get_facets")
+    def get_facets(self, country: Optional[str] = None, date_filter: Optional[str] = None,
+                   include_closed: bool = False, include_archived: bool = False) -> Dict:
+        """Posting counts by company, country and week, with the same filters as
+        get_internships_with_filters
+        
+        Counts come from internship_facets, whose rows are per posted day, so only the
+        first day of a date filter is counted from the postings themselves (through
+        the posted-day index). Country text the gazetteer does not recognize has no
+        summary rows and is counted by scanning.
+        
+        Returns:
+            'total' plus 'companies', 'countries' and 'weeks' lists of {'value', 'count'}
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cutoff_date = _date_cutoff(date_filter)
+        country_code = gazetteer.country_code(country) if country else None
+        
+        try:
+            if country and not country_code:
+                conditions = ["location LIKE ?"]
+                params = [f"%{country}%"]
+                if cutoff_date:
+                    conditions.append("datetime(posted_date) >= datetime(?)")
+                    params.append(cutoff_date.isoformat())
+                rows = self._scan_facets(cursor, conditions, params, include_closed, include_archived)
+            else:
+                states = ['open'] + (['closed'] if include_closed else [])
+                if include_archived:
+                    states += ['archived'] + (['archived_closed'] if include_closed else [])
+                conditions = [f"state IN ({','.join(['?'] * len(states))})"]
+                params = list(states)
+                if country_code:
+                    conditions.append("country_code = ?")
+                    params.append(country_code)
+                if cutoff_date:
+                    conditions.append("day > ?")
+                    params.append(cutoff_date.date().isoformat())
+                rows = cursor.execute(f"""
+                    SELECT company, country_code, day, SUM(postings)
+                    FROM internship_facets
+                    WHERE {' AND '.join(conditions)}
+                    GROUP BY company, country_code, day
+                """, params).fetchall()
+                
+                if cutoff_date:
+                    rows += self._scan_facets(
+                        cursor,
+                        ["date(posted_date) = ?", "datetime(posted_date) >= datetime(?)"],
+                        [cutoff_date.date().isoformat(), cutoff_date.isoformat()],
+                        include_closed, include_archived
+                    )
+        
+        finally:
+            conn.close()
+        
+        if country_code:
+            counted = countries = [row for row in rows if row[1] == country_code]
+        else:
+            counted = [row for row in rows if row[1] == ALL_COUNTRIES]
+            countries = [row for row in rows if row[1] != ALL_COUNTRIES]
+        
+        return {
+            'total': sum(row[3] for row in counted),
+            'companies': _facet_counts(counted, lambda row: row[0]),
+            'countries': _facet_counts(countries, lambda row: row[1]),
+            'weeks': sorted(_facet_counts(counted, lambda row: _week(row[2])), key=lambda facet: facet['value'])
+        }
+    
+    def _scan_facets(self, cursor: sqlite3.Cursor, conditions: List[str], params: list,
+                     include_closed: bool, include_archived: bool) -> List[tuple]:
+        """(company, country_code, day, n) rows counted from the postings themselves"""
+        condition = ' AND '.join(conditions if include_closed else ["closed_at IS NULL"] + conditions)
+        tables = [("internships", condition)]
+        if include_archived:
+            tables.append(("internships_archive", condition))
+        
+        rows = []
+        for table, condition in tables:
+            rows += [
+                (company, code, day, n)
+                for company, code, day, _, n in cursor.execute(self._facet_rows_sql(table, condition, "''"), list(params) * 2)
+            ]
+        return rows
+    
+    @db_timed("archive_internships")
+    def archive_internships(self, closed_after_days: int = ARCHIVE_CLOSED_AFTER_DAYS,
+                            unseen_after_days: int = ARCHIVE_UNSEEN_AFTER_DAYS,
+                            batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+        """Move long-closed and long-unseen postings to internships_archive
+        
+        Rows move in batches, each in its own short transaction, so a crawl or API
+        request is never blocked for long. Returns the number of rows archived.
+        """
+        now = utc_now()
+        closed_cutoff = (now - timedelta(days=closed_after_days)).isoformat()
+        unseen_cutoff = (now - timedelta(days=unseen_after_days)).isoformat()
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        archived = 0
+        
+        try:
+            while True:
+                cursor.execute("BEGIN IMMEDIATE")
+                ids = [row[0] for row in cursor.execute("""
+                    SELECT id FROM internships
+                    WHERE (closed_at IS NOT NULL AND datetime(closed_at) < datetime(?))
+                       OR datetime(COALESCE(last_seen_at, created_at)) < datetime(?)
+                    LIMIT ?
+                """, (closed_cutoff, unseen_cutoff, batch_size))]
+                if not ids:
+                    conn.rollback()
+                    break
+                
+                placeholders = ','.join(['?'] * len(ids))
+                self._update_facets(cursor, "internships", f"id IN ({placeholders})", ids, -1)
+                cursor.execute(f"""
+                    INSERT OR REPLACE INTO internships_archive ({INTERNSHIP_COLUMNS}, revision, archived_at)
+                    SELECT {INTERNSHIP_COLUMNS}, revision, ? FROM internships WHERE id IN ({placeholders})
+                """, [now.isoformat()] + ids)
+                self._update_facets(cursor, "internships_archive", f"id IN ({placeholders})", ids, 1)
+                cursor.execute(f"DELETE FROM internship_signatures WHERE internship_id IN ({placeholders})", ids)
+                cursor.execute(f"DELETE FROM internships WHERE id IN ({placeholders})", ids)
+                conn.commit()
+                archived += len(ids)
+        
+        finally:
+            conn.close()
+        
+        return archived
+    
+    @db_timed("run_maintenance")
+    def run_maintenance(self, vacuum_pages: Optional[int] = None) -> Dict[str, int]:
+        """Archive old postings, trim the change log, compress descriptions and return
+        freed pages to the filesystem
+        
+        Meant for idle time between crawls. Databases created before incremental
+        auto-vacuum are converted with a one-off full VACUUM.
+        
+        Args:
+            vacuum_pages: Free at most this many pages (default: all free pages)
+        
+        Returns:
+            Counts of 'archived' rows, 'compressed' descriptions and 'freed_pages'
+        """
+        archived = self.archive_internships()
+        if not self.text_codec.dictionaries:
+            self.train_text_dictionary()
+        compressed = self.compress_descriptions()
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            # AUTOINCREMENT ids keep growing, so event ids stay valid after trimming
+            cursor.execute(
+                "DELETE FROM internship_changes WHERE changed_at < ?",
+                ((utc_now() - timedelta(days=CHANGE_LOG_RETENTION_DAYS)).isoformat(),)
+            )
+            conn.commit()
+            
+            if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                cursor.execute("VACUUM")
+            
+            free_before = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            if vacuum_pages is None:
+                cursor.execute("PRAGMA incremental_vacuum").fetchall()
+            else:
+                cursor.execute(f"PRAGMA incremental_vacuum({int(vacuum_pages)})").fetchall()
+            freed = free_before - cursor.execute("PRAGMA freelist_count").fetchone()[0]
+            
+            cursor.execute("PRAGMA optimize")
+            conn.commit()
+        
+        finally:
+            conn.close()
+        
+        return {'archived': archived, 'compressed': compressed, 'freed_pages': freed}
+    
+    @db_timed("train_text_dictionary")
+    def train_text_dictionary(self, min_samples: int = DICTIONARY_MIN_SAMPLES) -> Optional[int]:
+        """Train a description dictionary from recent postings; new writes use it
+        
+        Returns the dictionary id, or None when there are fewer than `min_samples` descriptions.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            rows = cursor.execute("""
+                SELECT description FROM internships
+                WHERE description IS NOT NULL AND description != ''
+                ORDER BY id DESC LIMIT ?
+            """, (DICTIONARY_SAMPLES,)).fetchall()
+            if len(rows) < min_samples:
+                return None
+            
+            dictionary = train_dictionary(self._decode_text(row[0]) for row in rows)
+            if not dictionary:
+                return None
+            cursor.execute(
+                "INSERT INTO text_dictionaries (data, samples, created_at) VALUES (?, ?, ?)",
+                (dictionary, len(rows), utc_now().isoformat())
+            )
+            dictionary_id = cursor.lastrowid
+            conn.commit()
+            self._load_text_codec(cursor)
+            return dictionary_id
+        
+        finally:
+            conn.close()
+    
+    @db_timed("compress_descriptions")
+    def compress_descriptions(self, batch_size: int = COMPRESS_BATCH_SIZE) -> int:
+        """Compress descriptions still stored as plain text (rows from before compression,
+        or enriched by an older version); returns how many were compressed"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        compressed = 0
+        
+        try:
+            for table in ("internships", "internships_archive"):
+                last_id = 0
+                while True:
+                    rows = cursor.execute(f"""
+                        SELECT id, description FROM {table}
+                        WHERE id > ? AND typeof(description) = 'text' AND length(description) >= ?
+                        ORDER BY id LIMIT ?
+                    """, (last_id, MIN_COMPRESS_CHARS, batch_size)).fetchall()
+                    if not rows:
+                        break
+                    
+                    updates = [(self.text_codec.encode(description), internship_id) for internship_id, description in rows]
+                    updates = [(value, internship_id) for value, internship_id in updates if isinstance(value, bytes)]
+                    cursor.executemany(f"UPDATE {table} SET description = ? WHERE id = ?", updates)
+                    conn.commit()
+                    compressed += len(updates)
+                    last_id = rows[-1][0]
+        
+        finally:
+            conn.close()
+        
+        return compressed
+    
+    @db_timed("start_crawl_run")
+    def start_crawl_run(self, started_at: datetime) -> int:
+        """Record the start of a crawl and return its run id"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("INSERT INTO crawl_runs (started_at) VALUES (?)", (started_at.isoformat(),))
+        conn.commit()
+        run_id = cursor.lastrowid
+        conn.close()
+        
+        return run_id
+    
+    @db_timed("save_scraper_run")
+    def save_scraper_run(self, crawl_run_id: int, scraper: str, started_at: datetime, duration_seconds: float,
+                         items_seen: int, items_new: int, errors: int, bytes_fetched: int):
+        """Record how a single scraper performed within a crawl"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            INSERT INTO scraper_runs
+            (crawl_run_id, scraper, started_at, duration_seconds, items_seen, items_new, errors, bytes_fetched)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (crawl_run_id, scraper, started_at.isoformat(), duration_seconds,
+              items_seen, items_new, errors, bytes_fetched))
+        
+        conn.commit()
+        conn.close()
+    
+    @db_timed("finish_crawl_run")
+    def finish_crawl_run(self, crawl_run_id: int, finished_at: datetime):
+        """Close a crawl run, rolling up totals from its scraper runs"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            UPDATE crawl_runs SET
+                finished_at = ?,
+                duration_seconds = (julianday(?) - julianday(started_at)) * 86400.0,
+                items_seen = (SELECT COALESCE(SUM(items_seen), 0) FROM scraper_runs WHERE crawl_run_id = crawl_runs.id),
+                items_new = (SELECT COALESCE(SUM(items_new), 0) FROM scraper_runs WHERE crawl_run_id = crawl_runs.id),
+                errors = (SELECT COALESCE(SUM(errors), 0) FROM scraper_runs WHERE crawl_run_id = crawl_runs.id),
+                bytes_fetched = (SELECT COALESCE(SUM(bytes_fetched), 0) FROM scraper_runs WHERE crawl_run_id = crawl_runs.id)
+            WHERE id = ?
+        """, (finished_at.isoformat(), finished_at.isoformat(), crawl_run_id))
+        
+        conn.commit()
+        conn.close()
+    
+    @db_timed("get_scraper_health")
+    def get_scraper_health(self, scraper: str) -> Optional[Dict]:
+        """Circuit breaker state of a scraper, or None if it has no history"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT state, consecutive_failures, opened_at, last_error, updated_at
+            FROM scraper_health WHERE scraper = ?
+        """, (scraper,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row is None:
+            return None
+        return {
+            'scraper': scraper,
+            'state': row[0],
+            'consecutive_failures': row[1],
+            'opened_at': parse_date(row[2]),
+            'last_error': row[3],
+            'updated_at': parse_date(row[4])
+        }
+    
+    @db_timed("save_scraper_health")
+    def save_scraper_health(self, scraper: str, state: str, consecutive_failures: int,
+                            opened_at: Optional[datetime] = None, last_error: Optional[str] = None):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            INSERT INTO scraper_health (scraper, state, consecutive_failures, opened_at, last_error, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (scraper) DO UPDATE SET
+                state = excluded.state,
+                consecutive_failures = excluded.consecutive_failures,
+                opened_at = excluded.opened_at,
+                last_error = excluded.last_error,
+                updated_at = excluded.updated_at
+        """, (scraper, state, consecutive_failures,
+              normalize_datetime(opened_at).isoformat() if opened_at else None,
+              last_error, utc_now().isoformat()))
+        
+        conn.commit()
+        conn.close()
+    
+    @db_timed("save_scraper_latencies")
+    def save_scraper_latencies(self, scraper: str, kind: str, samples: List[float], keep: int):
+        """Append latency samples, keeping only the newest `keep` per scraper and kind"""
+        if not samples:
+            return
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.executemany(
+            "INSERT INTO scraper_latencies (scraper, kind, seconds) VALUES (?, ?, ?)",
+            [(scraper, kind, seconds) for seconds in samples]
+        )
+        cursor.execute("""
+            DELETE FROM scraper_latencies
+            WHERE scraper = ? AND kind = ? AND id <= (
+                SELECT id FROM scraper_latencies
+                WHERE scraper = ? AND kind = ?
+                ORDER BY id DESC
+                LIMIT 1 OFFSET ?
+            )
+        """, (scraper, kind, scraper, kind, keep))
+        
+        conn.commit()
+        conn.close()
+    
+    @db_timed("get_latency_percentile")
+    def get_latency_percentile(self, scraper: str, kind: str, percentile: float) -> Tuple[Optional[float], int]:
+        """Nearest-rank percentile of the stored samples, with the number of samples"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            WITH ranked AS (
+                SELECT seconds,
+                       ROW_NUMBER() OVER (ORDER BY seconds) AS rn,
+                       COUNT(*) OVER () AS n
+                FROM scraper_latencies
+                WHERE scraper = ? AND kind = ?
+            )
+            SELECT MIN(CASE WHEN rn >= ? * n THEN seconds END), COUNT(*)
+            FROM ranked
+        """, (scraper, kind, percentile))
+        row = cursor.fetchone()
+        conn.close()
+        
+        return row[0], row[1]
+    
+    @db_timed("get_scraper_performance")
+    def get_scraper_performance(self, days: int = 30) -> Dict:
+        """Per-scraper latency percentiles and daily yield over the last `days` days
+        
+        Percentiles use the nearest-rank method, computed in SQL with window functions.
+        error_rate is the share of runs that reported at least one error.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        
+        cursor.execute("""
+            WITH ranked AS (
+                SELECT scraper, duration_seconds, items_seen, items_new, errors, bytes_fetched,
+                       ROW_NUMBER() OVER (PARTITION BY scraper ORDER BY duration_seconds) AS rn,
+                       COUNT(*) OVER (PARTITION BY scraper) AS n
+                FROM scraper_runs
+                WHERE started_at >= ?
+            )
+            SELECT scraper,
+                   COUNT(*),
+                   MIN(CASE WHEN rn >= 0.50 * n THEN duration_seconds END),
+                   MIN(CASE WHEN rn >= 0.90 * n THEN duration_seconds END),
+                   MIN(CASE WHEN rn >= 0.95 * n THEN duration_seconds END),
+                   MIN(CASE WHEN rn >= 0.99 * n THEN duration_seconds END),
+                   MAX(duration_seconds),
+                   AVG(items_seen),
+                   AVG(items_new),
+                   SUM(errors),
+                   AVG(errors > 0),
+                   AVG(bytes_fetched)
+            FROM ranked
+            GROUP BY scraper
+            ORDER BY scraper
+        """, (since,))
+        scrapers = [
+            {
+                'scraper': row[0],
+                'runs': row[1],
+                'p50_seconds': row[2],
+                'p90_seconds': row[3],
+                'p95_seconds': row[4],
+                'p99_seconds': row[5],
+                'max_seconds': row[6],
+                'avg_items_seen': row[7],
+                'avg_items_new': row[8],
+                'errors': row[9],
+                'error_rate': row[10],
+                'avg_bytes_fetched': row[11]
+            }
+            for row in cursor.fetchall()
+        ]
+        
+        cursor.execute("""
+            SELECT scraper, date(started_at) AS day, COUNT(*), AVG(duration_seconds),
+                   SUM(items_seen), SUM(items_new), SUM(errors)
+            FROM scraper_runs
+            WHERE started_at >= ?
+            GROUP BY scraper, day
+            ORDER BY day, scraper
+        """, (since,))
+        trend = [
+            {
+                'scraper': row[0],
+                'day': row[1],
+                'runs': row[2],
+                'avg_seconds': row[3],
+                'items_seen': row[4],
+                'items_new': row[5],
+                'errors': row[6]
+            }
+            for row in cursor.fetchall()
+        ]
+        
+        conn.close()
+        return {'scrapers': scrapers, 'trend': trend}
@@ -1,88 +1,216 @@
 from datetime import datetime
+import argparse
 import importlib
+import logging
 import os
+import sys
 from pathlib import Path
 from database.db import Database
 from services.notification_service import NotificationService
+from scrapers.ats import load_boards
 from scrapers.base_scraper import BaseScraper
-from models.internship import Internship
+from services.crawl_pipeline import CrawlPipeline
+from services.enrichment_service import EnrichmentService
+from services.scraper_health import ScraperHealth
+from services import export_service
+from services.work_queue import CrawlWorker, WorkQueue
+from utils import metrics
+from utils.parse_pool import ParsePool
+from utils.profiling import CrawlProfiler
+from utils.logging_config import setup_logging
+
+# Per-run timing summary, also served by the API's /metrics endpoint
+METRICS_PATH = os.environ.get("CRAWL_METRICS_PATH", "crawl_metrics.json")
+
+logger = logging.getLogger(__name__)
 
 class CrawlerManager:
-    def __init__(self):
+    def __init__(self, profiler: CrawlProfiler = None, parse_pool: ParsePool = None, enrich: bool = True,
+                 circuit_breaker: bool = True):
         self.db = Database()
         self.notification_service = NotificationService()
-        self.scrapers = []
-        self._load_scrapers()
+        self.enrichment_service = EnrichmentService() if enrich else None
+        self.health = ScraperHealth(self.db)
+        self.circuit_breaker = circuit_breaker
+        self.profiler = profiler or CrawlProfiler.from_env()
+        self.parse_pool = parse_pool or ParsePool.from_env()
+        self.scrapers = load_scrapers(self.parse_pool)
     
-    def _load_scrapers(self):
-        """Dynamically load all scraper modules"""
-        scrapers_dir = Path("scrapers")
+    def run_crawl(self, work_queue: WorkQueue = None):
+        """Run all scrapers and process results
         
-        for file in scrapers_dir.glob("*.py"):
-            if file.name.startswith("_") or file.name == "base_scraper.py":
-                continue
-            
-            module_name = f"scrapers.{file.stem}"
-            try:
-                module = importlib.import_module(module_name)
-                
-                # Find the scraper class in the module
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if (isinstance(attr, type) and 
-                        issubclass(attr, BaseScraper) and 
-                        attr is not BaseScraper):
-                        
-                        scraper_instance = attr()
-                        if scraper_instance.enabled:
-                            self.scrapers.append(scraper_instance)
-                            print(f"Loaded scraper: {scraper_instance.company_name}")
-            
-            except Exception as e:
-                print(f"Error loading scraper {file.name}: {e}")
-    
-    def run_crawl(self):
-        """Run all scrapers and process results"""
-        print(f"\n{'='*50}")
-        print(f"Starting crawl at {datetime.now()}")
-        print(f"{'='*50}\n")
+        With a work queue, this process is the coordinator: it enqueues one job per
+        scraper and persists the results workers push back, instead of scraping.
+        """
+        started_at = datetime.now()
+        metrics.registry.reset()
+        logger.info("Starting crawl", extra={'stage': 'crawl', 'scrapers': len(self.scrapers)})
         
-        new_internships = []
+        crawl_run_id = self.db.start_crawl_run(started_at)
         
-        for scraper in self.scrapers:
-            print(f"Crawling {scraper.company_name}...")
-            positions = scraper.scrape()
-            
-            for position in positions:
-                internship = Internship(
-                    company=scraper.company_name,
-                    **position
-                )
-                
-                internship_id = self.db.save_internship(internship)
-                if internship_id:
-                    internship.id = internship_id
-                    new_internships.append(internship)
-                    print(f"  ✓ New: {internship.title}")
+        # Scrapers whose circuit is open sit this crawl out; the rest get timeouts
+        # fitted to their recent latencies
+        scrapers = [s for s in self.scrapers if not self.circuit_breaker or self.health.allow(s.company_name)]
+        for scraper in scrapers:
+            self.health.apply_timeouts(scraper)
         
-        print(f"\nFound {len(new_internships)} new internship(s)")
+        if work_queue is not None:
+            work_queue.enqueue(crawl_run_id, [scraper.company_name for scraper in scrapers])
+            logger.info("Enqueued scrape jobs", extra={'stage': 'coordinate', 'jobs': len(scrapers)})
+            scrapers = work_queue.iter_finished(crawl_run_id)
         
-        # Send notifications
-        if new_internships:
-            users = self.db.get_all_users()
-            print(f"Notifying {len(users)} user(s)...")
-            
-            self.notification_service.notify_new_internships(new_internships, users)
+        # Scrape, persist and notify run concurrently as bounded stages; see CrawlPipeline
+        pipeline = CrawlPipeline(self.db, self.notification_service, profiler=self.profiler,
+                                 enrichment_service=self.enrichment_service, health=self.health)
+        try:
+            new_count = pipeline.run(scrapers, crawl_run_id)
+        finally:
+            self.parse_pool.shutdown()
+        
+        finished_at = datetime.now()
+        self.db.finish_crawl_run(crawl_run_id, finished_at)
+        try:
+            metrics.write_run_summary(METRICS_PATH, started_at, finished_at)
+        except OSError as e:
+            logger.warning("Could not write metrics summary: %s", e)
+        
+        if self.profiler.enabled:
+            summary_path = self.profiler.write_summary()
+            if summary_path:
+                logger.info("Profiles written", extra={'path': self.profiler.output_dir, 'summary': summary_path})
+        
+        logger.info("Crawl completed", extra={
+            'stage': 'crawl',
+            'duration': round((finished_at - started_at).total_seconds(), 3),
+            'new': new_count
+        })
+
+
+def load_scrapers(parse_pool: ParsePool = None) -> list:
+    """Dynamically load all enabled scrapers from the scraper modules"""
+    scrapers = []
+    scrapers_dir = Path("scrapers")
+    
+    for file in scrapers_dir.glob("*.py"):
+        if file.name.startswith("_") or file.name == "base_scraper.py":
+            continue
+        
+        module_name = f"scrapers.{file.stem}"
+        try:
+            module = importlib.import_module(module_name)
             
-            # Mark as notified
-            self.db.mark_as_notified([i.id for i in new_internships])
-            print("Notifications sent!")
+            # Find the scraper class in the module
+            for attr_name in dir(module):
+                attr = getattr(module, attr_name)
+                if (isinstance(attr, type) and 
+                    issubclass(attr, BaseScraper) and 
+                    attr is not BaseScraper and
+                    not getattr(attr, 'requires_config', False)):
+                    
+                    scraper_instance = attr()
+                    if parse_pool is not None and parse_pool.enabled:
+                        scraper_instance.parse_pool = parse_pool
+                    if scraper_instance.enabled:
+                        scrapers.append(scraper_instance)
+                        logger.info("Loaded scraper", extra={'scraper': scraper_instance.company_name})
         
-        print(f"\n{'='*50}")
-        print(f"Crawl completed at {datetime.now()}")
-        print(f"{'='*50}\n")
+        except Exception as e:
+            logger.exception("Error loading scraper", extra={'scraper_module': file.name})
+    
+    # Config-driven ATS boards (see scrapers.ats), sharing one connection pool
+    try:
+        for scraper_instance in load_boards():
+            if scraper_instance.enabled:
+                scrapers.append(scraper_instance)
+                logger.info("Loaded scraper", extra={'scraper': scraper_instance.company_name, 'ats': scraper_instance.ats})
+    except Exception as e:
+        logger.exception("Error loading ATS boards")
+    
+    return scrapers
+
+
+def run_worker(work_queue: WorkQueue, scraper_names: list = None, parse_pool: ParsePool = None,
+               exit_when_idle: bool = False):
+    """Run scrape jobs from the queue; `scraper_names` limits which companies this host scrapes"""
+    parse_pool = parse_pool or ParsePool.from_env()
+    scrapers = [
+        scraper for scraper in load_scrapers(parse_pool)
+        if not scraper_names or scraper.company_name in scraper_names
+    ]
+    try:
+        completed = CrawlWorker(work_queue, scrapers).run(exit_when_idle=exit_when_idle)
+    finally:
+        parse_pool.shutdown()
+    logger.info("Worker finished", extra={'stage': 'worker', 'jobs': completed})
+
+
+def run_export(path: str, fmt: str, compression: str, since: int = None, include_archived: bool = False):
+    """Stream the internships table to a file ('-' for stdout); logs the watermark for the next pull"""
+    db = Database()
+    watermark = db.get_export_watermark()
+    rows = db.iter_internships(since=since, until=watermark, include_archived=include_archived)
+    
+    out = sys.stdout.buffer if path == "-" else open(path, "wb")
+    try:
+        for chunk in export_service.export_internships(rows, fmt, compression):
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    
+    logger.info("Export completed", extra={
+        'stage': 'export',
+        'path': path,
+        'watermark': watermark
+    })
 
 
 if __name__ == "__main__":
-    manager = CrawlerManager()
-    manager.run_crawl()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Crawl career pages for new internships")
+    parser.add_argument("--profile", choices=["scrapers", "all"],
+                        help="Profile each scraper (or every crawl phase) with cProfile")
+    parser.add_argument("--profile-dir", help="Directory for .prof files and hotspot summaries")
+    parser.add_argument("--profile-top", type=int, default=25, help="Functions listed in hotspot summaries")
+    parser.add_argument("--parse-workers", type=int,
+                        help="Parse downloaded pages in N worker processes (default $CRAWLER_PARSE_WORKERS or 0: in-process)")
+    parser.add_argument("--no-enrich", action="store_true",
+                        help="Skip fetching detail pages (description, requirements) for new postings")
+    parser.add_argument("--no-circuit-breaker", action="store_true",
+                        help="Run every scraper, even those skipped after repeated failures")
+    parser.add_argument("--maintenance", action="store_true",
+                        help="Archive old postings and vacuum the database instead of crawling (run when idle)")
+    parser.add_argument("--export", metavar="PATH",
+                        help="Export internships to PATH ('-' for stdout) instead of crawling")
+    parser.add_argument("--export-format", choices=sorted(export_service.FORMATS), default="ndjson")
+    parser.add_argument("--export-compression", choices=export_service.available_compressions(), default="none")
+    parser.add_argument("--since", type=int,
+                        help="Export only postings added or changed after this revision (previous watermark)")
+    parser.add_argument("--include-archived", action="store_true", help="Also export archived postings")
+    parser.add_argument("--coordinator", action="store_true",
+                        help="Enqueue one scrape job per scraper and persist what workers return")
+    parser.add_argument("--worker", action="store_true", help="Run scrape jobs from the queue instead of crawling")
+    parser.add_argument("--queue-url",
+                        help="Work queue: redis://host:port/db or sqlite:///path (default $CRAWLER_QUEUE_URL or crawl_queue.db)")
+    parser.add_argument("--scrapers", help="Worker only: comma-separated company names to scrape (default: all)")
+    parser.add_argument("--once", action="store_true", help="Worker only: exit when the queue is empty")
+    parser.add_argument("--log-level", help="Log level (default $LOG_LEVEL or INFO); DEBUG logs every posting")
+    parser.add_argument("--log-format", choices=["json", "text"], help="Log format (default $LOG_FORMAT or json)")
+    args = parser.parse_args()
+
+    # Keep log lines out of an export written to stdout
+    setup_logging(args.log_level, args.log_format, stream=sys.stderr if args.export == "-" else None)
+
+    if args.export:
+        run_export(args.export, args.export_format, args.export_compression, args.since, args.include_archived)
+    elif args.maintenance:
+        result = Database().run_maintenance()
+        logger.info("Maintenance completed", extra=dict(result, stage='maintenance'))
+    elif args.worker:
+        run_worker(WorkQueue.from_env(args.queue_url),
+                   scraper_names=[name.strip() for name in args.scrapers.split(",")] if args.scrapers else None,
+                   parse_pool=ParsePool.from_env(args.parse_workers), exit_when_idle=args.once)
+    else:
+        profiler = CrawlProfiler.from_env(args.profile, args.profile_dir, args.profile_top)
+        manager = CrawlerManager(profiler=profiler, parse_pool=ParsePool.from_env(args.parse_workers),
+                                 enrich=not args.no_enrich, circuit_breaker=not args.no_circuit_breaker)
+        manager.run_crawl(WorkQueue.from_env(args.queue_url) if args.coordinator else None)
\ No newline at end of file
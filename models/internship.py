@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Optional
+from utils.dates import utc_now
 
 class Internship:
     def __init__(
@@ -13,18 +14,29 @@ class Internship:
         description: str = "",
         requirements: list = None,
         created_at: datetime = None,
-        notified: bool = False
+        notified: bool = False,
+        last_seen_at: Optional[datetime] = None,
+        closed_at: Optional[datetime] = None,
+        canonical_id: Optional[int] = None
     ):
         self.id = id
         self.company = company
         self.title = title
         self.location = location
         self.url = url
-        self.posted_date = posted_date or datetime.now()
+        self.posted_date = posted_date or utc_now()
         self.description = description
         self.requirements = requirements or []
-        self.created_at = created_at or datetime.now()
+        self.created_at = created_at or utc_now()
         self.notified = notified
+        self.last_seen_at = last_seen_at
+        self.closed_at = closed_at
+        # Id of the posting this one near-duplicates (its own id if it is the original)
+        self.canonical_id = canonical_id
+    
+    @property
+    def is_duplicate(self) -> bool:
+        return self.canonical_id is not None and self.canonical_id != self.id
     
     def to_dict(self):
         return {
@@ -37,5 +49,8 @@ class Internship:
             'description': self.description,
             'requirements': self.requirements,
             'created_at': self.created_at.isoformat(),
-            'notified': self.notified
+            'notified': self.notified,
+            'last_seen_at': self.last_seen_at.isoformat() if self.last_seen_at else None,
+            'closed_at': self.closed_at.isoformat() if self.closed_at else None,
+            'canonical_id': self.canonical_id
         }
\ No newline at end of file
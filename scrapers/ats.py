@@ -0,0 +1,251 @@
+from datetime import datetime, timedelta, timezone
+from html import unescape
+from typing import Dict, Iterator, List, Optional
+import json
+import logging
+import os
+import re
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scrapers.base_scraper import BaseScraper
+from utils.dates import parse_date, utc_now
+from utils.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+# JSON list of job boards to crawl, one entry per company:
+#   {"company": "Acme", "ats": "greenhouse", "board": "acme"}
+# Workday entries also need "host" (e.g. "acme.wd5.myworkdayjobs.com") and "site".
+# Optional: "fields" (posting field -> dotted path into a job, overriding the ATS
+# defaults below) and "enabled": false.
+ATS_CONFIG_ENV = "CRAWLER_ATS_CONFIG"
+DEFAULT_ATS_CONFIG = "ats_boards.json"
+
+# Per ATS: job list request and where each posting field sits in a job.
+# Greenhouse lists are requested without job content (it multiplies the payload);
+# the enrichment stage fetches descriptions for new postings instead.
+ATS_TYPES = {
+    'greenhouse': {
+        'url': 'https://boards-api.greenhouse.io/v1/boards/{board}/jobs',
+        'jobs': 'jobs',
+        'fields': {'title': 'title', 'url': 'absolute_url', 'location': 'location.name',
+                   'posted_date': 'updated_at', 'description': None},
+    },
+    'lever': {
+        'url': 'https://api.lever.co/v0/postings/{board}?mode=json',
+        'jobs': None,
+        'fields': {'title': 'text', 'url': 'hostedUrl', 'location': 'categories.location',
+                   'posted_date': 'createdAt', 'description': 'descriptionPlain'},
+    },
+    'ashby': {
+        'url': 'https://api.ashbyhq.com/posting-api/job-board/{board}',
+        'jobs': 'jobs',
+        'fields': {'title': 'title', 'url': 'jobUrl', 'location': 'location',
+                   'posted_date': 'publishedAt', 'description': 'descriptionPlain'},
+    },
+    'workday': {
+        'url': 'https://{host}/wday/cxs/{board}/{site}/jobs',
+        'jobs': 'jobPostings',
+        'fields': {'title': 'title', 'url': 'externalPath', 'location': 'locationsText',
+                   'posted_date': 'postedOn', 'description': None},
+    },
+}
+
+# Workday pages its POST search; it caps the page size at 20
+WORKDAY_PAGE_SIZE = 20
+WORKDAY_MAX_PAGES = 25
+
+# Connections kept per ATS host; all boards of one ATS live on the same API host
+POOL_MAXSIZE = 8
+
+_TAGS = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+# Workday's "Posted Today", "Posted Yesterday", "Posted 30+ Days Ago"
+_DAYS_AGO = re.compile(r'(\d+)\+?\s+days?\s+ago', re.IGNORECASE)
+
+
+def _lookup(job, path: Optional[str]):
+    """Value at a dotted path ("location.name", "offices.0.name"), or None"""
+    if not path:
+        return None
+    value = job
+    for key in path.split('.'):
+        if isinstance(value, list) and key.isdigit():
+            value = value[int(key)] if int(key) < len(value) else None
+        elif isinstance(value, dict):
+            value = value.get(key)
+        else:
+            return None
+        if value is None:
+            return None
+    return value
+
+
+def _to_text(value) -> str:
+    """Plain text from a string that may hold (escaped) HTML"""
+    if not value:
+        return ''
+    text = str(value)
+    if '<' in text or '&lt;' in text:
+        text = _TAGS.sub(' ', unescape(unescape(text)))
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def _to_date(value) -> Optional[datetime]:
+    if isinstance(value, (int, float)):
+        # Epoch milliseconds (Lever) or seconds
+        return datetime.fromtimestamp(value / 1000 if value > 1e11 else value, timezone.utc)
+    if not isinstance(value, str):
+        return None
+    lowered = value.lower()
+    if 'today' in lowered:
+        return utc_now()
+    if 'yesterday' in lowered:
+        return utc_now() - timedelta(days=1)
+    match = _DAYS_AGO.search(value)
+    if match:
+        return utc_now() - timedelta(days=int(match.group(1)))
+    return parse_date(value)
+
+
+def create_adapter() -> HTTPAdapter:
+    """Connection pool shared by every ATS scraper of a crawl"""
+    # Same policy as BaseScraper sessions, but also retrying POST: Workday searches are reads
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=None)
+    return HTTPAdapter(pool_connections=len(ATS_TYPES), pool_maxsize=POOL_MAXSIZE, max_retries=retries)
+
+
+class ATSScraper(BaseScraper):
+    """Scraper for a company's board on a hosted ATS (Greenhouse, Lever, Ashby, Workday).
+
+    Driven by a config entry instead of code: the public JSON job API of each ATS
+    is fetched and mapped to postings field by field. Instances are built by
+    load_boards(), not by plain scraper discovery.
+    """
+
+    # load_scrapers skips scraper classes that can't be built without arguments
+    requires_config = True
+
+    def __init__(self, config: Dict, adapter: Optional[HTTPAdapter] = None):
+        ats = config.get('ats')
+        if ats not in ATS_TYPES:
+            raise ValueError(f"Unknown ATS {ats!r}; expected one of {', '.join(ATS_TYPES)}")
+        if not config.get('company') or not config.get('board'):
+            raise ValueError("ATS board needs 'company' and 'board'")
+        if ats == 'workday' and not (config.get('host') and config.get('site')):
+            raise ValueError("Workday board needs 'host' and 'site'")
+
+        self.config = config
+        self.ats = ats
+        self.fields = dict(ATS_TYPES[ats]['fields'], **config.get('fields', {}))
+        self.adapter = adapter
+        super().__init__()
+        self.enabled = config.get('enabled', True)
+
+    def get_company_name(self) -> str:
+        return self.config['company']
+
+    def get_careers_url(self) -> str:
+        return ATS_TYPES[self.ats]['url'].format(**self.config)
+
+    def _create_session(self):
+        session = super()._create_session()
+        # Share connections across boards; a recording/replaying session keeps its cassette
+        if self.adapter is not None and self.cassette is None:
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+        return session
+
+    def iter_postings(self) -> Iterator[Dict]:
+        try:
+            if self.ats == 'workday':
+                yield from self._iter_workday()
+                return
+
+            with stage_timer("fetch", self.company_name):
+                response = self.session.get(self.careers_url, headers={'Accept': 'application/json'},
+                                            timeout=self.request_timeout)
+                response.raise_for_status()
+            with stage_timer("parse", self.company_name):
+                payload = response.json()
+                jobs_path = ATS_TYPES[self.ats]['jobs']
+                positions = self._parse_jobs(_lookup(payload, jobs_path) if jobs_path else payload)
+            yield from positions
+        except Exception as e:
+            logger.error("Error scraping: %s", e, extra={'scraper': self.company_name, 'stage': 'fetch'})
+            self.record_error(e)
+
+    def _iter_workday(self) -> Iterator[Dict]:
+        """Page through Workday's search, filtered server-side to intern roles"""
+        offset = 0
+        total = None
+        for _ in range(WORKDAY_MAX_PAGES):
+            with stage_timer("fetch", self.company_name):
+                response = self.session.post(
+                    self.careers_url,
+                    json={'appliedFacets': {}, 'limit': WORKDAY_PAGE_SIZE, 'offset': offset, 'searchText': 'intern'},
+                    headers={'Accept': 'application/json'},
+                    timeout=self.request_timeout
+                )
+                response.raise_for_status()
+            with stage_timer("parse", self.company_name):
+                page = response.json()
+                jobs = page.get('jobPostings') or []
+                # Only the first page reliably carries the total
+                total = page.get('total') or total
+                positions = self._parse_jobs(jobs)
+            yield from positions
+
+            offset += len(jobs)
+            if len(jobs) < WORKDAY_PAGE_SIZE or (total is not None and offset >= total):
+                break
+
+    def _job_url(self, url: Optional[str]) -> str:
+        if url and self.ats == 'workday' and not url.startswith('http'):
+            return f"https://{self.config['host']}/en-US/{self.config['site']}{url}"
+        return url or ''
+
+    def _parse_jobs(self, jobs: Optional[List[Dict]]) -> List[Dict]:
+        jobs = [job for job in jobs or [] if isinstance(job, dict)]
+        titles = [str(_lookup(job, self.fields['title']) or '') for job in jobs]
+        keep = self.filter_internships(titles)
+
+        positions = []
+        for job, title, is_internship in zip(jobs, titles, keep):
+            url = self._job_url(_lookup(job, self.fields['url']))
+            if not is_internship or not url:
+                continue
+            positions.append({
+                'title': title,
+                'location': str(_lookup(job, self.fields['location']) or ''),
+                'url': url,
+                'posted_date': _to_date(_lookup(job, self.fields['posted_date'])),
+                'description': _to_text(_lookup(job, self.fields.get('description'))),
+                'requirements': []
+            })
+        return positions
+
+
+def load_boards(path: Optional[str] = None, adapter: Optional[HTTPAdapter] = None) -> List[ATSScraper]:
+    """ATS scrapers for every valid entry of the board config (CRAWLER_ATS_CONFIG).
+
+    Returns an empty list when there is no config. Invalid entries are logged and skipped.
+    """
+    path = path or os.environ.get(ATS_CONFIG_ENV) or DEFAULT_ATS_CONFIG
+    if not os.path.exists(path):
+        return []
+
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+
+    adapter = adapter or create_adapter()
+    scrapers = []
+    for entry in entries:
+        try:
+            scrapers.append(ATSScraper(entry, adapter=adapter))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error("Invalid ATS board: %s", e, extra={'stage': 'load', 'entry': entry})
+    return scrapers
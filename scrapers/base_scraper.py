@@ -1,17 +1,179 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from datetime import datetime
+import re
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from utils.cassette import Cassette
+from utils.classifier import InternshipClassifier, default_classifier
+from utils.parse_pool import ParsePool
+
+# Optional fast HTML backends: selectolax (Lexbor/Modest, C) or lxml under BeautifulSoup
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    BS4_PARSER = 'lxml'
+except ImportError:
+    BS4_PARSER = 'html.parser'
+
+# "tag", ".class", "tag.class.other" - selectors we can match without a CSS engine
+_SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)$')
+
+
+def _parse_simple_selector(selector: str):
+    """Return (tag, classes) for a simple selector, or None if it needs a CSS engine"""
+    match = _SIMPLE_SELECTOR.match(selector.strip())
+    if not match or not any(match.groups()):
+        return None
+    tag, classes = match.groups()
+    return tag, set(c for c in classes.split('.') if c)
+
+
+def _split_field_selector(selector: str):
+    """Split 'a@href' into ('a', 'href'); plain selectors extract text"""
+    if '@' in selector:
+        css, attr = selector.rsplit('@', 1)
+        return css, attr
+    return selector, None
+
+
+def parse_html_cards(html: str, card_selector: str, fields: Dict[str, str],
+                     backend: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
+    """Extract fields from every job card on a listing page.
+
+    Only the job-card subtrees are built (selectolax, or BeautifulSoup with a
+    SoupStrainer), and each card's fields are found in a single walk over it.
+
+    Args:
+        html: Page markup
+        card_selector: CSS selector (comma-separated alternatives) for job cards
+        fields: Field name -> CSS selector; suffix with '@attr' to read an attribute
+            instead of the text, e.g. {'title': 'h3, h2', 'url': 'a@href'}
+        backend: 'selectolax' or 'bs4'; defaults to the fastest installed
+
+    Returns:
+        One dict per card mapping field names to stripped strings (None if missing)
+    """
+    backend = backend or ('selectolax' if HTMLParser is not None else 'bs4')
+    if backend == 'selectolax' and HTMLParser is not None:
+        return _parse_cards_selectolax(html, card_selector, fields)
+    return _parse_cards_bs4(html, card_selector, fields)
+
+
+def parse_html_file(path: str, card_selector: str, fields: Dict[str, str],
+                    backend: Optional[str] = None, encoding: str = 'utf-8') -> List[Dict[str, Optional[str]]]:
+    """parse_html_cards for a page spooled to disk; runs in ParsePool workers"""
+    with open(path, 'rb') as f:
+        html = f.read().decode(encoding, errors='replace')
+    return parse_html_cards(html, card_selector, fields, backend)
+
+
+def _parse_cards_selectolax(html: str, card_selector: str, fields: Dict[str, str]):
+    compiled = {name: _split_field_selector(selector) for name, selector in fields.items()}
+    cards = []
+    for card in HTMLParser(html).css(card_selector):
+        values = {}
+        for name, (css, attr) in compiled.items():
+            node = card.css_first(css)
+            if node is None:
+                values[name] = None
+            elif attr:
+                values[name] = node.attributes.get(attr)
+            else:
+                values[name] = node.text().strip()
+        cards.append(values)
+    return cards
+
+
+def _parse_cards_bs4(html: str, card_selector: str, fields: Dict[str, str]):
+    from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+    # Only build subtrees whose root could be a card: a superset filter on class
+    # (or tag) names, narrowed to exact matches by the CSS select below
+    card_parts = [_parse_simple_selector(part) for part in card_selector.split(',')]
+    strainer = None
+    if all(part and part[1] for part in card_parts):
+        card_classes = set().union(*(part[1] for part in card_parts))
+        strainer = SoupStrainer(class_=lambda value: bool(value) and not card_classes.isdisjoint(
+            value.split() if isinstance(value, str) else value))
+    elif all(part and part[0] and not part[1] for part in card_parts):
+        strainer = SoupStrainer([part[0] for part in card_parts])
+
+    soup = BeautifulSoup(html, BS4_PARSER, parse_only=strainer)
+
+    # Fields made of simple selectors are matched during one walk over each card;
+    # anything more complex falls back to select_one
+    simple_fields = {}
+    complex_fields = {}
+    for name, selector in fields.items():
+        css, attr = _split_field_selector(selector)
+        parts = [_parse_simple_selector(part) for part in css.split(',')]
+        if all(parts):
+            simple_fields[name] = (parts, attr)
+        else:
+            complex_fields[name] = (css, attr)
+
+    def value_of(element, attr):
+        if element is None:
+            return None
+        if attr:
+            value = element.get(attr)
+            return ' '.join(value) if isinstance(value, list) else value
+        return element.get_text().strip()
+
+    cards = []
+    for card in soup.select(card_selector):
+        values = {name: None for name in fields}
+        pending = dict(simple_fields)
+        for element in card.descendants:
+            if not pending:
+                break
+            if not isinstance(element, Tag):
+                continue
+            element_classes = element.get('class') or []
+            for name, (parts, attr) in list(pending.items()):
+                if any((not tag or element.name == tag) and classes.issubset(element_classes)
+                       for tag, classes in parts):
+                    values[name] = value_of(element, attr)
+                    del pending[name]
+        for name, (css, attr) in complex_fields.items():
+            values[name] = value_of(card.select_one(css), attr)
+        cards.append(values)
+    return cards
+
 
 class BaseScraper(ABC):
     """Base class that all company scrapers must inherit from"""
     
+    # HTML parsing backend for parse_html_cards: None picks the fastest installed
+    # ('selectolax' if available, else 'bs4'); set per scraper to force one
+    html_backend = None
+    
+    # Title classifier; override with a configured InternshipClassifier per scraper
+    classifier: InternshipClassifier = default_classifier
+    
+    # Set by CrawlerManager when parsing is offloaded to worker processes (see ParsePool)
+    parse_pool: Optional[ParsePool] = None
+    
+    # Seconds to wait for an HTTP response / a browser navigation. These are the upper
+    # bounds; ScraperHealth lowers them per instance from observed latencies
+    request_timeout: float = 10.0
+    navigation_timeout: float = 45.0
+    
     def __init__(self):
         self.company_name = self.get_company_name()
         self.careers_url = self.get_careers_url()
         self.enabled = True
+        # Per-run counters recorded into the crawl history (see CrawlerManager)
+        self.stats = {}
+        self.reset_stats()
+        # Record/replay of responses and DOM snapshots, when enabled (see utils.cassette)
+        self.cassette = Cassette.from_env(self.company_name)
         # Shared requests session for all scrapers with retries and a default User-Agent
         self.session = self._create_session()
     
@@ -25,13 +187,16 @@ class BaseScraper(ABC):
         """Return the careers page URL"""
         pass
     
-    @abstractmethod
-    def scrape(self) -> List[Dict]:
+    def iter_postings(self) -> Iterator[Dict]:
         """
-        Scrape internship positions and return standardized data
+        Yield internship positions as they are scraped, in standardized form
+        
+        Scrapers should implement this (preferred) or scrape(). Postings flow into the
+        crawl pipeline as soon as they are yielded, so persistence and notification
+        start before the scraper finishes.
         
-        Returns:
-            List of dicts with keys:
+        Yields:
+            Dicts with keys:
             - title: str
             - location: str
             - url: str
@@ -39,12 +204,61 @@ class BaseScraper(ABC):
             - description: str (optional)
             - requirements: List[str] (optional)
         """
-        pass
+        if type(self).scrape is BaseScraper.scrape:
+            raise NotImplementedError(f"{type(self).__name__} must implement iter_postings() or scrape()")
+        yield from self.scrape()
+    
+    def scrape(self) -> List[Dict]:
+        """Scrape internship positions and return them as a list (see iter_postings)"""
+        return list(self.iter_postings())
     
     def is_internship(self, title: str) -> bool:
         """Helper to check if a position is an internship"""
-        keywords = ['intern', 'internship', 'co-op', 'coop', 'summer']
-        return any(keyword in title.lower() for keyword in keywords)
+        return self.classifier.is_internship(title)
+
+    def filter_internships(self, titles: List[str]) -> List[bool]:
+        """Classify a batch of titles at once, before extracting anything else per card"""
+        return self.classifier.classify_batch(titles)
+
+    def parse_html_cards(self, html: str, card_selector: str, fields: Dict[str, str],
+                         backend: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
+        """Extract fields from every job card on a listing page (see parse_html_cards)"""
+        return parse_html_cards(html, card_selector, fields, backend or self.html_backend)
+
+    def parse_html_response(self, response, card_selector: str, fields: Dict[str, str],
+                            backend: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
+        """parse_html_cards for a fetched page, in a worker process if a parse pool is set"""
+        backend = backend or self.html_backend
+        if self.offload_parsing:
+            encoding = response.encoding or 'utf-8'
+            path = self.parse_pool.spool_response(response, suffix='.html')
+            return self.parse_pool.parse(parse_html_file, path, card_selector, fields, backend, encoding)
+        return parse_html_cards(response.text, card_selector, fields, backend)
+
+    @property
+    def offload_parsing(self) -> bool:
+        """Whether fetched payloads should be parsed in the parse pool's worker processes"""
+        return self.parse_pool is not None and self.parse_pool.enabled
+
+    def reset_stats(self):
+        """Reset the per-run counters before a scrape"""
+        self.stats = {'bytes_fetched': 0, 'errors': 0, 'request_seconds': [], 'navigation_seconds': []}
+
+    def record_error(self, error: Exception):
+        """Count an error that the scraper recovered from"""
+        self.stats['errors'] += 1
+        self.stats['last_error'] = str(error)[:500]
+
+    def _count_bytes(self, response, *args, **kwargs):
+        """Session response hook tracking bytes fetched without forcing streamed bodies"""
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit():
+            self.stats['bytes_fetched'] += int(length)
+        elif not kwargs.get('stream'):
+            self.stats['bytes_fetched'] += len(response.content or b'')
+        # Time to response headers; replayed responses have none
+        if self.cassette is None or not self.cassette.replaying:
+            self.stats['request_seconds'].append(response.elapsed.total_seconds())
 
     def _create_session(self) -> requests.Session:
         """Create a requests.Session configured with retries and sensible headers.
@@ -55,8 +269,9 @@ class BaseScraper(ABC):
         session.headers.update({'User-Agent': 'InternshipCrawler/1.0 (+https://example.com)'} )
 
         retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
-        adapter = HTTPAdapter(max_retries=retries)
+        adapter = self.cassette.adapter(max_retries=retries) if self.cassette else HTTPAdapter(max_retries=retries)
         session.mount('https://', adapter)
         session.mount('http://', adapter)
+        session.hooks['response'].append(self._count_bytes)
 
         return session
\ No newline at end of file
@@ -1,14 +1,22 @@
-from typing import List, Dict
-from datetime import datetime
-from scrapers.base_scraper import BaseScraper
+from typing import List, Dict, Iterator, Optional
+import logging
+from scrapers.base_scraper import BS4_PARSER, BaseScraper
+from utils.classifier import InternshipClassifier
+from utils.dates import utc_now
+from utils.metrics import stage_timer
 import time
 
+logger = logging.getLogger(__name__)
+
+# Cassette name of the fully scrolled results page
+RESULTS_SNAPSHOT = "results"
+
 try:
     from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
     PLAYWRIGHT_AVAILABLE = True
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
-    print("WARNING: Playwright not installed. Install with: pip install playwright && playwright install chromium")
+    logger.warning("Playwright not installed. Install with: pip install playwright && playwright install chromium")
 
 
 class GoogleScraper(BaseScraper):
@@ -20,124 +28,239 @@ class GoogleScraper(BaseScraper):
         # Updated URL with correct filter for internships
         return "https://www.google.com/about/careers/applications/jobs/results?target_level=INTERN_AND_APPRENTICE"
 
-    def scrape(self) -> List[Dict]:
-        """Scrape Google Careers for internships."""
+    def iter_postings(self) -> Iterator[Dict]:
+        """Scrape Google Careers for internships, yielding each as its card is parsed."""
+
+        if self.cassette is not None and self.cassette.replaying:
+            yield from self._replay_results()
+            return
 
         if not PLAYWRIGHT_AVAILABLE:
-            print(f"  ⚠️ Playwright not available, skipping {self.company_name}")
-            return []
+            logger.warning("Playwright not available, skipping", extra={'scraper': self.company_name})
+            return
 
-        positions = []
+        found = 0
 
         try:
             with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+                with stage_timer("browser_startup", self.company_name):
+                    browser = p.chromium.launch(headless=True)
+                    page = browser.new_page()
 
-                print(f"  → Navigating to {self.careers_url}")
-                page.goto(self.careers_url, timeout=45000)
+                logger.debug("Navigating", extra={'scraper': self.company_name, 'url': self.careers_url})
+                with stage_timer("fetch", self.company_name):
+                    navigation_start = time.perf_counter()
+                    try:
+                        page.goto(self.careers_url, timeout=self.navigation_timeout * 1000)
+                    finally:
+                        # Timed-out navigations count too, so a slowing site raises its timeout
+                        self.stats['navigation_seconds'].append(time.perf_counter() - navigation_start)
 
-                # Wait for job cards to load
-                try:
-                    page.wait_for_selector("li.lLd3Je", timeout=15000)
-                    time.sleep(2)  # Extra wait for dynamic content
-                except PlaywrightTimeout:
-                    print("  ⚠️ Timed out waiting for job cards.")
-                    browser.close()
-                    return []
+                    # Wait for job cards to load
+                    try:
+                        page.wait_for_selector("li.lLd3Je", timeout=15000)
+                        time.sleep(2)  # Extra wait for dynamic content
+                    except PlaywrightTimeout as e:
+                        logger.warning("Timed out waiting for job cards", extra={'scraper': self.company_name, 'stage': 'fetch'})
+                        self.record_error(e)
+                        browser.close()
+                        return
 
                 # -------------------------------
                 #       AUTO-SCROLL TO LOAD JOBS
                 # -------------------------------
-                print("  → Scrolling to load jobs...")
+                logger.debug("Scrolling to load jobs", extra={'scraper': self.company_name, 'stage': 'scroll'})
 
-                last_count = 0
-                for scroll_attempt in range(20):  # up to 20 scroll cycles
-                    page.mouse.wheel(0, 5000)
-                    time.sleep(1.5)
+                with stage_timer("scroll", self.company_name):
+                    last_count = self._scroll_to_load(page)
 
-                    current_count = page.locator("li.lLd3Je").count()
-                    
-                    if current_count == last_count and scroll_attempt > 3:
-                        break
-                    last_count = current_count
+                logger.debug("Loaded job cards", extra={'scraper': self.company_name, 'stage': 'scroll', 'count': last_count})
 
-                print(f"  → Loaded {last_count} job cards.")
+                if self.cassette is not None and self.cassette.recording:
+                    self.cassette.record_dom(RESULTS_SNAPSHOT, page.content())
 
                 # -------------------------------
                 #      PARSE EACH JOB CARD
                 # -------------------------------
                 
-                job_cards = page.locator("li.lLd3Je").all()
-                print(f"  → Found {len(job_cards)} job listings to parse.")
+                if self.offload_parsing:
+                    # Snapshot the loaded DOM and parse it in a worker process
+                    with stage_timer("parse", self.company_name):
+                        path = self.parse_pool.spool([page.content().encode('utf-8')], suffix='.html')
+                        browser.close()
+                        positions = self.parse_pool.parse(parse_cards_file, path, self.classifier)
+                    found = len(positions)
+                    yield from positions
+                    logger.info("Extracted internship positions", extra={'scraper': self.company_name, 'stage': 'parse', 'count': found})
+                    return
 
-                for i, card in enumerate(job_cards):
-                    try:
-                        # Extract title from h3.QJPWVe
-                        title = card.locator("h3.QJPWVe").inner_text(timeout=2000).strip()
+                with stage_timer("parse", self.company_name):
+                    job_cards = page.locator("li.lLd3Je").all()
+                    logger.debug("Parsing job listings", extra={'scraper': self.company_name, 'stage': 'parse', 'count': len(job_cards)})
 
-                        # Internship filter
-                        if not self.is_internship(title):
-                            continue
+                    # Classify every title up front so non-internship cards cost no further locator calls
+                    titles = self._card_titles(page, job_cards)
+                    keep = self.filter_internships(titles)
 
-                        # Extract location from span.pwO9Dc
-                        location = "Not specified"
-                        try:
-                            # Get all location spans
-                            location_container = card.locator("span.pwO9Dc").first
-                            location_parts = location_container.locator("span.r0wTof").all()
-                            
-                            if location_parts:
-                                locations = [loc.inner_text(timeout=1000).strip() for loc in location_parts]
-                                # Check if there are more locations
-                                more_indicator = location_container.locator("span.BVHzed, span.Z2gFhf").count()
-                                if more_indicator > 0:
-                                    location = f"{'; '.join(locations[:2])}; +"
-                                else:
-                                    location = "; ".join(locations)
-                            else:
-                                # Fallback to getting all text
-                                location = location_container.inner_text(timeout=1000).strip()
-                        except:
-                            pass
-
-                        # Extract URL from the anchor tag with class WpHeLc
-                        link = ""
-                        try:
-                            link = card.locator("a.WpHeLc").get_attribute("href", timeout=2000)
-                        except:
+                    for i, (card, title, is_internship) in enumerate(zip(job_cards, titles, keep)):
+                        if not is_internship:
                             continue
-
-                        if not link:
+                        try:
+                            position = self._parse_card(card, title)
+                        except Exception as e:
+                            logger.warning("Error parsing card %d: %s", i, e, extra={'scraper': self.company_name, 'stage': 'parse'})
+                            self.record_error(e)
                             continue
 
-                        # Handle relative URLs
-                        if link.startswith("/"):
-                            url = f"https://www.google.com{link}"
-                        elif not link.startswith("http"):
-                            url = f"https://www.google.com/about/careers/applications/{link}"
-                        else:
-                            url = link
-
-                        positions.append({
-                            "title": title,
-                            "location": location,
-                            "url": url,
-                            "posted_date": datetime.now(),   # Google doesn't expose posted dates in list
-                            "description": "",
-                            "requirements": []
-                        })
-
-                        print(f"  ✓ Found: {title[:50]}...")
-
-                    except Exception as e:
-                        print(f"  ⚠️ Error parsing card {i}: {e}")
-                        continue
+                        if position:
+                            found += 1
+                            yield position
+                            logger.debug("Found position", extra={'scraper': self.company_name, 'title': position['title']})
 
                 browser.close()
-                print(f"  ✓ Extracted {len(positions)} internship positions.")
+                logger.info("Extracted internship positions", extra={'scraper': self.company_name, 'stage': 'parse', 'count': found})
 
         except Exception as e:
-            print(f"  ✗ Error scraping {self.company_name}: {e}")
+            logger.error("Error scraping: %s", e, extra={'scraper': self.company_name})
+            self.record_error(e)
+
+    def _replay_results(self) -> Iterator[Dict]:
+        """Parse the results page recorded in the cassette instead of launching a browser"""
+        html = self.cassette.dom(RESULTS_SNAPSHOT)
+        if html is None:
+            logger.warning("No recorded results page", extra={'scraper': self.company_name, 'path': self.cassette.path})
+            self.record_error(LookupError(RESULTS_SNAPSHOT))
+            return
+
+        with stage_timer("parse", self.company_name):
+            positions = parse_cards(html, self.classifier)
+        logger.info("Extracted internship positions", extra={'scraper': self.company_name, 'stage': 'parse', 'count': len(positions)})
+        yield from positions
+
+    def _scroll_to_load(self, page) -> int:
+        """Scroll the results list until no new job cards appear; returns the card count"""
+        last_count = 0
+        for scroll_attempt in range(20):  # up to 20 scroll cycles
+            page.mouse.wheel(0, 5000)
+            time.sleep(1.5)
+
+            current_count = page.locator("li.lLd3Je").count()
+            
+            if current_count == last_count and scroll_attempt > 3:
+                break
+            last_count = current_count
+
+        return last_count
+
+    def _card_titles(self, page, job_cards) -> List[str]:
+        """Read every card's title (h3.QJPWVe) in one round trip, per card if that misaligns"""
+        titles = page.locator("li.lLd3Je h3.QJPWVe").all_inner_texts()
+        if len(titles) == len(job_cards):
+            return [title.strip() for title in titles]
+
+        titles = []
+        for i, card in enumerate(job_cards):
+            try:
+                titles.append(card.locator("h3.QJPWVe").inner_text(timeout=2000).strip())
+            except Exception as e:
+                logger.warning("Error reading title of card %d: %s", i, e, extra={'scraper': self.company_name, 'stage': 'parse'})
+                self.record_error(e)
+                titles.append("")
+        return titles
+
+    def _parse_card(self, card, title: str) -> Optional[Dict]:
+        """Extract a position from a job card whose title passed the internship filter"""
+        # Extract location from span.pwO9Dc
+        location = "Not specified"
+        try:
+            # Get all location spans
+            location_container = card.locator("span.pwO9Dc").first
+            location_parts = location_container.locator("span.r0wTof").all()
+            
+            if location_parts:
+                locations = [loc.inner_text(timeout=1000).strip() for loc in location_parts]
+                # Check if there are more locations
+                more_indicator = location_container.locator("span.BVHzed, span.Z2gFhf").count()
+                location = _join_locations(locations, more_indicator > 0)
+            else:
+                # Fallback to getting all text
+                location = location_container.inner_text(timeout=1000).strip()
+        except:
+            pass
+
+        # Extract URL from the anchor tag with class WpHeLc
+        try:
+            link = card.locator("a.WpHeLc").get_attribute("href", timeout=2000)
+        except:
+            return None
+
+        return _position(title, location, link)
+
+
+def parse_cards_file(path: str, classifier: InternshipClassifier) -> List[Dict]:
+    """Parse a saved results page into internship positions; runs in ParsePool workers"""
+    with open(path, encoding='utf-8') as f:
+        return parse_cards(f.read(), classifier)
+
+
+def parse_cards(html: str, classifier: InternshipClassifier) -> List[Dict]:
+    """Parse a rendered results page into internship positions"""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, BS4_PARSER, parse_only=SoupStrainer('li', class_='lLd3Je'))
+
+    cards = soup.select('li.lLd3Je')
+    titles = []
+    for card in cards:
+        heading = card.select_one('h3.QJPWVe')
+        titles.append(heading.get_text().strip() if heading else '')
+
+    positions = []
+    for card, title, is_internship in zip(cards, titles, classifier.classify_batch(titles)):
+        if not is_internship:
+            continue
+
+        location = "Not specified"
+        location_container = card.select_one('span.pwO9Dc')
+        if location_container is not None:
+            location_parts = location_container.select('span.r0wTof')
+            if location_parts:
+                more = location_container.select_one('span.BVHzed, span.Z2gFhf') is not None
+                location = _join_locations([loc.get_text().strip() for loc in location_parts], more)
+            else:
+                location = location_container.get_text().strip()
+
+        link = card.select_one('a.WpHeLc')
+        position = _position(title, location, link.get('href') if link else None)
+        if position:
+            positions.append(position)
+
+    return positions
+
+
+def _join_locations(locations: List[str], more: bool) -> str:
+    if more:
+        return f"{'; '.join(locations[:2])}; +"
+    return "; ".join(locations)
+
+
+def _position(title: str, location: str, link: Optional[str]) -> Optional[Dict]:
+    if not link:
+        return None
+
+    # Handle relative URLs
+    if link.startswith("/"):
+        url = f"https://www.google.com{link}"
+    elif not link.startswith("http"):
+        url = f"https://www.google.com/about/careers/applications/{link}"
+    else:
+        url = link
 
-        return positions
\ No newline at end of file
+    return {
+        "title": title,
+        "location": location,
+        "url": url,
+        "posted_date": utc_now(),   # Google doesn't expose posted dates in list
+        "description": "",
+        "requirements": []
+    }
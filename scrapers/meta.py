@@ -1,14 +1,57 @@
-from datetime import datetime
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
 import json
+import logging
 from urllib.parse import urljoin
 
 try:
-    from dateutil import parser as date_parser
-except Exception:
-    date_parser = None
+    import ijson
+    JSON_ERRORS = (ValueError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    JSON_ERRORS = (ValueError,)
 
 from scrapers.base_scraper import BaseScraper
+from utils.classifier import InternshipClassifier
+from utils.dates import parse_date
+from utils.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+# Meta uses a GraphQL backend (POST to /api/graphql/)
+GRAPHQL_URL = 'https://www.metacareers.com/api/graphql/'
+
+# GraphQL query - filters can be customized
+GRAPHQL_QUERY = '''
+query($search_term: String, $location: String, $first: Int, $offset: Int) {
+  jobs(filters: {search_term: $search_term, location: $location}, first: $first, offset: $offset) {
+    id
+    title
+    location
+    apply_url
+    posted_date
+    description
+  }
+}
+'''
+
+INLINE_QUERY = '''{ jobs(filters: {search_term: "intern", location: ""}, first: %(first)d, offset: %(offset)d) { id title location apply_url posted_date description } }'''
+
+# Careers page fallback: job cards and the fields extracted from each
+HTML_CARD_SELECTOR = '.job-card, .job-list-item, .search-result, li.job'
+HTML_CARD_FIELDS = {
+    'title': '.job-title, .title, h3, h2',
+    'url': 'a@href',
+    'location': '.job-location, .location',
+    'description': '.job-description',
+}
+
+# Jobs requested per page, pages fetched at once, and a hard cap on pages per crawl
+PAGE_SIZE = 100
+MAX_CONCURRENT_PAGES = 4
+MAX_PAGES = 50
+
+
 class MetaScraper(BaseScraper):
     
     def get_company_name(self) -> str:
@@ -17,31 +60,9 @@ class MetaScraper(BaseScraper):
     def get_careers_url(self) -> str:
         return "https://www.metacareers.com/jobsearch?roles[0]=Internship"
     
-    def scrape(self) -> List[Dict]:
-        """Scrape Meta's careers page"""
-        positions = []
-        
+    def iter_postings(self) -> Iterator[Dict]:
+        """Scrape Meta's careers page, yielding positions page by page"""
         try:
-            # Meta uses a GraphQL backend (POST to /api/graphql/)
-            api_url = 'https://www.metacareers.com/api/graphql/'
-
-            # GraphQL query - filters can be customized
-            query = '''
-            query($search: String, $location: String) {
-              jobs(filters: {search_term: $search, location: $location}) {
-                id
-                title
-                location
-                apply_url
-                posted_date
-                description
-              }
-            }
-            '''
-
-            # Try variables named to match service schema (e.g., search_term)
-            payload = {'query': query, 'variables': {'search_term': 'intern', 'location': ''}}
-
             headers = {
                 'Content-Type': 'application/json',
                 'Accept': 'application/json',
@@ -50,106 +71,209 @@ class MetaScraper(BaseScraper):
                 'Origin': 'https://www.metacareers.com'
             }
 
-            # Try initial GraphQL POST
-            response = None
-            last_exc = None
-            try:
-                response = self.session.post(api_url, data=json.dumps(payload), headers=headers, timeout=10)
-                response.raise_for_status()
-            except Exception as e:
-                last_exc = e
-
-                # Try a different payload style (inline query) and include common needed headers
-                inline_query = '''{ jobs(filters: {search_term: "intern", location: ""}) { id title location apply_url posted_date description } }'''
-                headers['Referer'] = self.careers_url
-                try:
-                    response = self.session.post(api_url, data=json.dumps({'query': inline_query}), headers=headers, timeout=10)
-                    response.raise_for_status()
-                except Exception as e2:
-                    last_exc = e2
-                    response = None
+            with stage_timer("fetch", self.company_name):
+                response, style, last_exc = self._post_graphql(headers, offset=0)
 
             if response is None:
                 # Give a helpful error message but don't crash the whole crawler
-                print(f"{self.company_name}: GraphQL query failed: {last_exc}")
+                logger.warning("GraphQL query failed: %s", last_exc, extra={'scraper': self.company_name, 'stage': 'fetch'})
+                self.record_error(last_exc)
                 # Fallback: attempt to scrape the careers URL HTML (best-effort)
                 try:
-                    html_resp = self.session.get(f"{self.careers_url}?q=intern", timeout=10)
-                    html_resp.raise_for_status()
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(html_resp.text, 'html.parser')
+                    with stage_timer("fetch_html", self.company_name):
+                        html_resp = self.session.get(f"{self.careers_url}?q=intern", timeout=self.request_timeout)
+                        html_resp.raise_for_status()
                     # heuristics: try a few common selectors
-                    possible_cards = soup.select('.job-card, .job-list-item, .search-result, li.job')
-                    for card in possible_cards:
-                        title_el = card.select_one('.job-title, .title, h3, h2')
-                        if not title_el:
+                    with stage_timer("parse_html", self.company_name):
+                        cards = self.parse_html_response(html_resp, HTML_CARD_SELECTOR, HTML_CARD_FIELDS)
+                    keep = self.filter_internships([card['title'] for card in cards])
+                    for card, is_internship in zip(cards, keep):
+                        if not is_internship:
                             continue
-                        title = title_el.text.strip()
-                        if not self.is_internship(title):
-                            continue
-                        url_el = card.select_one('a')
-                        url = url_el['href'] if url_el and url_el.get('href') else ''
+                        title = card['title']
+                        url = card['url'] or ''
                         if url and not url.startswith('http'):
                             url = urljoin(self.careers_url, url)
-                        loc_el = card.select_one('.job-location, .location')
 
-                        positions.append({
+                        yield {
                             'title': title,
-                            'location': loc_el.text.strip() if loc_el else '',
+                            'location': card['location'] or '',
                             'url': url,
                             'posted_date': None,
-                            'description': (card.select_one('.job-description').text.strip() if card.select_one('.job-description') else ''),
+                            'description': card['description'] or '',
                             'requirements': []
-                        })
+                        }
 
                 except Exception as html_err:
-                    print(f"{self.company_name}: HTML fallback failed: {html_err}")
-                return positions
+                    logger.error("HTML fallback failed: %s", html_err, extra={'scraper': self.company_name, 'stage': 'fetch_html'})
+                    self.record_error(html_err)
+                return
 
             try:
-                result = response.json()
-            except ValueError:
-                print(f"{self.company_name}: GraphQL response not JSON")
-                return positions
-
-            jobs = result.get('data', {}).get('jobs', [])
-
-            for job in jobs:
-                title = job.get('title', '')
-                if not self.is_internship(title):
-                    continue
-
-                posted_date = None
-                if job.get('posted_date'):
-                    parsed = None
-                    if date_parser:
-                        try:
-                            parsed = date_parser.parse(job['posted_date'])
-                        except Exception:
-                            parsed = None
-
-                    if parsed is None:
-                        try:
-                            parsed = datetime.fromisoformat(job['posted_date'])
-                        except Exception:
-                            parsed = None
-
-                    posted_date = parsed
-
-                url = job.get('apply_url') or job.get('url') or job.get('id')
-                if url and not url.startswith('http'):
-                    url = urljoin(self.careers_url, url)
-
-                positions.append({
-                    'title': title,
-                    'location': job.get('location', ''),
-                    'url': url,
-                    'posted_date': posted_date,
-                    'description': job.get('description', '') or '',
-                    'requirements': []
-                })
+                with stage_timer("parse", self.company_name):
+                    first_page, keys = self._parse_page(response)
+            except JSON_ERRORS as e:
+                logger.error("GraphQL response not JSON", extra={'scraper': self.company_name, 'stage': 'parse'})
+                self.record_error(e)
+                return
+
+            seen = set(keys)
+            yield from first_page
+
+            if len(keys) >= PAGE_SIZE:
+                yield from self._iter_remaining_pages(headers, style, seen)
         
         except Exception as e:
-            print(f"Error scraping {self.company_name}: {e}")
-        
-        return positions
\ No newline at end of file
+            logger.error("Error scraping: %s", e, extra={'scraper': self.company_name})
+            self.record_error(e)
+
+    def _iter_remaining_pages(self, headers: Dict, style: str, seen: set) -> Iterator[Dict]:
+        """Fetch pages after the first in windows of MAX_CONCURRENT_PAGES concurrent requests.
+
+        Paging stops at the first short page, at a page that adds no unseen jobs (the
+        server ignored the offset), on error, or after MAX_PAGES.
+        """
+        offset = PAGE_SIZE
+        pages = 1
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PAGES) as pool:
+            more = True
+            while more and pages < MAX_PAGES:
+                window = [offset + i * PAGE_SIZE for i in range(min(MAX_CONCURRENT_PAGES, MAX_PAGES - pages))]
+                futures = [pool.submit(self._fetch_page, headers, style, page_offset) for page_offset in window]
+
+                # Consume in offset order so the stop conditions see pages in sequence
+                for future in futures:
+                    try:
+                        page_positions, keys = future.result()
+                    except Exception as e:
+                        logger.warning("GraphQL page failed: %s", e, extra={'scraper': self.company_name, 'stage': 'fetch'})
+                        self.record_error(e)
+                        more = False
+                        break
+
+                    new_keys = set(keys) - seen
+                    seen.update(new_keys)
+                    yield from (p for p in page_positions if p['url'] in new_keys)
+
+                    if len(keys) < PAGE_SIZE or not new_keys:
+                        more = False
+                        break
+
+                offset += len(window) * PAGE_SIZE
+                pages += len(window)
+
+    def _fetch_page(self, headers: Dict, style: str, offset: int):
+        """Fetch and parse a single page with the query style that worked for the first page"""
+        with stage_timer("fetch", self.company_name):
+            response, _, last_exc = self._post_graphql(headers, offset, styles=(style,))
+        if response is None:
+            raise last_exc
+        with stage_timer("parse", self.company_name):
+            return self._parse_page(response)
+
+    def _parse_page(self, response):
+        """Parse a GraphQL page into (internship positions, keys of every job on the page)"""
+        if self.offload_parsing:
+            path = self.parse_pool.spool_response(response, suffix='.json')
+            return self.parse_pool.parse(parse_graphql_file, path, self.careers_url, self.classifier)
+
+        try:
+            return _parse_jobs(self._iter_jobs(response), self.careers_url, self.classifier)
+        finally:
+            close = getattr(response, 'close', None)
+            if close:
+                close()
+
+    def _iter_jobs(self, response):
+        """Yield jobs from a GraphQL response.
+
+        With ijson installed, jobs are parsed incrementally from the streamed body so
+        memory stays bounded by one job rather than the whole response.
+        """
+        raw = getattr(response, 'raw', None)
+        if ijson is not None and hasattr(raw, 'read'):
+            raw.decode_content = True
+            yield from ijson.items(raw, 'data.jobs.item')
+            return
+
+        result = response.json()
+        yield from (result.get('data') or {}).get('jobs') or []
+
+    def _graphql_body(self, style: str, offset: int) -> Dict:
+        if style == 'variables':
+            # Try variables named to match service schema (e.g., search_term)
+            return {
+                'query': GRAPHQL_QUERY,
+                'variables': {'search_term': 'intern', 'location': '', 'first': PAGE_SIZE, 'offset': offset}
+            }
+        # Inline query for endpoints that reject variables
+        return {'query': INLINE_QUERY % {'first': PAGE_SIZE, 'offset': offset}}
+
+    def _post_graphql(self, headers: Dict, offset: int, styles=('variables', 'inline')):
+        """POST one page of the GraphQL query, trying each payload style in turn.
+
+        Returns (streamed response, style that worked, last_error).
+        """
+        last_exc = None
+        for style in styles:
+            if style == 'inline':
+                # Include common needed headers for the inline style
+                headers = dict(headers, Referer=self.careers_url)
+            try:
+                response = self.session.post(GRAPHQL_URL, data=json.dumps(self._graphql_body(style, offset)),
+                                             headers=headers, timeout=self.request_timeout, stream=True)
+                response.raise_for_status()
+                return response, style, None
+            except Exception as e:
+                last_exc = e
+
+        return None, None, last_exc
+
+
+def parse_graphql_file(path: str, careers_url: str, classifier: InternshipClassifier):
+    """Parse a GraphQL page spooled to disk; runs in ParsePool workers"""
+    with open(path, 'rb') as f:
+        if ijson is not None:
+            return _parse_jobs(ijson.items(f, 'data.jobs.item'), careers_url, classifier)
+        result = json.load(f)
+    return _parse_jobs((result.get('data') or {}).get('jobs') or [], careers_url, classifier)
+
+
+def _parse_jobs(jobs: Iterable[Dict], careers_url: str, classifier: InternshipClassifier):
+    """Turn GraphQL jobs into (internship positions, keys of every job)"""
+    positions = []
+    keys = []
+    for job in jobs:
+        url = _job_url(job, careers_url)
+        keys.append(url)
+
+        position = _position_from_job(job, url, classifier)
+        if position:
+            positions.append(position)
+
+    return positions, keys
+
+
+def _job_url(job: Dict, careers_url: str) -> str:
+    url = job.get('apply_url') or job.get('url') or job.get('id')
+    if url and not url.startswith('http'):
+        url = urljoin(careers_url, url)
+    return url
+
+
+def _position_from_job(job: Dict, url: str, classifier: InternshipClassifier) -> Optional[Dict]:
+    title = job.get('title', '')
+    if not classifier.is_internship(title):
+        return None
+
+    posted_date = parse_date(job.get('posted_date'))
+
+    return {
+        'title': title,
+        'location': job.get('location', ''),
+        'url': url,
+        'posted_date': posted_date,
+        'description': job.get('description', '') or '',
+        'requirements': []
+    }
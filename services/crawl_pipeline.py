@@ -0,0 +1,363 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import closing, nullcontext
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database.db import Database
+from models.internship import Internship
+from services.notification_service import NotificationService
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Postings buffered between the scrapers and persistence; a full queue pauses the scrapers
+POSTING_QUEUE_SIZE = 200
+# Persisted batches waiting for notification; a full queue pauses persistence
+NOTIFY_QUEUE_SIZE = 10
+# Postings per insert transaction
+BATCH_SIZE = 50
+# Flush a partial batch when no posting arrived for this long (seconds)
+FLUSH_INTERVAL = 5.0
+# Crawls a failed webhook batch is attempted in before it is dropped
+WEBHOOK_MAX_ROUNDS = 3
+
+_DONE = object()
+
+
+class ScraperFinished:
+    """Marker sent after a scraper's last posting, carrying its run statistics"""
+
+    def __init__(self, scraper, started_at: datetime, duration_seconds: float, items_seen: int):
+        self.scraper = scraper
+        self.started_at = started_at
+        self.duration_seconds = duration_seconds
+        self.items_seen = items_seen
+
+
+class CrawlPipeline:
+    """Streams postings through bounded stages:
+
+        scrapers -> normalize -> dedup -> batch persist -> enrich -> match users -> notify
+
+    Scrapers run in a producer thread, enrichment and notification in a consumer
+    thread, and persistence on the calling thread. Bounded queues between them provide
+    backpressure, so memory and time-to-first-notification depend on the batch and
+    queue sizes rather than on the size of the crawl. Only newly inserted postings
+    reach enrichment, so its steady-state cost is near zero.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        notification_service: NotificationService,
+        profiler=None,
+        enrichment_service=None,
+        health=None,
+        batch_size: int = BATCH_SIZE,
+        queue_size: int = POSTING_QUEUE_SIZE,
+        flush_interval: float = FLUSH_INTERVAL
+    ):
+        self.db = db
+        self.notification_service = notification_service
+        self.profiler = profiler
+        self.enrichment_service = enrichment_service
+        self.health = health
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self._stop = threading.Event()
+
+    def run(self, scrapers: Iterable, crawl_run_id: int) -> int:
+        """Run every scraper through the pipeline; returns the number of new internships
+
+        `scrapers` may be a lazy iterable, such as WorkQueue.iter_finished yielding
+        results from remote workers as they arrive.
+        """
+        self._stop.clear()
+        postings = queue.Queue(maxsize=self.queue_size)
+        notifications = queue.Queue(maxsize=NOTIFY_QUEUE_SIZE)
+
+        producer = threading.Thread(target=self._produce, args=(scrapers, postings),
+                                    name="crawl-scrapers", daemon=True)
+        notifier = threading.Thread(target=self._notify, args=(notifications,),
+                                    name="crawl-notifier", daemon=True)
+        producer.start()
+        notifier.start()
+
+        try:
+            with self._profile("persist", ""):
+                return self._persist(postings, notifications, crawl_run_id)
+        except BaseException:
+            # Unblock the producer so it can stop at its next posting
+            self._stop.set()
+            raise
+        finally:
+            self._put(notifications, _DONE, force=True)
+            producer.join()
+            notifier.join()
+
+    def _profile(self, phase: str, name: str):
+        return self.profiler.profile(phase, name) if self.profiler else nullcontext()
+
+    def _put(self, target: queue.Queue, item, force: bool = False) -> bool:
+        """Blocking put that gives up once the pipeline is stopping (unless forced)"""
+        while force or not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # ------------------------------------------------------------------
+    # Stage 1: scrapers (producer thread)
+    # ------------------------------------------------------------------
+
+    def _produce(self, scrapers: Iterable, postings: queue.Queue):
+        try:
+            for scraper in scrapers:
+                if self._stop.is_set():
+                    break
+                self._run_scraper(scraper, postings)
+        finally:
+            self._put(postings, _DONE)
+
+    def _run_scraper(self, scraper, postings: queue.Queue):
+        name = scraper.company_name
+        logger.info("Crawling", extra={'scraper': name, 'stage': 'scrape'})
+        scraper.reset_stats()
+        started_at = datetime.now()
+        start = time.perf_counter()
+        seen = 0
+
+        # Scrape time includes any time spent waiting on a full queue (backpressure)
+        try:
+            with metrics.stage_timer("scrape", name), self._profile("scrape", name), \
+                    closing(scraper.iter_postings()) as scraped:
+                for posting in scraped:
+                    seen += 1
+                    if not self._put(postings, (scraper, posting)):
+                        break
+        except Exception as e:
+            logger.error("Scraper failed: %s", e, extra={'scraper': name, 'stage': 'scrape'})
+            scraper.record_error(e)
+
+        # Results replayed from a remote worker carry the worker's own timing
+        duration = getattr(scraper, 'duration_seconds', None)
+        if duration is None:
+            duration = time.perf_counter() - start
+        started_at = getattr(scraper, 'started_at', None) or started_at
+        self._put(postings, ScraperFinished(scraper, started_at, duration, seen))
+
+    # ------------------------------------------------------------------
+    # Stages 2-4: normalize, dedup and batch persist (calling thread)
+    # ------------------------------------------------------------------
+
+    def _persist(self, postings: queue.Queue, notifications: queue.Queue, crawl_run_id: int) -> int:
+        batch: List[Internship] = []
+        batch_urls = set()
+        # Every posting seen per scraper this crawl, for the lifecycle diff: url -> (title, location).
+        # Only these fields are kept, so descriptions can be freed once their batch is saved
+        crawled: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        new_by_scraper: Dict[str, int] = {}
+        total_new = 0
+
+        def flush():
+            nonlocal batch, batch_urls, total_new
+            if not batch:
+                return
+            company = batch[0].company
+            with metrics.stage_timer("persist", company):
+                new_internships = self.db.save_internships(batch)
+            batch, batch_urls = [], set()
+
+            if new_internships:
+                new_by_scraper[company] = new_by_scraper.get(company, 0) + len(new_internships)
+                total_new += len(new_internships)
+                metrics.count_items(company, "new", len(new_internships))
+                for internship in new_internships:
+                    logger.debug("New internship", extra={'scraper': company, 'title': internship.title})
+                self._put(notifications, new_internships, force=True)
+
+        while True:
+            try:
+                item = postings.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # A slow scraper shouldn't hold back postings we already have
+                flush()
+                continue
+
+            if item is _DONE:
+                flush()
+                break
+
+            if isinstance(item, ScraperFinished):
+                flush()
+                name = item.scraper.company_name
+                self._record_scraper_run(crawl_run_id, item, new_by_scraper.get(name, 0))
+                self._sync_postings(item, [(url, title, location) for url, (title, location)
+                                           in crawled.pop(name, {}).items()])
+                if self.health is not None:
+                    self.health.record_run(name, item.items_seen, item.scraper.stats['errors'], item.scraper.stats)
+                continue
+
+            scraper, posting = item
+            internship = self._normalize(scraper, posting)
+            if internship is None:
+                continue
+            crawled.setdefault(internship.company, {})[internship.url] = (internship.title, internship.location)
+            if internship.url in batch_urls:
+                continue
+
+            # Duplicates across batches are caught by the url UNIQUE constraint
+            batch_urls.add(internship.url)
+            batch.append(internship)
+            if len(batch) >= self.batch_size:
+                flush()
+
+        logger.info("Persisted crawl results", extra={'stage': 'persist', 'new': total_new})
+        return total_new
+
+    def _normalize(self, scraper, posting: Dict) -> Optional[Internship]:
+        """Turn a scraped dict into an Internship, dropping postings without a title or URL"""
+        title = (posting.get('title') or '').strip()
+        url = (posting.get('url') or '').strip()
+        if not title or not url:
+            return None
+
+        try:
+            return Internship(
+                company=scraper.company_name,
+                **dict(posting, title=title, url=url, location=(posting.get('location') or '').strip())
+            )
+        except TypeError as e:
+            logger.warning("Skipping malformed posting: %s", e, extra={'scraper': scraper.company_name})
+            scraper.record_error(e)
+            return None
+
+    def _record_scraper_run(self, crawl_run_id: int, finished: ScraperFinished, items_new: int):
+        name = finished.scraper.company_name
+        stats = finished.scraper.stats
+        metrics.count_items(name, "seen", finished.items_seen)
+        logger.info("Scraper finished", extra={
+            'scraper': name,
+            'stage': 'scrape',
+            'duration': round(finished.duration_seconds, 3),
+            'seen': finished.items_seen,
+            'new': items_new,
+            'errors': stats['errors']
+        })
+        self.db.save_scraper_run(
+            crawl_run_id,
+            name,
+            started_at=finished.started_at,
+            duration_seconds=finished.duration_seconds,
+            items_seen=finished.items_seen,
+            items_new=items_new,
+            errors=stats['errors'],
+            bytes_fetched=stats['bytes_fetched']
+        )
+
+    def _sync_postings(self, finished: ScraperFinished, postings: List[Tuple[str, str, str]]):
+        """Update last-seen/changed postings and close the ones the scraper no longer lists"""
+        scraper = finished.scraper
+        # A failed or empty crawl says nothing about which postings are gone
+        close_missing = scraper.stats['errors'] == 0 and finished.items_seen > 0
+        with metrics.stage_timer("sync", scraper.company_name):
+            # started_at is naive local time, like the crawl history it is also recorded in
+            counts = self.db.sync_company_postings(scraper.company_name, postings,
+                                                   finished.started_at.astimezone(timezone.utc),
+                                                   close_missing=close_missing)
+        metrics.count_items(scraper.company_name, "closed", counts['closed'])
+        logger.info("Synced postings", extra=dict(counts, scraper=scraper.company_name, stage='sync',
+                                                  close_missing=close_missing))
+
+    # ------------------------------------------------------------------
+    # Stages 5-6: enrich new postings, match users and notify (consumer thread)
+    # ------------------------------------------------------------------
+
+    def _notify(self, notifications: queue.Queue):
+        users = None
+        webhooks = None
+        done = False
+
+        with self._profile("notify", ""):
+            try:
+                self._redeliver_webhooks()
+            except Exception as e:
+                logger.error("Webhook redelivery failed: %s", e, extra={'stage': 'notify'})
+
+            while not done:
+                item = notifications.get()
+                if item is _DONE:
+                    break
+
+                # Coalesce batches that queued up while the previous send was running
+                batch = list(item)
+                while True:
+                    try:
+                        more = notifications.get_nowait()
+                    except queue.Empty:
+                        break
+                    if more is _DONE:
+                        done = True
+                        break
+                    batch.extend(more)
+
+                self._enrich(batch)
+
+                try:
+                    with metrics.stage_timer("notify"):
+                        if users is None:
+                            users = self.db.get_all_users()
+                            webhooks = self.db.get_webhooks()
+                        # Near-duplicates of an already known posting are stored but not sent again
+                        originals = [i for i in batch if not i.is_duplicate]
+                        logger.info("Notifying users", extra={'stage': 'notify', 'users': len(users), 'count': len(originals),
+                                                              'duplicates': len(batch) - len(originals)})
+                        if originals:
+                            self.notification_service.notify_new_internships(originals, users)
+                            if webhooks:
+                                result = self.notification_service.notify_webhooks(originals, webhooks)
+                                self._save_webhook_failures(result['failures'])
+                        self.db.mark_as_notified([i.id for i in batch])
+                except Exception as e:
+                    logger.error("Notification failed: %s", e, extra={'stage': 'notify', 'count': len(batch)})
+
+    def _redeliver_webhooks(self):
+        """Retry the batches webhooks failed to accept in earlier crawls"""
+        failures = self.db.get_webhook_failures()
+        if not failures:
+            return
+
+        by_id = {webhook['id']: webhook for webhook in self.db.get_webhooks()}
+        for failure in failures:
+            webhook = by_id.get(failure['webhook_id'])
+            internships = [i for i in map(self.db.get_internship, failure['internship_ids']) if i is not None]
+            if webhook is not None and internships:
+                result = self.notification_service.notify_webhooks(internships, [webhook])
+                self._save_webhook_failures(result['failures'], rounds=failure['rounds'] + 1)
+            self.db.delete_webhook_failures([failure['id']])
+
+    def _save_webhook_failures(self, failures: List[Dict], rounds: int = 1):
+        for failure in failures:
+            extra = {'stage': 'notify', 'webhook': failure['webhook_id'], 'count': len(failure['internship_ids']),
+                     'rounds': rounds}
+            if rounds >= WEBHOOK_MAX_ROUNDS:
+                logger.error("Webhook batch dropped after repeated failures: %s", failure['error'], extra=extra)
+            else:
+                logger.error("Webhook batch failed, redelivering on the next crawl: %s", failure['error'], extra=extra)
+        self.db.save_webhook_failures([f for f in failures if rounds < WEBHOOK_MAX_ROUNDS], rounds=rounds)
+
+    def _enrich(self, batch: List[Internship]):
+        """Fill in details for newly inserted postings before they are sent out"""
+        if self.enrichment_service is None:
+            return
+        try:
+            updated = self.enrichment_service.enrich(batch)
+            self.db.update_internship_details(updated)
+        except Exception as e:
+            logger.error("Enrichment failed: %s", e, extra={'stage': 'enrich', 'count': len(batch)})
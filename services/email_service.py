@@ -1,9 +1,12 @@
+import logging
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import List, Dict
 from models.internship import Internship
 
+logger = logging.getLogger(__name__)
+
 
 class EmailService:
     def __init__(self):
@@ -36,10 +39,10 @@ class EmailService:
                     user['email'],
                     message.as_string()
                 )
-            print(f"Email sent to {user['email']}")
+            logger.debug("Email sent", extra={'stage': 'notify', 'email': user['email'], 'count': len(internships)})
         
         except Exception as e:
-            print(f"Error sending email to {user['email']}: {e}")
+            logger.error("Error sending email: %s", e, extra={'stage': 'notify', 'email': user['email']})
     
     def _create_email_body(self, internships: List[Internship]) -> str:
         """Create HTML email body"""
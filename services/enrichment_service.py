@@ -0,0 +1,220 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from models.internship import Internship
+from scrapers.base_scraper import BS4_PARSER
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+ENRICH_CACHE_DIR_ENV = "CRAWLER_ENRICH_CACHE_DIR"
+
+# Detail pages fetched at once overall, and per host so one career site isn't hammered
+MAX_WORKERS = 8
+PER_HOST_LIMIT = 2
+# Cached detail pages are reused for this long (seconds)
+CACHE_TTL = 7 * 24 * 3600
+REQUEST_TIMEOUT = 10
+
+# Section headings that introduce requirement bullets
+_REQUIREMENT_HEADING = re.compile(
+    r'qualifications|requirements|what you.{0,3}ll need|what you bring|who you are|'
+    r'skills|you should have|you have|must have|nice to have',
+    re.IGNORECASE
+)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _clean(text: str) -> str:
+    return _WHITESPACE.sub(' ', text or '').strip()
+
+
+def extract_details(html: str) -> Tuple[str, List[str]]:
+    """Extract (description, requirement bullets) from a job detail page.
+
+    schema.org JobPosting JSON-LD is preferred when the page has it (most career sites
+    do); otherwise the description comes from the page's meta description and the
+    requirements from list items under qualification/requirement headings.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, BS4_PARSER)
+    description = ''
+    requirements: List[str] = []
+
+    posting = _json_ld_job_posting(soup)
+    if posting:
+        description_html = posting.get('description') or ''
+        description_soup = BeautifulSoup(description_html, BS4_PARSER)
+        description = _clean(description_soup.get_text(' '))
+        requirements = _requirement_bullets(description_soup)
+        if not requirements:
+            qualifications = posting.get('qualifications') or posting.get('experienceRequirements')
+            if isinstance(qualifications, str):
+                items = BeautifulSoup(qualifications, BS4_PARSER).find_all('li')
+                requirements = [_clean(li.get_text(' ')) for li in items] or [_clean(qualifications)]
+
+    if not description:
+        meta = soup.find('meta', attrs={'name': 'description'}) or soup.find('meta', attrs={'property': 'og:description'})
+        if meta and meta.get('content'):
+            description = _clean(meta['content'])
+
+    if not requirements:
+        requirements = _requirement_bullets(soup)
+
+    return description, requirements
+
+
+def _json_ld_job_posting(soup) -> Optional[Dict]:
+    for script in soup.find_all('script', attrs={'type': 'application/ld+json'}):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            data = data.get('@graph') or [data]
+        for item in data if isinstance(data, list) else []:
+            if isinstance(item, dict) and item.get('@type') == 'JobPosting':
+                return item
+    return None
+
+
+def _requirement_bullets(soup) -> List[str]:
+    """List items following headings that look like a requirements section"""
+    bullets = []
+    for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'strong', 'b', 'p']):
+        text = _clean(heading.get_text(' '))
+        if not text or len(text) > 80 or not _REQUIREMENT_HEADING.search(text):
+            continue
+        bullet_list = heading.find_next(['ul', 'ol'])
+        if bullet_list is None:
+            continue
+        for item in bullet_list.find_all('li', recursive=False):
+            bullet = _clean(item.get_text(' '))
+            if bullet and bullet not in bullets:
+                bullets.append(bullet)
+    return bullets
+
+
+class EnrichmentService:
+    """Fills in description and requirements for new internships from their detail pages.
+
+    Only postings that are missing details are fetched. Requests run on a bounded
+    thread pool with a per-host limit, and pages are cached on disk by URL hash so
+    re-runs and other postings sharing a page cost no network.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_workers: int = MAX_WORKERS,
+        per_host_limit: int = PER_HOST_LIMIT,
+        cache_ttl: int = CACHE_TTL,
+        session: Optional[requests.Session] = None
+    ):
+        self.cache_dir = cache_dir or os.environ.get(ENRICH_CACHE_DIR_ENV) or os.path.join(".cache", "details")
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.cache_ttl = cache_ttl
+        self.session = session or self._create_session()
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    def enrich(self, internships: List[Internship]) -> List[Internship]:
+        """Fetch details for internships missing them; returns the ones that were updated"""
+        pending = [i for i in internships if i.url and not (i.description and i.requirements)]
+        if not pending:
+            return []
+
+        with metrics.stage_timer("enrich"):
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as pool:
+                results = list(pool.map(self._enrich_one, pending))
+
+        updated = [internship for internship, changed in zip(pending, results) if changed]
+        logger.info("Enriched internships", extra={'stage': 'enrich', 'count': len(updated), 'pending': len(pending)})
+        return updated
+
+    def _enrich_one(self, internship: Internship) -> bool:
+        try:
+            html = self._fetch(internship.url)
+            description, requirements = extract_details(html)
+        except Exception as e:
+            logger.warning("Could not enrich posting: %s", e, extra={'stage': 'enrich', 'url': internship.url})
+            return False
+
+        changed = False
+        if description and not internship.description:
+            internship.description = description
+            changed = True
+        if requirements and not internship.requirements:
+            internship.requirements = requirements
+            changed = True
+        return changed
+
+    def _fetch(self, url: str) -> str:
+        cached = self._read_cache(url)
+        if cached is not None:
+            return cached
+
+        with self._host_limit(urlparse(url).netloc):
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            html = response.text
+
+        self._write_cache(url, html)
+        return html
+
+    def _host_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._host_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def _cache_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.html.gz')
+
+    def _read_cache(self, url: str) -> Optional[str]:
+        path = self._cache_path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > self.cache_ttl:
+                return None
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_cache(self, url: str, html: str):
+        path = self._cache_path(url)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not cache detail page: %s", e, extra={'stage': 'enrich', 'url': url})
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        session.headers.update({'User-Agent': 'InternshipCrawler/1.0 (+https://example.com)'})
+
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(max_retries=retries, pool_maxsize=self.max_workers)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        return session
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator
+
+from models.internship import Internship
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+COMPRESSIONS = {
+    'none': (None, ''),
+    'gzip': ('application/gzip', '.gz'),
+    'zstd': ('application/zstd', '.zst'),
+}
+
+CSV_FIELDS = [
+    'id', 'company', 'title', 'location', 'url', 'posted_date', 'description', 'requirements',
+    'created_at', 'notified', 'last_seen_at', 'closed_at', 'canonical_id'
+]
+
+# Rows serialized per output chunk; bounds memory and keeps chunks a useful size
+ROWS_PER_CHUNK = 200
+
+
+def available_compressions():
+    """Compression names usable in this environment"""
+    return [name for name in COMPRESSIONS if name != 'zstd' or zstandard is not None]
+
+
+def export_filename(fmt: str, compression: str = 'none') -> str:
+    return f"internships.{FORMATS[fmt][1]}{COMPRESSIONS[compression][1]}"
+
+
+def media_type(fmt: str, compression: str = 'none') -> str:
+    return COMPRESSIONS[compression][0] or FORMATS[fmt][0]
+
+
+def export_internships(internships: Iterable[Internship], fmt: str = 'ndjson',
+                       compression: str = 'none') -> Iterator[bytes]:
+    """Serialize internships to CSV or NDJSON chunks, compressed on the fly.
+
+    Consumes `internships` lazily (e.g. Database.iter_internships), so memory use is
+    bounded by ROWS_PER_CHUNK regardless of how many rows are exported.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if compression not in available_compressions():
+        raise ValueError(f"Unsupported compression: {compression}")
+
+    chunks = _csv_chunks(internships) if fmt == 'csv' else _ndjson_chunks(internships)
+    if compression == 'gzip':
+        return _compress(chunks, zlib.compressobj(6, zlib.DEFLATED, 31))
+    if compression == 'zstd':
+        return _compress(chunks, zstandard.ZstdCompressor().compressobj())
+    return chunks
+
+
+def _export_row(internship: Internship) -> dict:
+    row = internship.to_dict()
+    return {field: row.get(field) for field in CSV_FIELDS}
+
+
+def _ndjson_chunks(internships: Iterable[Internship]) -> Iterator[bytes]:
+    lines = []
+    for internship in internships:
+        lines.append(json.dumps(_export_row(internship), ensure_ascii=False))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _csv_chunks(internships: Iterable[Internship]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    rows = 0
+    for internship in internships:
+        row = _export_row(internship)
+        row['requirements'] = '\n'.join(row['requirements'] or [])
+        writer.writerow(row)
+        rows += 1
+        if rows >= ROWS_PER_CHUNK:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _compress(chunks: Iterator[bytes], compressor) -> Iterator[bytes]:
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -1,11 +1,13 @@
-from typing import List
+from typing import List, Optional
 from services.email_service import EmailService
+from services.webhook_service import WebhookService
 from models.internship import Internship
-from typing import Dict
+from typing import Any, Dict
 
 class NotificationService:
-    def __init__(self):
+    def __init__(self, webhook_service: Optional[WebhookService] = None):
         self.email_service = EmailService()
+        self.webhook_service = webhook_service or WebhookService()
     
     def notify_new_internships(self, internships: List[Internship], users: List[Dict]):
         """Send notifications about new internships to all users"""
@@ -20,6 +22,14 @@ class NotificationService:
             if filtered_internships:
                 self.email_service.send_notification(user, filtered_internships)
     
+    def notify_webhooks(self, internships: List[Internship], webhooks: List[Dict]) -> Dict[str, Any]:
+        """Deliver new internships to registered webhooks, concurrently and in batches"""
+        
+        if not internships or not webhooks:
+            return {'delivered': 0, 'failed': 0, 'failures': []}
+        
+        return self.webhook_service.deliver(webhooks, internships)
+    
     def _filter_for_user(self, internships: List[Internship], user: Dict) -> List[Internship]:
         """Filter internships based on user preferences"""
         # Implement filtering logic based on user preferences
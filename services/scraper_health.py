@@ -0,0 +1,104 @@
+import logging
+from datetime import timedelta
+from typing import Dict, Optional
+
+from database.db import Database
+from utils.dates import utc_now
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failed runs that open a scraper's circuit
+FAILURE_THRESHOLD = 3
+# An open circuit is probed (half-open) after this long; every failed probe doubles
+# the wait, up to MAX_COOLDOWN
+COOLDOWN = timedelta(hours=2)
+MAX_COOLDOWN = timedelta(hours=24)
+
+# Timeouts are the observed p95 latency times TIMEOUT_MULTIPLIER, clamped to
+# [minimum, default]: never looser than the fixed defaults, tighter for fast sites
+TIMEOUT_PERCENTILE = 0.95
+TIMEOUT_MULTIPLIER = 3.0
+# Samples needed before the defaults are replaced, and samples kept per kind
+MIN_SAMPLES = 20
+LATENCY_WINDOW = 500
+
+# Latency kind -> (scraper attribute, stats key, minimum seconds)
+TIMEOUT_KINDS = {
+    'request': ('request_timeout', 'request_seconds', 3.0),
+    'navigation': ('navigation_timeout', 'navigation_seconds', 10.0),
+}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class ScraperHealth:
+    """Circuit breaker and adaptive timeouts per scraper, persisted in the database.
+
+    A scraper whose runs fail FAILURE_THRESHOLD times in a row is skipped until its
+    cooldown passes; the next run is then a half-open probe that closes the circuit
+    on success or reopens it with a doubled cooldown on failure. A run fails when
+    it reports errors and yields nothing.
+    """
+
+    def __init__(self, db: Database, failure_threshold: int = FAILURE_THRESHOLD,
+                 cooldown: timedelta = COOLDOWN, max_cooldown: timedelta = MAX_COOLDOWN):
+        self.db = db
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+    def _cooldown(self, consecutive_failures: int) -> timedelta:
+        doublings = max(0, consecutive_failures - self.failure_threshold)
+        return min(self.cooldown * (2 ** min(doublings, 16)), self.max_cooldown)
+
+    def allow(self, scraper: str) -> bool:
+        """Whether the scraper should run now; moves an open circuit past its cooldown to half-open"""
+        health = self.db.get_scraper_health(scraper)
+        if health is None or health['state'] == CLOSED:
+            return True
+
+        if health['state'] == OPEN:
+            retry_at = health['opened_at'] + self._cooldown(health['consecutive_failures'])
+            if utc_now() < retry_at:
+                logger.info("Circuit open, skipping", extra={'scraper': scraper, 'stage': 'health',
+                                                            'retry_at': retry_at.isoformat()})
+                return False
+            self.db.save_scraper_health(scraper, HALF_OPEN, health['consecutive_failures'],
+                                        health['opened_at'], health['last_error'])
+
+        logger.info("Probing scraper", extra={'scraper': scraper, 'stage': 'health'})
+        return True
+
+    def record_run(self, scraper: str, items_seen: int, errors: int, stats: Optional[Dict] = None):
+        """Update the circuit and latency samples from a finished run"""
+        stats = stats or {}
+        for kind, (_, stats_key, _) in TIMEOUT_KINDS.items():
+            self.db.save_scraper_latencies(scraper, kind, stats.get(stats_key) or [], keep=LATENCY_WINDOW)
+
+        health = self.db.get_scraper_health(scraper) or {'state': CLOSED, 'consecutive_failures': 0}
+        if errors == 0 or items_seen > 0:
+            if health['state'] != CLOSED:
+                logger.info("Circuit closed", extra={'scraper': scraper, 'stage': 'health'})
+            self.db.save_scraper_health(scraper, CLOSED, 0)
+            return
+
+        failures = health['consecutive_failures'] + 1
+        error = stats.get('last_error')
+        if health['state'] == HALF_OPEN or failures >= self.failure_threshold:
+            logger.warning("Circuit opened", extra={'scraper': scraper, 'stage': 'health', 'failures': failures,
+                                                   'cooldown': self._cooldown(failures).total_seconds()})
+            self.db.save_scraper_health(scraper, OPEN, failures, utc_now(), error)
+        else:
+            self.db.save_scraper_health(scraper, CLOSED, failures, None, error)
+
+    def apply_timeouts(self, scraper):
+        """Set the scraper's request/navigation timeouts from its observed latencies"""
+        for kind, (attribute, _, minimum) in TIMEOUT_KINDS.items():
+            default = getattr(type(scraper), attribute)
+            p95, samples = self.db.get_latency_percentile(scraper.company_name, kind, TIMEOUT_PERCENTILE)
+            if p95 is None or samples < MIN_SAMPLES:
+                setattr(scraper, attribute, default)
+                continue
+            setattr(scraper, attribute, round(min(default, max(minimum, p95 * TIMEOUT_MULTIPLIER)), 1))
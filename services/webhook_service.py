@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from models.internship import Internship
+from utils import gazetteer
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+EVENT = "internships.created"
+SIGNATURE_HEADER = "X-Crawler-Signature"
+TIMESTAMP_HEADER = "X-Crawler-Timestamp"
+DELIVERY_HEADER = "X-Crawler-Delivery"
+
+# Requests in flight across all webhooks, which is also the connection pool size
+MAX_CONCURRENCY = 8
+# Postings per payload; a webhook matching more gets several deliveries
+BATCH_SIZE = 50
+# Attempts per payload; failed attempts back off exponentially (with jitter) from BACKOFF_SECONDS
+MAX_ATTEMPTS = 4
+BACKOFF_SECONDS = 1.0
+TIMEOUT_SECONDS = 10.0
+
+# Webhooks may only target public addresses, so subscribers can't make the crawler host
+# call internal services; CRAWLER_WEBHOOK_ALLOW_PRIVATE=1 lifts this for local setups
+ALLOW_PRIVATE_ENV = "CRAWLER_WEBHOOK_ALLOW_PRIVATE"
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    """Signature header value: HMAC-SHA256 of "<timestamp>.<body>" keyed by the webhook secret.
+
+    Receivers recompute it to authenticate the payload, and reject stale timestamps
+    to stop replays.
+    """
+    digest = hmac.new(secret.encode('utf-8'), timestamp.encode('ascii') + b'.' + body, hashlib.sha256)
+    return f"sha256={digest.hexdigest()}"
+
+
+def private_targets_allowed() -> bool:
+    return os.environ.get(ALLOW_PRIVATE_ENV) == "1"
+
+
+def _address_problem(host: str, addresses: List[str]) -> Optional[str]:
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%')[0])
+        if ip.version == 6 and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_multicast or ip.is_reserved or ip.is_unspecified:
+            return f"{host} resolves to non-public address {ip}"
+    return None
+
+
+def _target(url: str) -> Tuple[Optional[str], int]:
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        return None, 0
+    return parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80)
+
+
+def url_problem(url: str, allow_private: Optional[bool] = None) -> Optional[str]:
+    """Why a webhook URL can't be used, or None: it must be http(s) and resolve to public addresses only"""
+    host, port = _target(url)
+    if host is None:
+        return "Webhook url must be http(s) with a host"
+    if private_targets_allowed() if allow_private is None else allow_private:
+        return None
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        return f"Cannot resolve {host}"
+    return _address_problem(host, [info[4][0] for info in infos])
+
+
+def matches(webhook: Dict, internship: Internship) -> bool:
+    """Whether a posting passes a webhook's company and country filters"""
+    companies = webhook.get('companies')
+    if companies and internship.company.lower() not in {c.lower() for c in companies}:
+        return False
+    country_code = webhook.get('country_code')
+    if country_code and country_code not in gazetteer.location_countries(internship.location):
+        return False
+    return True
+
+
+class WebhookService:
+    """Delivers new postings to registered webhooks as signed, batched JSON payloads.
+
+    All deliveries of a notification round share one async HTTP client, so
+    connections to the same host are reused, and a semaphore caps the requests in
+    flight. Connection errors, timeouts, 429 and 5xx responses are retried; other
+    responses fail the delivery at once. Targets are resolved again before sending
+    and skipped if they now point at a non-public address; redirects are not followed.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, batch_size: int = BATCH_SIZE,
+                 max_attempts: int = MAX_ATTEMPTS, backoff: float = BACKOFF_SECONDS,
+                 timeout: float = TIMEOUT_SECONDS, allow_private: Optional[bool] = None):
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.timeout = timeout
+        self.allow_private = private_targets_allowed() if allow_private is None else allow_private
+
+    def deliver(self, webhooks: List[Dict], internships: List[Internship]) -> Dict[str, Any]:
+        """Send each webhook its matching postings; blocks until every delivery finished or gave up
+
+        Returns 'delivered' and 'failed' batch counts, and 'failures': one dict per
+        failed batch with 'webhook_id', 'internship_ids' and 'error', for redelivery.
+        """
+        deliveries: List[Tuple[Dict, List[Internship]]] = []
+        for webhook in webhooks:
+            matched = [i for i in internships if matches(webhook, i)]
+            for start in range(0, len(matched), self.batch_size):
+                deliveries.append((webhook, matched[start:start + self.batch_size]))
+
+        if not deliveries:
+            return {'delivered': 0, 'failed': 0, 'failures': []}
+        if httpx is None:
+            logger.warning("httpx is not installed, skipping webhooks", extra={'stage': 'notify', 'webhooks': len(webhooks)})
+            errors = ["httpx is not installed"] * len(deliveries)
+        else:
+            errors = asyncio.run(self._deliver_all(deliveries))
+
+        failures = [
+            {'webhook_id': webhook['id'], 'internship_ids': [i.id for i in batch], 'error': error}
+            for (webhook, batch), error in zip(deliveries, errors) if error is not None
+        ]
+        logger.info("Webhooks delivered", extra={'stage': 'notify', 'delivered': len(deliveries) - len(failures),
+                                                 'failed': len(failures)})
+        return {'delivered': len(deliveries) - len(failures), 'failed': len(failures), 'failures': failures}
+
+    async def _deliver_all(self, deliveries: List[Tuple[Dict, List[Internship]]]) -> List[Optional[str]]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout) as client:
+            return await asyncio.gather(*(self._send(client, semaphore, webhook, batch)
+                                          for webhook, batch in deliveries))
+
+    async def _send(self, client, semaphore: asyncio.Semaphore, webhook: Dict, batch: List[Internship]) -> Optional[str]:
+        """Deliver one batch; returns None on success, else the last error"""
+        # Checked again at send time: the name may resolve elsewhere than at registration
+        problem = await asyncio.to_thread(url_problem, webhook['url'], self.allow_private)
+        if problem:
+            logger.warning("Webhook target refused: %s", problem, extra={'stage': 'notify', 'webhook': webhook['id']})
+            return problem
+
+        body = json.dumps({
+            'event': EVENT,
+            'count': len(batch),
+            'internships': [internship.to_dict() for internship in batch]
+        }, ensure_ascii=False).encode('utf-8')
+        # Same id on every attempt, so receivers can drop retried duplicates
+        delivery_id = uuid.uuid4().hex
+        error: Optional[str] = None
+
+        for attempt in range(1, self.max_attempts + 1):
+            timestamp = str(int(time.time()))
+            headers = {
+                'Content-Type': 'application/json',
+                TIMESTAMP_HEADER: timestamp,
+                SIGNATURE_HEADER: sign(webhook['secret'], timestamp, body),
+                DELIVERY_HEADER: delivery_id,
+            }
+            async with semaphore:
+                try:
+                    response = await client.post(webhook['url'], content=body, headers=headers)
+                except httpx.HTTPError as e:
+                    error, retryable = str(e) or type(e).__name__, True
+                else:
+                    if response.status_code < 300:
+                        return None
+                    error = f"HTTP {response.status_code}"
+                    retryable = response.status_code == 429 or response.status_code >= 500
+
+            if not retryable or attempt == self.max_attempts:
+                break
+            # Back off outside the semaphore so waiting retries don't hold a slot
+            await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+        logger.warning("Webhook delivery failed: %s", error, extra={'stage': 'notify', 'webhook': webhook['id'],
+                                                                    'count': len(batch), 'attempts': attempt})
+        return error
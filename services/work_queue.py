@@ -0,0 +1,550 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from utils.dates import parse_date
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# CRAWLER_QUEUE_URL selects the queue: redis://host:port/db for a Redis-compatible
+# server, sqlite:///path/to/queue.db (or unset) for a local SQLite file
+QUEUE_URL_ENV = "CRAWLER_QUEUE_URL"
+DEFAULT_QUEUE_PATH = "crawl_queue.db"
+
+# A claimed job belongs to its worker until the lease expires; workers heartbeat
+# every LEASE_SECONDS / 3, so a dead worker's job is retried after at most one lease
+LEASE_SECONDS = 300
+# Jobs whose lease expired this many times (worker crashes, hangs) are failed
+MAX_ATTEMPTS = 3
+# Seconds between polls of an empty queue
+POLL_INTERVAL = 5.0
+# The coordinator stops waiting for unfinished jobs after this long and fails them
+CRAWL_TIMEOUT = 2 * 60 * 60
+
+_DATE_FIELDS = ('posted_date', 'created_at', 'last_seen_at', 'closed_at')
+
+
+class Job:
+    """One scraper run of one crawl"""
+
+    def __init__(self, id, crawl_run_id: int, scraper: str, attempts: int = 0, status: str = 'queued',
+                 result: Optional[Dict] = None, error: Optional[str] = None):
+        self.id = id
+        self.crawl_run_id = crawl_run_id
+        self.scraper = scraper
+        self.attempts = attempts
+        self.status = status
+        self.result = result
+        self.error = error
+
+
+class WorkQueue(ABC):
+    """Lease-based queue of scrape jobs shared by a coordinator and its workers.
+
+    The coordinator enqueues one job per scraper and collects finished jobs; workers
+    claim jobs for the scrapers they run, heartbeat to keep the lease, and complete
+    them with their postings. Implementations must make claim atomic across
+    processes and hosts.
+    """
+
+    @abstractmethod
+    def enqueue(self, crawl_run_id: int, scrapers: List[str]) -> List:
+        pass
+
+    @abstractmethod
+    def claim(self, worker_id: str, scrapers: List[str], lease_seconds: int = LEASE_SECONDS) -> Optional[Job]:
+        """Lease the oldest queued (or abandoned) job for one of `scrapers`"""
+        pass
+
+    @abstractmethod
+    def heartbeat(self, job_id, worker_id: str, lease_seconds: int = LEASE_SECONDS) -> bool:
+        """Extend a lease; False if the job is no longer this worker's"""
+        pass
+
+    @abstractmethod
+    def complete(self, job_id, worker_id: str, result: Dict) -> bool:
+        pass
+
+    @abstractmethod
+    def fail(self, job_id, worker_id: str, error: str) -> bool:
+        pass
+
+    @abstractmethod
+    def collect(self, crawl_run_id: int) -> List[Job]:
+        """Finished (done or failed) jobs not collected before"""
+        pass
+
+    @abstractmethod
+    def remaining(self, crawl_run_id: int) -> int:
+        """Jobs still queued or leased"""
+        pass
+
+    @abstractmethod
+    def cancel(self, crawl_run_id: int) -> int:
+        """Fail every unfinished job of a crawl"""
+        pass
+
+    @classmethod
+    def from_env(cls, url: Optional[str] = None) -> 'WorkQueue':
+        """Build a queue from an explicit URL, falling back to the environment"""
+        url = url or os.environ.get(QUEUE_URL_ENV, "")
+        if url.startswith(("redis://", "rediss://", "unix://")):
+            return RedisWorkQueue(url)
+        if url.startswith("sqlite:///"):
+            return SQLiteWorkQueue(url[len("sqlite:///"):])
+        return SQLiteWorkQueue(url or DEFAULT_QUEUE_PATH)
+
+    def iter_finished(self, crawl_run_id: int, timeout: float = CRAWL_TIMEOUT,
+                      poll_interval: float = POLL_INTERVAL) -> Iterator['RemoteScraper']:
+        """Yield each job of a crawl as it finishes, replayable through CrawlPipeline"""
+        deadline = time.monotonic() + timeout
+        while True:
+            jobs = self.collect(crawl_run_id)
+            for job in jobs:
+                yield RemoteScraper(job)
+            if jobs:
+                continue
+
+            if not self.remaining(crawl_run_id):
+                return
+            if time.monotonic() >= deadline:
+                cancelled = self.cancel(crawl_run_id)
+                logger.warning("Gave up waiting for workers", extra={'stage': 'coordinate', 'jobs': cancelled})
+                deadline = float('inf')
+                continue
+            time.sleep(poll_interval)
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Queue in a SQLite file: for workers on one host or a shared local volume"""
+
+    def __init__(self, db_path: str = DEFAULT_QUEUE_PATH):
+        self.db_path = db_path
+        self.init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Workers contend on claim; wait for the write lock instead of failing
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def init_db(self):
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    crawl_run_id INTEGER NOT NULL,
+                    scraper TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    worker TEXT,
+                    lease_expires_at REAL,
+                    attempts INTEGER DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    collected BOOLEAN DEFAULT 0,
+                    created_at TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_crawl_jobs_status_scraper
+                ON crawl_jobs (status, scraper)
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_crawl_jobs_run
+                ON crawl_jobs (crawl_run_id, status)
+            """)
+
+    def enqueue(self, crawl_run_id: int, scrapers: List[str]) -> List[int]:
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            ids = [
+                conn.execute("INSERT INTO crawl_jobs (crawl_run_id, scraper, created_at) VALUES (?, ?, ?)",
+                             (crawl_run_id, scraper, datetime.now().isoformat())).lastrowid
+                for scraper in scrapers
+            ]
+            conn.execute("COMMIT")
+        return ids
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float):
+        conn.execute("""
+            UPDATE crawl_jobs
+            SET status = 'failed', error = 'lease expired ' || attempts || ' times'
+            WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= ?
+        """, (now, MAX_ATTEMPTS))
+
+    def claim(self, worker_id: str, scrapers: List[str], lease_seconds: int = LEASE_SECONDS) -> Optional[Job]:
+        if not scrapers:
+            return None
+        now = time.time()
+
+        with closing(self._connect()) as conn:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers never pick the same row
+            conn.execute("BEGIN IMMEDIATE")
+            self._expire_leases(conn, now)
+            row = conn.execute(f"""
+                UPDATE crawl_jobs
+                SET status = 'leased', worker = ?, lease_expires_at = ?, attempts = attempts + 1
+                WHERE id = (
+                    SELECT id FROM crawl_jobs
+                    WHERE scraper IN ({','.join(['?'] * len(scrapers))})
+                      AND (status = 'queued' OR (status = 'leased' AND lease_expires_at < ?))
+                    ORDER BY id
+                    LIMIT 1
+                )
+                RETURNING id, crawl_run_id, scraper, attempts
+            """, [worker_id, now + lease_seconds] + list(scrapers) + [now]).fetchone()
+            conn.execute("COMMIT")
+
+        return Job(row[0], row[1], row[2], attempts=row[3], status='leased') if row else None
+
+    def _finish(self, job_id, worker_id: str, fields: str, params: list) -> bool:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(f"""
+                UPDATE crawl_jobs SET {fields}
+                WHERE id = ? AND worker = ? AND status = 'leased'
+            """, list(params) + [job_id, worker_id])
+            return cursor.rowcount == 1
+
+    def heartbeat(self, job_id, worker_id: str, lease_seconds: int = LEASE_SECONDS) -> bool:
+        return self._finish(job_id, worker_id, "lease_expires_at = ?", [time.time() + lease_seconds])
+
+    def complete(self, job_id, worker_id: str, result: Dict) -> bool:
+        return self._finish(job_id, worker_id, "status = 'done', result = ?", [json.dumps(result)])
+
+    def fail(self, job_id, worker_id: str, error: str) -> bool:
+        return self._finish(job_id, worker_id, "status = 'failed', error = ?", [error])
+
+    def collect(self, crawl_run_id: int) -> List[Job]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("""
+                UPDATE crawl_jobs SET collected = 1
+                WHERE crawl_run_id = ? AND status IN ('done', 'failed') AND collected = 0
+                RETURNING id, crawl_run_id, scraper, attempts, status, result, error
+            """, (crawl_run_id,)).fetchall()
+
+        return [
+            Job(row[0], row[1], row[2], attempts=row[3], status=row[4],
+                result=json.loads(row[5]) if row[5] else None, error=row[6])
+            for row in sorted(rows)
+        ]
+
+    def remaining(self, crawl_run_id: int) -> int:
+        with closing(self._connect()) as conn:
+            self._expire_leases(conn, time.time())
+            return conn.execute("""
+                SELECT COUNT(*) FROM crawl_jobs
+                WHERE crawl_run_id = ? AND status IN ('queued', 'leased')
+            """, (crawl_run_id,)).fetchone()[0]
+
+    def cancel(self, crawl_run_id: int) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("""
+                UPDATE crawl_jobs SET status = 'failed', error = 'cancelled by coordinator'
+                WHERE crawl_run_id = ? AND status IN ('queued', 'leased')
+            """, (crawl_run_id,)).rowcount
+
+
+# RedisWorkQueue scripts. KEYS[2] is always the leases sorted set; keys that depend on
+# job fields are built from the key prefix passed in ARGV.
+
+# KEYS[1] = queue:<scraper>; ARGV = worker, lease expiry, prefix.
+# Returns {job id, attempts, crawl_run_id}, or nil when no queued job is left
+_CLAIM_SCRIPT = """
+while true do
+    local job_id = redis.call('LPOP', KEYS[1])
+    if not job_id then
+        return nil
+    end
+    local job_key = ARGV[3] .. 'job:' .. job_id
+    if redis.call('HGET', job_key, 'status') == 'queued' then
+        redis.call('HSET', job_key, 'status', 'leased', 'worker', ARGV[1])
+        local attempts = redis.call('HINCRBY', job_key, 'attempts', 1)
+        redis.call('ZADD', KEYS[2], ARGV[2], job_id)
+        return {job_id, attempts, redis.call('HGET', job_key, 'crawl_run_id')}
+    end
+end
+"""
+
+# KEYS[1] = job hash; ARGV = job id, worker, lease expiry. Returns 1 if the lease was extended
+_HEARTBEAT_SCRIPT = """
+local job = redis.call('HMGET', KEYS[1], 'status', 'worker')
+if job[1] ~= 'leased' or job[2] ~= ARGV[2] then
+    return 0
+end
+return redis.call('ZADD', KEYS[2], 'XX', 'CH', ARGV[3], ARGV[1])
+"""
+
+# KEYS[1] = job hash; ARGV = job id, worker ('' for any unfinished job), prefix, then
+# the field/value pairs to set. Returns 1 if this call finished the job
+_FINISH_SCRIPT = """
+local job = redis.call('HMGET', KEYS[1], 'status', 'worker', 'crawl_run_id', 'scraper')
+if ARGV[2] == '' then
+    if job[1] ~= 'queued' and job[1] ~= 'leased' then
+        return 0
+    end
+elseif job[1] ~= 'leased' or job[2] ~= ARGV[2] then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+redis.call('LREM', ARGV[3] .. 'queue:' .. job[4], 0, ARGV[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('SREM', ARGV[3] .. 'pending:' .. job[3], ARGV[1])
+redis.call('RPUSH', ARGV[3] .. 'finished:' .. job[3], ARGV[1])
+return 1
+"""
+
+# KEYS[1] = job hash; ARGV = job id, now, max attempts, prefix. If the job's lease is
+# still there and expired, requeues the job, or fails it after max attempts
+_EXPIRE_LEASE_SCRIPT = """
+local expiry = redis.call('ZSCORE', KEYS[2], ARGV[1])
+if not expiry or tonumber(expiry) > tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+local job = redis.call('HMGET', KEYS[1], 'status', 'attempts', 'crawl_run_id', 'scraper')
+if job[1] ~= 'leased' then
+    return 0
+end
+if tonumber(job[2] or 0) >= tonumber(ARGV[3]) then
+    redis.call('HSET', KEYS[1], 'status', 'failed', 'error', 'lease expired ' .. job[2] .. ' times')
+    redis.call('SREM', ARGV[4] .. 'pending:' .. job[3], ARGV[1])
+    redis.call('RPUSH', ARGV[4] .. 'finished:' .. job[3], ARGV[1])
+else
+    redis.call('HSET', KEYS[1], 'status', 'queued')
+    redis.call('LPUSH', ARGV[4] .. 'queue:' .. job[4], ARGV[1])
+end
+return 1
+"""
+
+
+class RedisWorkQueue(WorkQueue):
+    """Queue on a Redis-compatible server, for workers on several hosts.
+
+    Keys (all under `prefix`):
+        job:<id>            hash: crawl_run_id, scraper, status, worker, attempts, result, error
+        queue:<scraper>     list of queued job ids, oldest first
+        leases              sorted set of leased job ids by lease expiry
+        pending:<run>       set of the crawl's unfinished job ids
+        finished:<run>      list of the crawl's finished, uncollected job ids
+
+    Every job status change runs as a Lua script, so checking who holds a job and
+    changing it is one atomic step: a completion racing a lease expiry or a cancel
+    finishes the job exactly once. The scripts build some keys from job fields, so
+    all keys must live on one server (not Redis Cluster).
+    """
+
+    def __init__(self, url: str, prefix: str = "crawler:"):
+        if redis is None:
+            raise RuntimeError("RedisWorkQueue requires the redis package: pip install redis")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._claim = self.client.register_script(_CLAIM_SCRIPT)
+        self._heartbeat = self.client.register_script(_HEARTBEAT_SCRIPT)
+        self._finish_job = self.client.register_script(_FINISH_SCRIPT)
+        self._expire_lease = self.client.register_script(_EXPIRE_LEASE_SCRIPT)
+
+    def _key(self, *parts) -> str:
+        return self.prefix + ':'.join(str(part) for part in parts)
+
+    def enqueue(self, crawl_run_id: int, scrapers: List[str]) -> List[int]:
+        ids = []
+        for scraper in scrapers:
+            job_id = self.client.incr(self._key("job_ids"))
+            pipe = self.client.pipeline()
+            pipe.hset(self._key("job", job_id), mapping={
+                'crawl_run_id': crawl_run_id, 'scraper': scraper, 'status': 'queued', 'attempts': 0
+            })
+            pipe.sadd(self._key("pending", crawl_run_id), job_id)
+            pipe.rpush(self._key("queue", scraper), job_id)
+            pipe.execute()
+            ids.append(job_id)
+        return ids
+
+    def _expire_leases(self):
+        for job_id in self.client.zrangebyscore(self._key("leases"), "-inf", time.time()):
+            # The script rechecks the lease, so concurrent callers and a heartbeat or
+            # completion that got there first are left alone
+            self._expire_lease(keys=[self._key("job", job_id), self._key("leases")],
+                               args=[job_id, time.time(), MAX_ATTEMPTS, self.prefix])
+
+    def claim(self, worker_id: str, scrapers: List[str], lease_seconds: int = LEASE_SECONDS) -> Optional[Job]:
+        self._expire_leases()
+        for scraper in scrapers:
+            claimed = self._claim(keys=[self._key("queue", scraper), self._key("leases")],
+                                  args=[worker_id, time.time() + lease_seconds, self.prefix])
+            if claimed:
+                job_id, attempts, crawl_run_id = claimed
+                return Job(int(job_id), int(crawl_run_id), scraper, attempts=int(attempts), status='leased')
+        return None
+
+    def heartbeat(self, job_id, worker_id: str, lease_seconds: int = LEASE_SECONDS) -> bool:
+        # XX in the script: never re-add a lease that _expire_leases already took away
+        return self._heartbeat(keys=[self._key("job", job_id), self._key("leases")],
+                               args=[job_id, worker_id, time.time() + lease_seconds]) == 1
+
+    def _finish(self, job_id, worker_id: str, fields: Dict) -> bool:
+        """Finish a job leased to `worker_id`, or with worker_id '' any unfinished job"""
+        args = [job_id, worker_id, self.prefix]
+        for field, value in fields.items():
+            args += [field, value]
+        return self._finish_job(keys=[self._key("job", job_id), self._key("leases")], args=args) == 1
+
+    def complete(self, job_id, worker_id: str, result: Dict) -> bool:
+        return self._finish(job_id, worker_id, {'status': 'done', 'result': json.dumps(result)})
+
+    def fail(self, job_id, worker_id: str, error: str) -> bool:
+        return self._finish(job_id, worker_id, {'status': 'failed', 'error': error})
+
+    def collect(self, crawl_run_id: int) -> List[Job]:
+        jobs = []
+        while True:
+            job_id = self.client.lpop(self._key("finished", crawl_run_id))
+            if job_id is None:
+                return jobs
+            job = self.client.hgetall(self._key("job", job_id))
+            self.client.delete(self._key("job", job_id))
+            jobs.append(Job(int(job_id), crawl_run_id, job['scraper'], attempts=int(job.get('attempts', 0)),
+                            status=job['status'], result=json.loads(job['result']) if job.get('result') else None,
+                            error=job.get('error')))
+
+    def remaining(self, crawl_run_id: int) -> int:
+        self._expire_leases()
+        return self.client.scard(self._key("pending", crawl_run_id))
+
+    def cancel(self, crawl_run_id: int) -> int:
+        return sum(self._finish(job_id, '', {'status': 'failed', 'error': 'cancelled by coordinator'})
+                   for job_id in self.client.smembers(self._key("pending", crawl_run_id)))
+
+
+def _encode_posting(posting: Dict) -> Dict:
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in posting.items()}
+
+
+def _decode_posting(posting: Dict) -> Dict:
+    return {key: parse_date(value) if key in _DATE_FIELDS and value else value for key, value in posting.items()}
+
+
+class RemoteScraper:
+    """A finished job, presented to CrawlPipeline like a scraper that already ran.
+
+    Postings, stats and timing are the worker's, so the coordinator's dedup,
+    persistence, lifecycle diff and scraper_runs records work unchanged. A failed
+    job replays as a run with an error and no postings, so nothing is closed.
+    """
+
+    def __init__(self, job: Job):
+        result = job.result or {}
+        self.company_name = job.scraper
+        self.job = job
+        self.stats = dict(result.get('stats') or {'bytes_fetched': 0, 'errors': 0})
+        if job.status != 'done':
+            self.stats['errors'] = self.stats.get('errors', 0) + 1
+            self.stats['last_error'] = job.error
+        self.started_at = datetime.fromisoformat(result['started_at']) if result.get('started_at') else None
+        self.duration_seconds = result.get('duration_seconds', 0.0)
+        self._postings = result.get('postings') or []
+
+    def reset_stats(self):
+        # Stats were collected by the worker
+        pass
+
+    def record_error(self, error: Exception):
+        self.stats['errors'] = self.stats.get('errors', 0) + 1
+
+    def iter_postings(self) -> Iterator[Dict]:
+        for posting in self._postings:
+            yield _decode_posting(posting)
+
+
+class CrawlWorker:
+    """Claims jobs for its scrapers, runs them and pushes the postings back.
+
+    Persistence, dedup and notification stay with the coordinator; a worker only
+    needs its scrapers and the queue.
+    """
+
+    def __init__(self, work_queue: WorkQueue, scrapers: List, worker_id: Optional[str] = None,
+                 lease_seconds: int = LEASE_SECONDS, poll_interval: float = POLL_INTERVAL):
+        self.queue = work_queue
+        self.scrapers = {scraper.company_name: scraper for scraper in scrapers}
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+    def run(self, exit_when_idle: bool = False) -> int:
+        """Process jobs until stopped (or until the queue is empty); returns jobs completed"""
+        logger.info("Worker started", extra={'stage': 'worker', 'worker': self.worker_id,
+                                             'scrapers': sorted(self.scrapers)})
+        completed = 0
+        while True:
+            job = self.queue.claim(self.worker_id, list(self.scrapers), self.lease_seconds)
+            if job is None:
+                if exit_when_idle:
+                    return completed
+                time.sleep(self.poll_interval)
+                continue
+            if self._run_job(job):
+                completed += 1
+
+    def _run_job(self, job: Job) -> bool:
+        scraper = self.scrapers[job.scraper]
+        lost = threading.Event()
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(self.lease_seconds / 3):
+                if not self.queue.heartbeat(job.id, self.worker_id, self.lease_seconds):
+                    lost.set()
+                    return
+
+        heartbeats = threading.Thread(target=heartbeat, name=f"lease-{job.id}", daemon=True)
+        heartbeats.start()
+        logger.info("Running job", extra={'scraper': job.scraper, 'stage': 'worker', 'job': job.id,
+                                          'attempt': job.attempts})
+
+        try:
+            scraper.reset_stats()
+            started_at = datetime.now()
+            start = time.perf_counter()
+            postings = []
+            try:
+                with closing(scraper.iter_postings()) as scraped:
+                    for posting in scraped:
+                        if lost.is_set():
+                            break
+                        postings.append(_encode_posting(posting))
+            except Exception as e:
+                logger.error("Scraper failed: %s", e, extra={'scraper': job.scraper, 'stage': 'worker'})
+                scraper.record_error(e)
+
+            result = {
+                'started_at': started_at.isoformat(),
+                'duration_seconds': time.perf_counter() - start,
+                'stats': scraper.stats,
+                'postings': postings
+            }
+        except Exception as e:
+            self.queue.fail(job.id, self.worker_id, str(e))
+            raise
+        finally:
+            stop.set()
+            heartbeats.join()
+
+        if lost.is_set() or not self.queue.complete(job.id, self.worker_id, result):
+            # Another worker has the job now; its result wins
+            logger.warning("Lease lost", extra={'scraper': job.scraper, 'stage': 'worker', 'job': job.id})
+            return False
+        return True
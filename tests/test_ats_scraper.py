@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from scrapers.ats import ATSScraper, load_boards
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        return None
+
+
+def test_greenhouse_and_lever_boards_map_fields(monkeypatch):
+    payloads = {
+        'https://boards-api.greenhouse.io/v1/boards/acme/jobs': {'jobs': [
+            {'title': 'Software Engineering Intern', 'absolute_url': 'https://boards.greenhouse.io/acme/jobs/1',
+             'location': {'name': 'London, UK'}, 'updated_at': '2024-05-01T12:00:00-04:00'},
+            {'title': 'Staff Engineer', 'absolute_url': 'https://boards.greenhouse.io/acme/jobs/2',
+             'location': {'name': 'Remote'}, 'updated_at': '2024-05-01T12:00:00-04:00'},
+        ]},
+        'https://api.lever.co/v0/postings/globex?mode=json': [
+            {'text': 'Data Science Intern', 'hostedUrl': 'https://jobs.lever.co/globex/1',
+             'categories': {'location': 'Toronto, ON'}, 'createdAt': 1714564800000,
+             'descriptionPlain': 'Model   things'},
+        ],
+    }
+    scrapers = [ATSScraper({'company': 'Acme', 'ats': 'greenhouse', 'board': 'acme'}),
+                ATSScraper({'company': 'Globex', 'ats': 'lever', 'board': 'globex'})]
+    for scraper in scrapers:
+        monkeypatch.setattr(scraper.session, 'get', lambda url, **kwargs: FakeResponse(payloads[url]))
+
+    acme, globex = [list(scraper.iter_postings()) for scraper in scrapers]
+
+    assert [(p['title'], p['location']) for p in acme] == [('Software Engineering Intern', 'London, UK')]
+    assert acme[0]['posted_date'].isoformat() == '2024-05-01T16:00:00+00:00'
+    assert globex[0]['url'] == 'https://jobs.lever.co/globex/1'
+    assert globex[0]['description'] == 'Model things'
+    assert globex[0]['posted_date'].isoformat() == '2024-05-01T12:00:00+00:00'
+
+
+def test_workday_pages_until_total():
+    scraper = ATSScraper({'company': 'Umbrella', 'ats': 'workday', 'board': 'umbrella',
+                          'host': 'umbrella.wd5.myworkdayjobs.com', 'site': 'External'})
+    offsets = []
+
+    def fake_post(url, json=None, **kwargs):
+        offsets.append(json['offset'])
+        count = 20 if json['offset'] == 0 else 5
+        jobs = [{'title': f"Intern {json['offset'] + n}", 'externalPath': f"/job/{json['offset'] + n}",
+                 'locationsText': 'Austin, TX', 'postedOn': 'Posted 3 Days Ago'} for n in range(count)]
+        return FakeResponse({'total': 25 if json['offset'] == 0 else 0, 'jobPostings': jobs})
+
+    scraper.session.post = fake_post
+    postings = list(scraper.iter_postings())
+
+    assert offsets == [0, 20]
+    assert len(postings) == 25
+    assert postings[0]['url'] == 'https://umbrella.wd5.myworkdayjobs.com/en-US/External/job/0'
+
+
+def test_load_boards_shares_one_pool_and_skips_invalid_entries(tmp_path):
+    path = tmp_path / "boards.json"
+    path.write_text(json.dumps([
+        {'company': 'Acme', 'ats': 'greenhouse', 'board': 'acme'},
+        {'company': 'Initech', 'ats': 'ashby', 'board': 'initech', 'fields': {'location': 'address.city'}},
+        {'company': 'Broken', 'ats': 'taleo', 'board': 'x'},
+    ]))
+
+    scrapers = load_boards(str(path))
+
+    assert [s.company_name for s in scrapers] == ['Acme', 'Initech']
+    assert scrapers[0].session.get_adapter('https://x') is scrapers[1].session.get_adapter('https://y')
+    assert scrapers[1].fields['location'] == 'address.city'
+    assert load_boards(str(tmp_path / "missing.json")) == []
+
+
+def test_unknown_ats_is_rejected():
+    with pytest.raises(ValueError):
+        ATSScraper({'company': 'Acme', 'ats': 'taleo', 'board': 'acme'})
@@ -0,0 +1,75 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+from scrapers.base_scraper import BaseScraper
+from scrapers.google import GoogleScraper
+from utils.cassette import Cassette
+
+
+class JobsHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        offset = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['offset']
+        body = json.dumps({'jobs': [f"job-{offset}"]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ApiScraper(BaseScraper):
+    def get_company_name(self):
+        return "Acme Corp"
+
+    def get_careers_url(self):
+        return "http://127.0.0.1/jobs"
+
+
+def _fetch(scraper, url, offset):
+    response = scraper.session.post(url, data=json.dumps({'offset': offset}), stream=True)
+    return json.loads(response.raw.read())
+
+
+def test_record_then_replay_offline(tmp_path, monkeypatch):
+    monkeypatch.setenv("CRAWLER_CASSETTE_DIR", str(tmp_path))
+    server = HTTPServer(('127.0.0.1', 0), JobsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/graphql"
+
+    monkeypatch.setenv("CRAWLER_CASSETTE_MODE", "record")
+    recorder = ApiScraper()
+    recorded = [_fetch(recorder, url, offset) for offset in (0, 100)]
+    server.shutdown()
+    server.server_close()
+    assert recorded == [{'jobs': ['job-0']}, {'jobs': ['job-100']}]
+    assert (tmp_path / "acme-corp.jsonl.gz").exists()
+
+    monkeypatch.setenv("CRAWLER_CASSETTE_MODE", "replay")
+    player = ApiScraper()
+    # Matched by request body, not just order
+    assert [_fetch(player, url, offset) for offset in (100, 0)] == recorded[::-1]
+    assert player.stats['bytes_fetched'] > 0
+    with pytest.raises(requests.ConnectionError):
+        player.session.get(url)
+
+
+def test_google_replays_recorded_dom(tmp_path, monkeypatch):
+    html = '''
+    <li class="lLd3Je"><h3 class="QJPWVe">Software Engineering Intern</h3>
+      <span class="pwO9Dc"><span class="r0wTof">London, UK</span></span>
+      <a class="WpHeLc" href="jobs/results/123">Learn more</a></li>
+    '''
+    Cassette(str(tmp_path / "google.jsonl.gz"), 'record').record_dom("results", html)
+
+    monkeypatch.setenv("CRAWLER_CASSETTE_MODE", "replay")
+    monkeypatch.setenv("CRAWLER_CASSETTE_DIR", str(tmp_path))
+    positions = GoogleScraper().scrape()
+
+    assert [(p['title'], p['location']) for p in positions] == [("Software Engineering Intern", "London, UK")]
@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from utils.classifier import InternshipClassifier
+
+
+def test_default_classifier_precision():
+    clf = InternshipClassifier()
+
+    assert clf.is_internship('Software Engineering Intern, BS, Summer 2026')
+    assert clf.is_internship('Co-op Student - Hardware')
+    assert clf.is_internship('Product Manager Intern')
+    assert clf.is_internship('Summer Analyst')
+
+    assert not clf.is_internship('International Tax Manager')
+    assert not clf.is_internship('Internal Tools Engineer')
+    assert not clf.is_internship('Summer Sales Manager')
+    assert not clf.is_internship('University Internship Program Manager')
+    assert not clf.is_internship('Senior Software Engineer')
+    assert not clf.is_internship('')
+
+
+def test_batch_matches_single_classification():
+    clf = InternshipClassifier()
+    titles = ['Data Intern', 'Staff Engineer', None, 'Summer Lead Engineer', 'coop - firmware', 'Interns Recruiter']
+
+    assert clf.classify_batch(titles) == [clf.is_internship(t) for t in titles]
+    assert clf.classify_batch(titles) == [True, False, False, False, True, True]
+    assert clf.classify_batch([]) == []
+
+
+def test_batch_matches_do_not_span_titles():
+    clf = InternshipClassifier()
+    # "Intern" + "Program Manager" across two titles would read as an excluded phrase
+    titles = ['Software Engineer Intern', 'Program Manager, Hardware', 'Data Science Intern', 'Engineering Manager',
+              'Summer', 'Analyst Intern\nProgram Manager']
+
+    assert clf.classify_batch(titles) == [clf.is_internship(t) for t in titles]
+    assert clf.classify_batch(titles)[:4] == [True, False, True, False]
+
+
+def test_configurable_terms():
+    clf = InternshipClassifier(include=['apprentice'], weak_include=[], exclude=['apprentice chef'], seniority=[])
+
+    assert clf.is_internship('Software Apprentice')
+    assert not clf.is_internship('Apprentice Chef')
+    assert not clf.is_internship('Software Intern')
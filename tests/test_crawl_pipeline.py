@@ -0,0 +1,138 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from database.db import Database
+from services.crawl_pipeline import CrawlPipeline
+
+
+class FakeScraper:
+    def __init__(self, company_name, postings, fail_after=None):
+        self.company_name = company_name
+        self.postings = postings
+        self.fail_after = fail_after
+        self.stats = {}
+
+    def reset_stats(self):
+        self.stats = {'bytes_fetched': 0, 'errors': 0}
+
+    def record_error(self, error):
+        self.stats['errors'] += 1
+
+    def iter_postings(self):
+        for i, posting in enumerate(self.postings):
+            if i == self.fail_after:
+                raise RuntimeError("boom")
+            yield posting
+
+
+class FakeNotificationService:
+    def __init__(self):
+        self.sent = []
+
+    def notify_new_internships(self, internships, users):
+        self.sent.extend(internships)
+
+
+def _posting(n):
+    return {'title': f"Software Intern {n}", 'location': 'Remote', 'url': f"https://example.com/jobs/{n}"}
+
+
+def test_pipeline_persists_dedups_and_notifies(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    notifier = FakeNotificationService()
+    scrapers = [
+        FakeScraper("Acme", [_posting(1), _posting(2), _posting(2), {'title': '', 'url': 'x'}, _posting(3)]),
+        FakeScraper("Globex", [_posting(3), _posting(4)], fail_after=1),
+    ]
+
+    pipeline = CrawlPipeline(db, notifier, batch_size=2, flush_interval=0.1)
+    crawl_run_id = db.start_crawl_run(started_at=datetime.now())
+    new_count = pipeline.run(scrapers, crawl_run_id)
+
+    # _posting(3) was already saved by Acme, and Globex failed before _posting(4)
+    assert new_count == 3
+    assert sorted(i.url for i in notifier.sent) == [_posting(n)['url'] for n in (1, 2, 3)]
+    assert db.get_unnotified_internships() == []
+    assert scrapers[1].stats['errors'] == 1
+
+
+def test_pipeline_survives_failing_notifier(tmp_path):
+    class BrokenNotificationService:
+        def notify_new_internships(self, internships, users):
+            raise RuntimeError("smtp down")
+
+    db = Database(str(tmp_path / "test.db"))
+    pipeline = CrawlPipeline(db, BrokenNotificationService(), flush_interval=0.1)
+    new_count = pipeline.run([FakeScraper("Acme", [_posting(1)])], db.start_crawl_run(
+        started_at=datetime.now()))
+
+    assert new_count == 1
+    assert len(db.get_unnotified_internships()) == 1
+
+
+def test_pipeline_tracks_posting_lifecycle(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    pipeline = CrawlPipeline(db, FakeNotificationService(), flush_interval=0.1)
+    pipeline.run([FakeScraper("Acme", [_posting(1), _posting(2), _posting(3)])], db.start_crawl_run(datetime.now()))
+
+    # Posting 2 disappears and posting 3 is retitled
+    retitled = dict(_posting(3), title="Software Intern 3 (Summer)")
+    pipeline.run([FakeScraper("Acme", [_posting(1), retitled])], db.start_crawl_run(datetime.now()))
+
+    open_postings = {i.url: i for i in db.get_internships_with_filters()}
+    assert sorted(open_postings) == [_posting(1)['url'], _posting(3)['url']]
+    assert open_postings[_posting(3)['url']].title == "Software Intern 3 (Summer)"
+    closed = [i for i in db.get_internships_with_filters(include_closed=True) if i.closed_at]
+    assert [i.url for i in closed] == [_posting(2)['url']]
+
+    # A failing crawl must not close what it didn't get to see
+    pipeline.run([FakeScraper("Acme", [_posting(1), _posting(3)], fail_after=1)], db.start_crawl_run(datetime.now()))
+    assert len(db.get_internships_with_filters()) == 2
+
+
+def test_pipeline_groups_near_duplicates_and_skips_their_notification(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    notifier = FakeNotificationService()
+    pipeline = CrawlPipeline(db, notifier, flush_interval=0.1)
+    repost = {'title': 'Software Intern 1 ', 'location': 'Dublin', 'url': 'https://example.com/jobs/1?loc=dublin'}
+
+    pipeline.run([FakeScraper("Acme", [_posting(1), repost, _posting(2)])], db.start_crawl_run(datetime.now()))
+
+    assert [i.url for i in notifier.sent] == [_posting(1)['url'], _posting(2)['url']]
+    by_url = {i.url: i for i in db.get_internships_with_filters()}
+    assert by_url[repost['url']].canonical_id == by_url[_posting(1)['url']].id
+    assert db.get_unnotified_internships() == []
+
+
+def test_pipeline_redelivers_failed_webhook_batches(tmp_path):
+    class WebhookNotificationService(FakeNotificationService):
+        def __init__(self, failing):
+            super().__init__()
+            self.failing = failing
+            self.delivered = []
+
+        def notify_webhooks(self, internships, webhooks):
+            if self.failing:
+                failures = [{'webhook_id': w['id'], 'internship_ids': [i.id for i in internships], 'error': "HTTP 503"}
+                            for w in webhooks]
+                return {'delivered': 0, 'failed': len(failures), 'failures': failures}
+            self.delivered.append([i.url for i in internships])
+            return {'delivered': len(webhooks), 'failed': 0, 'failures': []}
+
+    db = Database(str(tmp_path / "test.db"))
+    db.add_webhook("https://example.com/hook", "s")
+
+    CrawlPipeline(db, WebhookNotificationService(failing=True), flush_interval=0.1).run(
+        [FakeScraper("Acme", [_posting(1)])], db.start_crawl_run(started_at=datetime.now()))
+    assert [f['rounds'] for f in db.get_webhook_failures()] == [1]
+
+    notifier = WebhookNotificationService(failing=False)
+    CrawlPipeline(db, notifier, flush_interval=0.1).run(
+        [FakeScraper("Acme", [_posting(2)])], db.start_crawl_run(started_at=datetime.now()))
+
+    assert notifier.delivered == [[_posting(1)['url']], [_posting(2)['url']]]
+    assert db.get_webhook_failures() == []
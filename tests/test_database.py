@@ -0,0 +1,172 @@
+import sqlite3
+from collections import Counter
+from datetime import timedelta
+
+from database.db import Database
+from models.internship import Internship
+from utils.dates import utc_now
+
+
+def _internship(n, **kwargs):
+    return Internship(company="Acme", title=f"Role {n} Intern", url=f"https://example.com/jobs/{n}", **kwargs)
+
+
+def test_archive_moves_old_rows_and_restores_relisted_ones(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    long_ago = utc_now() - timedelta(days=200)
+    db.save_internships([_internship(1), _internship(2, created_at=long_ago, last_seen_at=long_ago)])
+
+    assert db.archive_internships() == 1
+    assert [i.url for i in db.get_internships_with_filters()] == [_internship(1).url]
+    assert len(db.get_internships_with_filters(include_archived=True)) == 2
+
+    # Listed again: restored to the hot table, not counted as new
+    assert db.save_internships([_internship(2)]) == []
+    assert len(db.get_internships_with_filters()) == 2
+
+
+def test_new_databases_use_incremental_vacuum(tmp_path):
+    path = str(tmp_path / "test.db")
+    db = Database(path)
+    db.save_internships([_internship(n, description="x" * 2000) for n in range(200)])
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    conn.execute("DELETE FROM internships")
+    conn.commit()
+    conn.close()
+
+    result = db.run_maintenance()
+    assert result['freed_pages'] > 0
+
+
+def test_country_filter_uses_location_index(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    db.save_internships([
+        _internship(1, location="Mountain View, CA, USA; London, UK; +"),
+        _internship(2, location="Austin, TX"),
+        _internship(3, location="Toronto, ON"),
+    ])
+
+    assert [i.url for i in db.get_internships_with_filters(country="United Kingdom")] == [_internship(1).url]
+    assert len(db.get_internships_with_filters(country="usa")) == 2
+    assert [i.url for i in db.get_internships_with_filters(country="Canada")] == [_internship(3).url]
+    # Unknown input falls back to matching the location text
+    assert [i.url for i in db.get_internships_with_filters(country="Austin")] == [_internship(2).url]
+
+    # A relocated posting is re-indexed
+    db.sync_company_postings("Acme", [(_internship(3).url, _internship(3).title, "Berlin, Germany")], utc_now(),
+                             close_missing=False)
+    assert [i.url for i in db.get_internships_with_filters(country="DE")] == [_internship(3).url]
+
+
+def test_facets_match_filtered_listing(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    now = utc_now()
+    locations = ["Austin, TX", "London, UK", "Mountain View, CA, USA; London, UK; +", "Remote"]
+    db.save_internships([
+        Internship(company=f"Co{n % 3}", title=f"Role {n} Intern", url=f"https://example.com/jobs/{n}",
+                   location=locations[n % 4], posted_date=now - timedelta(hours=5 * n))
+        for n in range(60)
+    ] + [_internship(60, location="Austin, TX", last_seen_at=now - timedelta(days=200))])
+    # Close Co0's postings except two, relocate one, and archive the closed ones and a long-unseen open one
+    db.sync_company_postings("Co0", [
+        ("https://example.com/jobs/0", "Role 0 Intern", "Berlin, Germany"),
+        ("https://example.com/jobs/3", "Role 3 Intern", "Remote"),
+    ], now)
+    assert db.archive_internships(closed_after_days=-1) == 19
+    # Closed postings stay hidden in the archive too unless include_closed is set
+    archived = db.get_internships_with_filters(include_archived=True)
+    assert all(i.closed_at is None for i in archived)
+    assert _internship(60).url in {i.url for i in archived}
+
+    for country in (None, "usa", "Germany", "Remote"):
+        for date_filter in (None, "past_hour", "past_week"):
+            for include_closed in (False, True):
+                for include_archived in (False, True):
+                    listed = db.get_internships_with_filters(country, date_filter, include_closed, include_archived)
+                    facets = db.get_facets(country, date_filter, include_closed, include_archived)
+                    assert facets['total'] == len(listed)
+                    assert {f['value']: f['count'] for f in facets['companies']} == Counter(i.company for i in listed)
+                    assert sum(f['count'] for f in facets['weeks']) == len(listed)
+
+
+def test_change_log_records_new_postings_only(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    long_ago = utc_now() - timedelta(days=200)
+    db.save_internships([_internship(1, created_at=long_ago, last_seen_at=long_ago), _internship(2)])
+    start = db.get_latest_change_id()
+    assert [i.url for _, i in db.get_changes()] == [_internship(1).url, _internship(2).url]
+
+    # A restore from the archive is not a new posting
+    assert db.archive_internships() == 1
+    db.save_internships([_internship(1), _internship(3)])
+
+    changes = db.get_changes(after_id=start)
+    assert [i.url for _, i in changes] == [_internship(3).url]
+    assert db.get_latest_change_id() == changes[-1][0]
+
+
+def test_descriptions_are_compressed_and_requirements_keep_commas(tmp_path):
+    path = str(tmp_path / "test.db")
+    db = Database(path)
+    boilerplate = "We are an equal opportunity employer and offer relocation, housing and mentorship. " * 5
+    requirements = ["Python, Go or Rust", "Line one\nline two"]
+    db.save_internships([_internship(n, description=f"Project {n}. {boilerplate}", requirements=requirements)
+                         for n in range(120)])
+
+    # Rows written before compression are plain text until maintenance compresses them
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE internships SET description = ? WHERE id = 1", ("Project 0. " + boilerplate,))
+    conn.commit()
+    # Opened before any dictionary exists, like an API process started before maintenance
+    reader = Database(path)
+
+    result = db.run_maintenance()
+    assert result['compressed'] == 1
+    assert conn.execute("SELECT COUNT(*) FROM text_dictionaries").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM internships WHERE typeof(description) != 'blob'").fetchone()[0] == 0
+    conn.close()
+
+    # The reader loads the new dictionary when it first reads a value that uses it
+    assert reader.text_codec.dictionaries == {}
+    db.save_internships([_internship(200, description="Project 200. " + boilerplate)])
+    assert reader.get_internship(121).description == "Project 200. " + boilerplate
+    assert len(reader.text_codec.dictionaries) == 1
+
+    first = reader.get_internship(1)
+    assert first.description == "Project 0. " + boilerplate
+    assert first.requirements == requirements
+    assert {i.description for i in reader.get_internships_with_filters(include_description=False)} == {None}
+
+
+def test_roles_sharing_company_boilerplate_are_not_duplicates(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    boilerplate = ("Acme builds tools for everyone. We offer relocation, housing, mentorship and a "
+                   "summer of real projects. Acme is an equal opportunity employer. ") * 20
+    db.save_internships([
+        Internship(company="Acme", title="Data Science Intern", url="https://example.com/jobs/1",
+                   location="London, UK", description=boilerplate),
+        Internship(company="Acme", title="Finance Intern", url="https://example.com/jobs/2",
+                   location="London, UK", description=boilerplate),
+        Internship(company="Acme", title="Data Science Intern", url="https://example.com/jobs/3",
+                   location="Austin, TX", description="Short local blurb"),
+    ])
+
+    by_url = {i.url: i for i in db.get_internships_with_filters()}
+    assert not by_url["https://example.com/jobs/2"].is_duplicate
+    # A per-location variant of the same role is still grouped
+    assert by_url["https://example.com/jobs/3"].canonical_id == by_url["https://example.com/jobs/1"].id
+
+
+def test_role_relisted_after_closing_is_not_a_duplicate(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    db.save_internships([_internship(1)])
+    db.sync_company_postings("Acme", [], utc_now())
+
+    # Same role, new URL, next season
+    relisted = Internship(company="Acme", title=_internship(1).title, url="https://example.com/jobs/1-2025")
+    db.save_internships([relisted])
+
+    assert not relisted.is_duplicate
+    assert [i.url for i in db.get_internships_with_filters()] == [relisted.url]
@@ -0,0 +1,36 @@
+import sys
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from utils import dates
+
+
+def test_parse_date_normalizes_to_utc():
+    expected = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+    assert dates.parse_date('2024-05-01T12:00:00Z') == expected
+    assert dates.parse_date('2024-05-01T14:00:00+02:00') == expected
+    assert dates.parse_date('Wed, 01 May 2024 12:00:00 GMT') == expected
+    assert dates.parse_date('2024-05-01T14:00:00+02:00').tzinfo == timezone.utc
+
+
+def test_parse_date_common_formats_and_failures():
+    assert dates.parse_date('May 1, 2024') == datetime(2024, 5, 1, tzinfo=timezone.utc)
+    assert dates.parse_date('2024-05-01 23:30') == datetime(2024, 5, 1, 23, 30, tzinfo=timezone.utc)
+    assert dates.parse_date('') is None
+    assert dates.parse_date(None) is None
+    assert dates.parse_date('not a date at all') is None
+
+
+def test_parse_date_memoizes_and_accepts_datetimes():
+    dates._parse_date_str.cache_clear()
+    for _ in range(3):
+        dates.parse_date('2024-01-01T01:00:00Z')
+    info = dates._parse_date_str.cache_info()
+    assert info.misses == 1 and info.hits == 2
+
+    aware = datetime(2024, 1, 1, 3, 0, tzinfo=timezone(timedelta(hours=2)))
+    assert dates.parse_date(aware) == datetime(2024, 1, 1, 1, 0, tzinfo=timezone.utc)
@@ -0,0 +1,65 @@
+import json
+
+from models.internship import Internship
+from services.enrichment_service import EnrichmentService, extract_details
+
+
+DETAIL_PAGE = '''
+<html><head>
+<script type="application/ld+json">%s</script>
+</head><body><h1>Software Engineering Intern</h1></body></html>
+''' % json.dumps({
+    '@context': 'https://schema.org',
+    '@type': 'JobPosting',
+    'title': 'Software Engineering Intern',
+    'description': '<p>Build things.</p><h3>Minimum qualifications:</h3>'
+                   '<ul><li>Pursuing a BS in Computer Science, or related field</li><li>Python</li></ul>',
+})
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        return None
+
+
+class FakeSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        self.requested.append(url)
+        return FakeResponse(self.pages[url])
+
+
+def test_extract_details_from_json_ld_and_headings():
+    description, requirements = extract_details(DETAIL_PAGE)
+    assert description.startswith('Build things.')
+    assert requirements == ['Pursuing a BS in Computer Science, or related field', 'Python']
+
+    html = '''<html><head><meta name="description" content="Join our team"></head><body>
+    <h2>What you'll need</h2><ul><li>SQL</li><li>Curiosity</li></ul></body></html>'''
+    assert extract_details(html) == ('Join our team', ['SQL', 'Curiosity'])
+
+
+def test_enrich_only_fetches_missing_details_and_caches(tmp_path):
+    url = 'https://careers.example.com/jobs/1'
+    session = FakeSession({url: DETAIL_PAGE})
+    service = EnrichmentService(cache_dir=str(tmp_path), session=session)
+
+    new = Internship(company='Acme', title='Software Engineering Intern', url=url)
+    complete = Internship(company='Acme', title='Data Intern', url='https://careers.example.com/jobs/2',
+                          description='Already here', requirements=['SQL'])
+
+    assert service.enrich([new, complete]) == [new]
+    assert new.requirements[1] == 'Python'
+    assert session.requested == [url]
+
+    # A second posting with the same detail page is served from the disk cache
+    again = Internship(company='Acme', title='Software Engineering Intern', url=url)
+    service.enrich([again])
+    assert again.description == new.description
+    assert session.requested == [url]
@@ -0,0 +1,57 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+from database.db import Database
+from models.internship import Internship
+from services import export_service
+from utils.dates import utc_now
+
+
+def _internship(n):
+    return Internship(company="Acme", title=f"Role {n} Intern", url=f"https://example.com/jobs/{n}",
+                      requirements=["Python, SQL", "Curiosity"])
+
+
+def test_ndjson_gzip_export_with_watermark(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    db.save_internships([_internship(n) for n in range(450)])
+
+    watermark = db.get_export_watermark()
+    chunks = list(export_service.export_internships(db.iter_internships(until=watermark, batch_size=100),
+                                                    'ndjson', 'gzip'))
+    rows = [json.loads(line) for line in gzip.decompress(b''.join(chunks)).decode('utf-8').splitlines()]
+    assert len(rows) == 450
+    assert rows[0]['requirements'] == ["Python, SQL", "Curiosity"]
+
+    # Incremental pull: only rows written after the previous watermark
+    db.save_internships([_internship(1000)])
+    assert db.get_export_watermark() > watermark
+    assert [i.url for i in db.iter_internships(since=watermark)] == [_internship(1000).url]
+
+
+def test_watermark_follows_commits_and_changes(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    db.save_internships([_internship(n) for n in range(3)])
+    watermark = db.get_export_watermark()
+
+    # Normalized before the watermark but committed after it
+    late = _internship(3)
+    late.created_at = utc_now() - timedelta(hours=1)
+    db.save_internships([late])
+    # Closing a posting is a change too; being seen again is not
+    db.sync_company_postings("Acme", [(_internship(n).url, _internship(n).title, '') for n in (1, 2, 3)], utc_now())
+
+    changed = list(db.iter_internships(since=watermark, until=db.get_export_watermark()))
+    assert [i.url for i in changed] == [_internship(3).url, _internship(0).url]
+    assert changed[1].closed_at is not None
+
+
+def test_csv_export_round_trips():
+    body = b''.join(export_service.export_internships([_internship(1), _internship(2)], 'csv'))
+    rows = list(csv.DictReader(io.StringIO(body.decode('utf-8'))))
+    assert [row['url'] for row in rows] == [_internship(1).url, _internship(2).url]
+    assert rows[0]['requirements'] == "Python, SQL\nCuriosity"
+    assert export_service.export_filename('csv', 'gzip') == 'internships.csv.gz'
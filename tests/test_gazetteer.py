@@ -0,0 +1,17 @@
+from utils.gazetteer import country_code, location_countries
+
+
+def test_location_countries():
+    assert location_countries("Mountain View, CA, USA; London, UK; +") == ["US", "GB"]
+    assert location_countries("Menlo Park, CA") == ["US"]
+    assert location_countries("Toronto, ON") == ["CA"]
+    assert location_countries("Bengaluru, Karnataka, India") == ["IN"]
+    assert location_countries("Remote - Canada") == ["CA"]
+    assert location_countries("Dublin") == ["IE"]
+    assert location_countries("Remote") == []
+
+
+def test_country_code_aliases():
+    assert country_code("USA") == country_code("United States") == country_code("U.S.") == "US"
+    assert country_code("uk") == "GB"
+    assert country_code("Narnia") is None
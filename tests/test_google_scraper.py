@@ -20,8 +20,9 @@ class FakeInnerLocator:
             return self._href
         return None
 
+    @property
     def first(self):
-        """Return self for .first chaining"""
+        """Return self for .first chaining (a property, as in Playwright)"""
         return self
 
     def all(self):
@@ -74,6 +75,7 @@ class FakeLocationContainer:
         self._location_spans = location_spans
         self._has_more = has_more
 
+    @property
     def first(self):
         return self
 
@@ -107,6 +109,9 @@ class FakeLocatorCollection:
     def all(self):
         return self._cards
 
+    def all_inner_texts(self):
+        return [card._title or '' for card in self._cards]
+
 
 class FakeMouse:
     def wheel(self, x, y):
@@ -133,6 +138,9 @@ class FakePage:
         # Job cards selector: li.lLd3Je
         if selector == 'li.lLd3Je':
             return FakeLocatorCollection(self._cards)
+        # Titles of all cards: li.lLd3Je h3.QJPWVe
+        if selector == 'li.lLd3Je h3.QJPWVe':
+            return FakeLocatorCollection([card for card in self._cards if card._title])
         return FakeLocatorCollection([])
 
 
@@ -0,0 +1,120 @@
+import io
+import json
+import logging
+import logging.handlers
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pytest
+
+from utils.logging_config import JsonFormatter, TextFormatter, setup_logging, shutdown_logging
+import utils.logging_config as logging_config
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def _record(msg="saved %d postings", args=(3,), exc_info=None, **extra):
+    record = logging.LogRecord("crawler", logging.INFO, __file__, 1, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+def _exc_info():
+    try:
+        raise ValueError("bad page")
+    except ValueError:
+        return sys.exc_info()
+
+
+def test_json_formatter_includes_extra_fields():
+    entry = json.loads(JsonFormatter().format(_record(stage="scrape", scraper="Meta", when=Path("x"))))
+
+    assert entry['message'] == "saved 3 postings"
+    assert (entry['level'], entry['logger']) == ("INFO", "crawler")
+    assert (entry['stage'], entry['scraper']) == ("scrape", "Meta")
+    # Values json can't encode fall back to str()
+    assert entry['when'] == "x"
+    assert 'args' not in entry and 'exc_info' not in entry
+
+
+def test_json_formatter_serialises_exceptions():
+    entry = json.loads(JsonFormatter().format(_record(exc_info=_exc_info())))
+
+    assert entry['message'] == "saved 3 postings"
+    assert entry['exc_info'].startswith("Traceback")
+    assert "ValueError: bad page" in entry['exc_info']
+
+
+def test_text_formatter_appends_extra_fields():
+    line = TextFormatter().format(_record(stage="scrape", scraper="Meta"))
+
+    assert "INFO    crawler: saved 3 postings [stage=scrape scraper=Meta]" in line
+    assert TextFormatter().format(_record()).endswith("crawler: saved 3 postings")
+
+
+def test_setup_logging_writes_json_through_the_queue(root_logger):
+    stream = io.StringIO()
+    setup_logging(level="debug", fmt="json", stream=stream)
+    log = logging.getLogger("crawler")
+
+    log.debug("fetched %s", "page 1", extra={'scraper': "Meta"})
+    try:
+        raise ValueError("bad page")
+    except ValueError:
+        log.exception("parse failed", extra={'stage': "parse"})
+    shutdown_logging()
+
+    debug, error = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert (debug['message'], debug['scraper']) == ("fetched page 1", "Meta")
+    # The traceback stays out of the message and is serialised as its own field
+    assert (error['message'], error['stage']) == ("parse failed", "parse")
+    assert "ValueError: bad page" in error['exc_info']
+
+
+def test_setup_logging_text_format_and_level(root_logger):
+    stream = io.StringIO()
+    setup_logging(level="warning", fmt="text", stream=stream)
+    log = logging.getLogger("crawler")
+
+    log.info("hidden")
+    log.warning("slow scraper", extra={'scraper': "Meta"})
+    shutdown_logging()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    assert lines[0].endswith("WARNING crawler: slow scraper [scraper=Meta]")
+
+
+def test_setup_logging_twice_replaces_handler_and_listener(root_logger):
+    first, second = io.StringIO(), io.StringIO()
+    setup_logging(stream=first)
+    first_listener = logging_config._listener
+    setup_logging(stream=second)
+
+    queue_handlers = [h for h in root_logger.handlers if isinstance(h, logging.handlers.QueueHandler)]
+    assert len(root_logger.handlers) == len(queue_handlers) == 1
+    assert logging_config._listener is not first_listener
+    assert first_listener._thread is None
+
+    logging.getLogger("crawler").info("once")
+    shutdown_logging()
+
+    assert first.getvalue() == ""
+    assert [json.loads(line)['message'] for line in second.getvalue().splitlines()] == ["once"]
+    assert logging_config._listener is None
+    # A second shutdown is a no-op
+    shutdown_logging()
@@ -0,0 +1,24 @@
+import importlib
+from pathlib import Path
+
+import main
+
+project_root = Path(__file__).parent.parent
+
+
+def test_scraper_module_that_fails_to_import_is_skipped(monkeypatch, tmp_path):
+    monkeypatch.chdir(project_root)
+    monkeypatch.setenv("CRAWLER_ATS_CONFIG", str(tmp_path / "missing.json"))
+    import_module = importlib.import_module
+
+    def failing_import(name, *args, **kwargs):
+        if name == "scrapers.meta":
+            raise ImportError("broken scraper")
+        return import_module(name, *args, **kwargs)
+
+    monkeypatch.setattr(main.importlib, "import_module", failing_import)
+    scrapers = main.load_scrapers()
+
+    names = [scraper.company_name for scraper in scrapers]
+    assert "Meta" not in names
+    assert "Google" in names
@@ -1,6 +1,8 @@
 from datetime import datetime
+import json
 
 from scrapers.meta import MetaScraper
+import scrapers.meta as meta_mod
 
 
 class FakeResponse:
@@ -32,7 +34,7 @@ def test_meta_graphql_parsing(monkeypatch):
 
     ms = MetaScraper()
 
-    def fake_post(url, data=None, headers=None, timeout=None):
+    def fake_post(url, data=None, headers=None, timeout=None, stream=None):
         return FakeResponse(payload)
 
     monkeypatch.setattr(ms, 'session', ms.session)
@@ -68,7 +70,7 @@ def test_meta_graphql_first_fails_then_inline_succeeds(monkeypatch):
 
     call_count = {'n': 0}
 
-    def fake_post(url, data=None, headers=None, timeout=None):
+    def fake_post(url, data=None, headers=None, timeout=None, stream=None):
         call_count['n'] += 1
         # first call simulates 400
         if call_count['n'] == 1:
@@ -83,3 +85,83 @@ def test_meta_graphql_first_fails_then_inline_succeeds(monkeypatch):
     results = ms.scrape()
     assert len(results) == 1
     assert results[0]['title'] == 'Design Intern'
+
+
+def test_meta_graphql_paginates_until_short_page(monkeypatch):
+    monkeypatch.setattr(meta_mod, 'PAGE_SIZE', 2)
+    monkeypatch.setattr(meta_mod, 'MAX_CONCURRENT_PAGES', 2)
+
+    # 5 jobs served 2 per page; every other job is an internship
+    all_jobs = [
+        {'id': f'm-{i}', 'title': 'Data Intern' if i % 2 == 0 else 'Staff Engineer',
+         'location': 'Menlo Park, CA', 'apply_url': f'https://www.metacareers.com/jobs/m-{i}'}
+        for i in range(5)
+    ]
+    offsets = []
+
+    ms = MetaScraper()
+
+    def fake_post(url, data=None, headers=None, timeout=None, stream=None):
+        variables = json.loads(data)['variables']
+        offsets.append(variables['offset'])
+        page = all_jobs[variables['offset']:variables['offset'] + variables['first']]
+        return FakeResponse({'data': {'jobs': page}})
+
+    monkeypatch.setattr(ms.session, 'post', fake_post)
+
+    results = ms.scrape()
+    assert [job['url'].rsplit('/', 1)[1] for job in results] == ['m-0', 'm-2', 'm-4']
+    # First page alone, then one concurrent window of two pages
+    assert sorted(offsets) == [0, 2, 4]
+
+
+def test_meta_graphql_stops_when_server_ignores_offset(monkeypatch):
+    monkeypatch.setattr(meta_mod, 'PAGE_SIZE', 1)
+    ms = MetaScraper()
+    calls = {'n': 0}
+
+    def fake_post(url, data=None, headers=None, timeout=None, stream=None):
+        calls['n'] += 1
+        return FakeResponse({'data': {'jobs': [{'id': 'm-1', 'title': 'Design Intern',
+                                                'apply_url': 'https://www.metacareers.com/jobs/m-1'}]}})
+
+    monkeypatch.setattr(ms.session, 'post', fake_post)
+
+    results = ms.scrape()
+    assert len(results) == 1
+    assert calls['n'] <= 1 + meta_mod.MAX_CONCURRENT_PAGES
+
+
+def test_meta_html_fallback_parses_cards(monkeypatch):
+    html = '''
+    <ul>
+      <li class="job"><h3>Software Engineer Intern</h3><span class="location">Menlo Park, CA</span>
+        <a href="/jobs/42">Apply</a><p class="job-description">Build things</p></li>
+      <li class="job"><h3>Engineering Manager</h3><a href="/jobs/43">Apply</a></li>
+      <li><h3>Not a card Intern</h3></li>
+    </ul>
+    '''
+
+    class HtmlResp:
+        text = html
+
+        def raise_for_status(self):
+            return None
+
+    ms = MetaScraper()
+
+    def failing_post(url, data=None, headers=None, timeout=None, stream=None):
+        raise ConnectionError("graphql down")
+
+    monkeypatch.setattr(ms.session, 'post', failing_post)
+    monkeypatch.setattr(ms.session, 'get', lambda url, timeout=None: HtmlResp())
+
+    for backend in ('bs4', None):
+        ms.html_backend = backend
+        results = ms.scrape()
+        assert len(results) == 1
+        job = results[0]
+        assert job['title'] == 'Software Engineer Intern'
+        assert job['location'] == 'Menlo Park, CA'
+        assert job['url'] == 'https://www.metacareers.com/jobs/42'
+        assert job['description'] == 'Build things'
@@ -0,0 +1,45 @@
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from utils.metrics import MetricsRegistry, render_run_summary
+import utils.metrics as metrics_mod
+
+
+def test_timer_records_histogram_series():
+    registry = MetricsRegistry()
+
+    with registry.timer("crawler_stage_duration_seconds", stage="scrape", scraper="Meta"):
+        pass
+    with registry.timer("crawler_stage_duration_seconds", stage="scrape", scraper="Meta"):
+        pass
+
+    summary = registry.summary()["crawler_stage_duration_seconds"]
+    assert summary[0]['labels'] == {'scraper': 'Meta', 'stage': 'scrape'}
+    assert summary[0]['count'] == 2
+
+    text = registry.render_prometheus()
+    assert '# TYPE crawler_stage_duration_seconds histogram' in text
+    assert 'crawler_stage_duration_seconds_count{scraper="Meta",stage="scrape"} 2' in text
+    assert 'le="+Inf"' in text
+
+
+def test_run_summary_round_trip(tmp_path, monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics_mod, 'registry', registry)
+    metrics_mod.count_items("Google", "new", 3)
+
+    started = datetime(2024, 1, 1, 12, 0, 0)
+    path = tmp_path / "metrics.json"
+    metrics_mod.write_run_summary(str(path), started, started + timedelta(seconds=5))
+
+    summary = json.loads(path.read_text())
+    assert summary['duration_seconds'] == 5
+
+    text = render_run_summary(summary)
+    assert 'crawler_last_run_duration_seconds 5.0' in text
+    assert 'crawler_last_run_items_total{result="new",scraper="Google"} 3' in text
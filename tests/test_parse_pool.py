@@ -0,0 +1,80 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from scrapers.google import parse_cards_file
+from scrapers.meta import MetaScraper
+from utils.classifier import default_classifier
+from utils.parse_pool import ParsePool
+
+
+class FakeStreamResponse:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+    def raise_for_status(self):
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ParsePool(workers=1, spool_dir=str(tmp_path))
+    yield pool
+    pool.shutdown()
+
+
+def test_meta_pages_parse_in_worker_process(pool, monkeypatch):
+    payload = {'data': {'jobs': [
+        {'id': 'm-1', 'title': 'Software Engineer Intern', 'location': 'Menlo Park, CA',
+         'apply_url': 'https://www.metacareers.com/jobs/m-1', 'posted_date': '2024-05-01T12:00:00Z'},
+        {'id': 'm-2', 'title': 'Staff Engineer', 'location': 'Remote',
+         'apply_url': 'https://www.metacareers.com/jobs/m-2', 'posted_date': '2024-05-01T12:00:00Z'},
+    ]}}
+    responses = []
+
+    def fake_post(url, data=None, headers=None, timeout=None, stream=None):
+        responses.append(FakeStreamResponse(json.dumps(payload).encode('utf-8')))
+        return responses[-1]
+
+    ms = MetaScraper()
+    ms.parse_pool = pool
+    monkeypatch.setattr(ms.session, 'post', fake_post)
+
+    results = ms.scrape()
+
+    assert [job['url'] for job in results] == ['https://www.metacareers.com/jobs/m-1']
+    assert isinstance(results[0]['posted_date'], datetime)
+    assert all(response.closed for response in responses)
+    # Spooled payloads are removed once parsed
+    assert os.listdir(pool._spool_dir) == []
+
+
+def test_google_cards_file_matches_live_parsing(tmp_path):
+    html = '''
+    <ul>
+      <li class="lLd3Je"><h3 class="QJPWVe">Software Engineering Intern</h3>
+        <span class="pwO9Dc"><span class="r0wTof">Mountain View, CA</span><span class="r0wTof">New York, NY</span>
+          <span class="r0wTof">Austin, TX</span><span class="Z2gFhf">+</span></span>
+        <a class="WpHeLc" href="jobs/results/123">Learn more</a></li>
+      <li class="lLd3Je"><h3 class="QJPWVe">Senior Staff Engineer</h3>
+        <a class="WpHeLc" href="jobs/results/456">Learn more</a></li>
+    </ul>
+    '''
+    path = tmp_path / "page.html"
+    path.write_text(html, encoding='utf-8')
+
+    positions = parse_cards_file(str(path), default_classifier)
+
+    assert len(positions) == 1
+    assert positions[0]['location'] == 'Mountain View, CA; New York, NY; +'
+    assert positions[0]['url'] == 'https://www.google.com/about/careers/applications/jobs/results/123'
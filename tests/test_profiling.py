@@ -0,0 +1,81 @@
+import cProfile
+import pstats
+from contextlib import nullcontext
+
+from utils import profiling
+from utils.profiling import CrawlProfiler
+
+
+def test_phase_runs_unprofiled_when_another_profiler_is_active(tmp_path, monkeypatch):
+    class BusyProfile(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    profiler = CrawlProfiler(mode="all", output_dir=str(tmp_path))
+    with profiler.profile("persist", ""):
+        monkeypatch.setattr(profiling.cProfile, "Profile", BusyProfile)
+        ran = False
+        with profiler.profile("scrape", "Acme"):
+            ran = True
+        monkeypatch.undo()
+
+    assert ran
+    assert sorted(p.name for p in tmp_path.glob("*.prof")) == ["persist.prof"]
+    assert profiler.write_summary() is not None
+
+
+def _busy_work():
+    return sum(i * i for i in range(20000))
+
+
+def test_each_profiled_phase_writes_prof_and_hotspot_files(tmp_path):
+    profiler = CrawlProfiler(mode="all", output_dir=str(tmp_path), top_n=5)
+
+    with profiler.profile("scrape", "Acme Corp"):
+        _busy_work()
+    with profiler.profile("persist", ""):
+        _busy_work()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "persist.prof", "persist.txt", "scrape_Acme_Corp.prof", "scrape_Acme_Corp.txt"
+    ]
+    stats = pstats.Stats(str(tmp_path / "scrape_Acme_Corp.prof"))
+    assert any(func[2] == "_busy_work" for func in stats.stats)
+    hotspots = (tmp_path / "scrape_Acme_Corp.txt").read_text()
+    assert "cumulative" in hotspots and "_busy_work" in hotspots
+
+
+def test_write_summary_merges_profiles(tmp_path):
+    profiler = CrawlProfiler(mode="all", output_dir=str(tmp_path), top_n=5)
+    assert profiler.write_summary() is None
+
+    with profiler.profile("scrape", "Acme"):
+        _busy_work()
+    with profiler.profile("notify", ""):
+        _busy_work()
+    path = profiler.write_summary()
+
+    assert path == str(tmp_path / "summary.txt")
+    summary = (tmp_path / "summary.txt").read_text()
+    assert summary.startswith("Profiles: notify, scrape_Acme\n")
+    assert "Top 5 functions by own time" in summary
+    assert "_busy_work" in summary
+
+
+def test_disabled_phases_are_a_no_op(tmp_path, monkeypatch):
+    monkeypatch.delenv(profiling.PROFILE_ENV, raising=False)
+    output_dir = tmp_path / "profiles"
+    disabled = CrawlProfiler.from_env(output_dir=str(output_dir))
+    scrapers_only = CrawlProfiler(mode="scrapers", output_dir=str(output_dir))
+
+    ran = []
+    with disabled.profile("scrape", "Acme"):
+        ran.append("disabled")
+    with scrapers_only.profile("persist", ""):
+        ran.append("persist")
+
+    assert not disabled.enabled and scrapers_only.enabled
+    assert isinstance(disabled.profile("scrape", "Acme"), nullcontext)
+    assert ran == ["disabled", "persist"]
+    assert not output_dir.exists()
+    assert disabled.write_summary() is None and scrapers_only.write_summary() is None
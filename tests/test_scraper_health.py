@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from database.db import Database
+from services.scraper_health import ScraperHealth
+
+
+class FakeScraper:
+    company_name = "Acme"
+    request_timeout = 10.0
+    navigation_timeout = 45.0
+
+
+def test_circuit_opens_then_probes(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    health = ScraperHealth(db, failure_threshold=3, cooldown=timedelta(hours=1))
+
+    for _ in range(3):
+        assert health.allow("Acme")
+        health.record_run("Acme", items_seen=0, errors=1, stats={'last_error': 'timeout'})
+    assert not health.allow("Acme")
+    assert db.get_scraper_health("Acme")['last_error'] == 'timeout'
+
+    # Once the cooldown has passed, one half-open probe decides
+    health.cooldown = timedelta(0)
+    assert health.allow("Acme")
+    assert db.get_scraper_health("Acme")['state'] == 'half_open'
+    health.record_run("Acme", items_seen=0, errors=1)
+    assert db.get_scraper_health("Acme")['state'] == 'open'
+
+    assert health.allow("Acme")
+    health.record_run("Acme", items_seen=12, errors=0)
+    assert db.get_scraper_health("Acme")['state'] == 'closed'
+    assert db.get_scraper_health("Acme")['consecutive_failures'] == 0
+
+
+def test_timeouts_follow_observed_latency(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    health = ScraperHealth(db)
+    scraper = FakeScraper()
+
+    health.record_run("Acme", items_seen=5, errors=0, stats={'request_seconds': [1.5] * 5})
+    health.apply_timeouts(scraper)
+    assert scraper.request_timeout == 10.0  # too few samples yet
+
+    health.record_run("Acme", items_seen=5, errors=0, stats={'request_seconds': [0.8] * 19 + [2.0]})
+    health.apply_timeouts(scraper)
+    assert scraper.request_timeout == 4.5  # p95 of 1.5s, times 3
+    assert scraper.navigation_timeout == 45.0
@@ -0,0 +1,105 @@
+import importlib
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pytest
+
+from database.db import Database
+
+
+def _seed_runs(db):
+    """Acme: 20 runs of 1..20s today, two with errors. Globex: one run 3 days ago, one 60 days ago."""
+    now = datetime.now()
+    crawl_run_id = db.start_crawl_run(started_at=now)
+    for seconds in range(1, 21):
+        errors = 1 if seconds in (7, 20) else 0
+        db.save_scraper_run(crawl_run_id, "Acme", now, float(seconds), items_seen=10, items_new=seconds % 2,
+                            errors=errors, bytes_fetched=1000)
+    db.save_scraper_run(crawl_run_id, "Globex", now - timedelta(days=3), 4.0, items_seen=5, items_new=2,
+                        errors=0, bytes_fetched=500)
+    db.save_scraper_run(crawl_run_id, "Globex", now - timedelta(days=60), 99.0, items_seen=1, items_new=1,
+                        errors=3, bytes_fetched=100)
+    return crawl_run_id, now
+
+
+def test_performance_percentiles_error_rate_and_trend(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    _, now = _seed_runs(db)
+
+    performance = db.get_scraper_performance(days=30)
+    scrapers = {s['scraper']: s for s in performance['scrapers']}
+    assert sorted(scrapers) == ["Acme", "Globex"]
+
+    acme = scrapers["Acme"]
+    assert acme['runs'] == 20
+    # Nearest rank: the smallest duration whose rank is >= p * n
+    assert acme['p50_seconds'] == 10.0
+    assert acme['p90_seconds'] == 18.0
+    assert acme['p95_seconds'] == 19.0
+    assert acme['p99_seconds'] == 20.0
+    assert acme['max_seconds'] == 20.0
+    assert acme['errors'] == 2
+    assert acme['error_rate'] == pytest.approx(0.1)
+    assert acme['avg_items_seen'] == 10
+
+    # The 60-day-old run is outside the window
+    globex = scrapers["Globex"]
+    assert (globex['runs'], globex['p95_seconds'], globex['errors'], globex['error_rate']) == (1, 4.0, 0, 0)
+
+    trend = [(t['scraper'], t['day'], t['runs'], t['items_new'], t['errors']) for t in performance['trend']]
+    assert trend == [
+        ("Globex", (now - timedelta(days=3)).date().isoformat(), 1, 2, 0),
+        ("Acme", now.date().isoformat(), 20, 10, 2),
+    ]
+
+    recent = db.get_scraper_performance(days=1)
+    assert [s['scraper'] for s in recent['scrapers']] == ["Acme"]
+    assert [t['scraper'] for t in recent['trend']] == ["Acme"]
+
+
+def test_finish_crawl_run_rolls_up_scraper_totals(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    crawl_run_id, now = _seed_runs(db)
+
+    db.finish_crawl_run(crawl_run_id, finished_at=now + timedelta(seconds=90))
+
+    conn = sqlite3.connect(db.db_path)
+    row = conn.execute("""
+        SELECT duration_seconds, items_seen, items_new, errors, bytes_fetched FROM crawl_runs WHERE id = ?
+    """, (crawl_run_id,)).fetchone()
+    conn.close()
+    assert row[0] == pytest.approx(90, abs=0.01)
+    assert row[1:] == (206, 13, 5, 20600)
+
+
+def test_performance_endpoint_response_shape(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    # api.api opens internships.db in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    api_module = importlib.import_module("api.api")
+    db = Database(str(tmp_path / "test.db"))
+    _seed_runs(db)
+    monkeypatch.setattr(api_module, "db", db)
+    client = TestClient(api_module.app)
+
+    response = client.get("/crawl-runs/performance", params={"days": 7})
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(body) == ["days", "scrapers", "trend"]
+    assert body['days'] == 7
+    acme = next(s for s in body['scrapers'] if s['scraper'] == "Acme")
+    assert set(acme) == {'scraper', 'runs', 'p50_seconds', 'p90_seconds', 'p95_seconds', 'p99_seconds',
+                         'max_seconds', 'avg_items_seen', 'avg_items_new', 'errors', 'error_rate',
+                         'avg_bytes_fetched'}
+    assert (acme['p50_seconds'], acme['p95_seconds'], acme['error_rate']) == (10.0, 19.0, 0.1)
+    assert set(body['trend'][0]) == {'scraper', 'day', 'runs', 'avg_seconds', 'items_seen', 'items_new', 'errors'}
+
+    assert client.get("/crawl-runs/performance", params={"days": 0}).status_code == 422
@@ -0,0 +1,23 @@
+import random
+
+from utils import simhash
+
+
+def test_signature_tolerates_formatting_but_not_different_roles():
+    base = simhash.posting_signature('Software Engineering Intern, BS, Summer 2025')
+    same = simhash.posting_signature('software engineering intern - BS - summer 2025')
+    other = simhash.posting_signature('Data Center Technician Intern')
+
+    assert simhash.distance(base, same) <= simhash.MAX_DISTANCE
+    assert simhash.distance(base, other) > simhash.MAX_DISTANCE
+
+
+def test_close_signatures_share_a_band():
+    rng = random.Random(7)
+    for _ in range(200):
+        signature = rng.getrandbits(64)
+        near = signature
+        for bit in rng.sample(range(64), simhash.MAX_DISTANCE):
+            near ^= 1 << bit
+        assert set(enumerate(simhash.bands(signature))) & set(enumerate(simhash.bands(near)))
+        assert simhash.from_signed(simhash.to_signed(signature)) == signature
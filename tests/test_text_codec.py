@@ -0,0 +1,39 @@
+import pytest
+
+from utils.text_codec import TextCodec, train_dictionary
+
+BOILERPLATE = ("Acme is an equal opportunity employer and values diversity at our company. "
+               "We offer competitive pay, housing support and mentorship from senior engineers. ")
+
+
+def _description(n):
+    return f"Intern project {n}: build tooling for team {n % 7}. " + BOILERPLATE * 3
+
+
+def test_round_trip_keeps_short_and_legacy_values():
+    codec = TextCodec()
+    text = _description(1)
+
+    encoded = codec.encode(text)
+    assert isinstance(encoded, bytes) and len(encoded) < len(text)
+    assert codec.decode(encoded) == text
+    assert codec.encode("short") == "short"
+    assert codec.decode("plain legacy text") == "plain legacy text"
+    assert codec.decode(None) is None
+
+
+def test_trained_dictionary_shrinks_postings():
+    dictionary = train_dictionary(_description(n) for n in range(50))
+    plain, trained = TextCodec(), TextCodec({1: dictionary})
+    text = "Intern project 99: something new, with a longer summary of the work involved. " + BOILERPLATE * 2
+
+    assert len(trained.encode(text)) < len(plain.encode(text))
+    assert trained.decode(trained.encode(text)) == text
+    # Values written without a dictionary stay readable after one is trained
+    assert trained.decode(plain.encode(_description(3))) == _description(3)
+
+
+def test_unknown_dictionary_raises_key_error():
+    encoded = TextCodec({5: train_dictionary(_description(n) for n in range(10))}).encode(_description(1))
+    with pytest.raises(KeyError):
+        TextCodec().decode(encoded)
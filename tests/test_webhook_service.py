@@ -0,0 +1,100 @@
+import hmac
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from models.internship import Internship
+from services.webhook_service import SIGNATURE_HEADER, TIMESTAMP_HEADER, WebhookService, sign, url_problem
+
+pytest.importorskip("httpx")
+
+
+class ReceiverHandler(BaseHTTPRequestHandler):
+    # Set per server by _serve
+    received = None
+    fail_first = 0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        with self.server.lock:
+            self.received.append((self.path, dict(self.headers), body))
+            failing = len(self.received) <= self.fail_first
+        self.send_response(503 if failing else 204 if self.path != '/gone' else 410)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(fail_first=0):
+    handler = type('Handler', (ReceiverHandler,), {'received': [], 'fail_first': fail_first})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler.received
+
+
+def _posting(n, company="Acme", location="London, UK"):
+    return Internship(id=n, company=company, title=f"Role {n} Intern", location=location,
+                      url=f"https://example.com/jobs/{n}")
+
+
+def test_batches_are_signed_filtered_and_retried():
+    server, received = _serve(fail_first=1)
+    base = f"http://127.0.0.1:{server.server_port}"
+    webhooks = [
+        {'id': 1, 'url': f"{base}/all", 'secret': "s1", 'companies': [], 'country_code': None},
+        {'id': 2, 'url': f"{base}/uk-globex", 'secret': "s2", 'companies': ["globex"], 'country_code': "GB"},
+    ]
+    postings = [_posting(n) for n in range(5)] + [_posting(5, "Globex"), _posting(6, "Globex", "Austin, TX")]
+
+    result = WebhookService(batch_size=3, backoff=0.01, allow_private=True).deliver(webhooks, postings)
+    server.shutdown()
+    server.server_close()
+
+    # 7 postings in batches of 3 for the first webhook, one matching posting for the second
+    assert result == {'delivered': 4, 'failed': 0, 'failures': []}
+    assert len(received) == 5
+    by_path = {}
+    for path, headers, body in received[1:]:
+        secret = "s1" if path == "/all" else "s2"
+        assert hmac.compare_digest(headers[SIGNATURE_HEADER], sign(secret, headers[TIMESTAMP_HEADER], body))
+        by_path.setdefault(path, []).extend(i['id'] for i in json.loads(body)['internships'])
+    assert sorted(by_path['/all']) == list(range(7))
+    assert by_path['/uk-globex'] == [5]
+
+
+def test_client_errors_are_not_retried():
+    server, received = _serve()
+    webhooks = [{'id': 1, 'url': f"http://127.0.0.1:{server.server_port}/gone", 'secret': "s",
+                 'companies': [], 'country_code': None}]
+
+    result = WebhookService(backoff=0.01, allow_private=True).deliver(webhooks, [_posting(1)])
+    server.shutdown()
+    server.server_close()
+
+    assert result == {'delivered': 0, 'failed': 1,
+                      'failures': [{'webhook_id': 1, 'internship_ids': [1], 'error': "HTTP 410"}]}
+    assert len(received) == 1
+
+
+def test_private_targets_are_refused():
+    assert url_problem("http://127.0.0.1:8000/hook", allow_private=False)
+    assert url_problem("http://169.254.169.254/latest/meta-data", allow_private=False)
+    assert url_problem("http://[::ffff:10.0.0.1]/hook", allow_private=False)
+    assert url_problem("ftp://example.com/hook", allow_private=True)
+    assert url_problem("http://127.0.0.1:8000/hook", allow_private=True) is None
+
+    server, received = _serve()
+    webhooks = [{'id': 1, 'url': f"http://127.0.0.1:{server.server_port}/all", 'secret': "s",
+                 'companies': [], 'country_code': None}]
+
+    result = WebhookService(backoff=0.01, allow_private=False).deliver(webhooks, [_posting(1)])
+    server.shutdown()
+    server.server_close()
+
+    assert result['failed'] == 1
+    assert received == []
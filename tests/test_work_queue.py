@@ -0,0 +1,103 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from database.db import Database
+from services.crawl_pipeline import CrawlPipeline
+from services import work_queue as work_queue_module
+from services.work_queue import MAX_ATTEMPTS, CrawlWorker, RedisWorkQueue, SQLiteWorkQueue
+from tests.test_crawl_pipeline import FakeNotificationService, FakeScraper, _posting
+
+
+def test_workers_scrape_and_coordinator_persists(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    work_queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    crawl_run_id = db.start_crawl_run(started_at=datetime.now())
+    work_queue.enqueue(crawl_run_id, ["Acme", "Globex"])
+
+    # Each "host" only runs its own scrapers
+    posted = dict(_posting(1), posted_date=datetime(2024, 5, 1, 12, 0))
+    assert CrawlWorker(work_queue, [FakeScraper("Acme", [posted, _posting(2)])]).run(exit_when_idle=True) == 1
+    assert work_queue.remaining(crawl_run_id) == 1
+    assert CrawlWorker(work_queue, [FakeScraper("Globex", [_posting(3)], fail_after=0)]).run(exit_when_idle=True) == 1
+
+    notifier = FakeNotificationService()
+    pipeline = CrawlPipeline(db, notifier, flush_interval=0.1)
+    assert pipeline.run(work_queue.iter_finished(crawl_run_id, poll_interval=0.1), crawl_run_id) == 2
+    assert sorted(i.url for i in notifier.sent) == [_posting(1)['url'], _posting(2)['url']]
+    assert any(i.posted_date.year == 2024 for i in notifier.sent)
+
+    runs = {row['scraper']: row for row in db.get_scraper_performance()['scrapers']}
+    assert runs['Globex']['errors'] == 1
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def work_queue(request, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        return SQLiteWorkQueue(str(tmp_path / "queue.db"))
+
+    # The Redis queue's Lua scripts run on fakeredis' embedded Lua
+    pytest.importorskip("redis")
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    monkeypatch.setattr(work_queue_module.redis, "Redis", fakeredis.FakeRedis)
+    queue = RedisWorkQueue("redis://localhost:6379/0")
+    queue.client.flushall()
+    return queue
+
+
+def test_expired_lease_is_reclaimed(work_queue):
+    work_queue.enqueue(1, ["Acme"])
+
+    first = work_queue.claim("worker-a", ["Acme"], lease_seconds=-1)
+    second = work_queue.claim("worker-b", ["Acme"])
+    assert second.id == first.id and second.attempts == 2
+    assert work_queue.claim("worker-c", ["Acme"]) is None
+
+    # The worker that lost its lease can no longer report a result
+    assert not work_queue.complete(first.id, "worker-a", {'postings': []})
+    assert work_queue.complete(second.id, "worker-b", {'postings': []})
+    assert [job.status for job in work_queue.collect(1)] == ['done']
+    assert work_queue.remaining(1) == 0
+
+
+def test_heartbeat_keeps_the_lease_and_repeated_expiry_fails_the_job(work_queue):
+    work_queue.enqueue(1, ["Acme"])
+
+    job = work_queue.claim("worker-a", ["Acme"], lease_seconds=-1)
+    assert work_queue.heartbeat(job.id, "worker-a")
+    assert not work_queue.heartbeat(job.id, "worker-b")
+    assert work_queue.claim("worker-b", ["Acme"]) is None
+
+    # Every later claim lets the lease lapse, until the job has used all its attempts
+    assert work_queue.heartbeat(job.id, "worker-a", lease_seconds=-1)
+    for attempt in range(2, MAX_ATTEMPTS + 1):
+        job = work_queue.claim("worker-b", ["Acme"], lease_seconds=-1)
+        assert job.attempts == attempt
+    assert work_queue.claim("worker-c", ["Acme"]) is None
+    assert not work_queue.heartbeat(job.id, "worker-b")
+
+    [failed] = work_queue.collect(1)
+    assert failed.status == 'failed'
+    assert failed.error == f"lease expired {MAX_ATTEMPTS} times"
+    assert work_queue.remaining(1) == 0
+
+
+def test_cancel_fails_queued_and_leased_jobs_once(work_queue):
+    work_queue.enqueue(1, ["Acme", "Globex"])
+    job = work_queue.claim("worker-a", ["Acme"])
+
+    assert work_queue.cancel(1) == 2
+    assert work_queue.cancel(1) == 0
+    assert not work_queue.fail(job.id, "worker-a", "boom")
+    assert work_queue.claim("worker-b", ["Globex"]) is None
+
+    jobs = work_queue.collect(1)
+    assert sorted(j.scraper for j in jobs) == ["Acme", "Globex"]
+    assert {j.error for j in jobs} == {"cancelled by coordinator"}
+    assert work_queue.remaining(1) == 0
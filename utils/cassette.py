@@ -0,0 +1,176 @@
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+# CRAWLER_CASSETTE_MODE=record saves every scraper response and browser DOM snapshot to
+# a cassette per scraper; =replay serves them back without touching the network
+CASSETTE_MODE_ENV = "CRAWLER_CASSETTE_MODE"
+CASSETTE_DIR_ENV = "CRAWLER_CASSETTE_DIR"
+DEFAULT_CASSETTE_DIR = "cassettes"
+
+MODES = ('record', 'replay')
+
+# Recorded bodies are stored decoded, so these no longer describe them
+_DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+
+class Cassette:
+    """Recorded HTTP interactions and DOM snapshots of one scraper.
+
+    Stored as gzip-compressed JSON lines. Each entry is appended as its own gzip
+    member, so recording streams to disk and a partial recording is still readable.
+    Requests replay by method, URL and body hash, in recorded order; a request
+    whose body differs (tokens, timestamps) falls back to the next unused response
+    for the same method and URL.
+    """
+
+    def __init__(self, path: str, mode: str):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._started = False
+        self._http: List[Dict] = []
+        self._dom: Dict[str, str] = {}
+        if mode == 'replay':
+            self._load()
+
+    @classmethod
+    def from_env(cls, name: str, mode: Optional[str] = None, directory: Optional[str] = None) -> Optional['Cassette']:
+        """The cassette for scraper `name`, or None when recording and replay are off"""
+        mode = (mode or os.environ.get(CASSETTE_MODE_ENV, "")).lower()
+        if mode in ("", "off"):
+            return None
+        directory = directory or os.environ.get(CASSETTE_DIR_ENV) or DEFAULT_CASSETTE_DIR
+        slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'scraper'
+        return cls(os.path.join(directory, f"{slug}.jsonl.gz"), mode)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    def adapter(self, **kwargs) -> 'CassetteAdapter':
+        """Transport adapter to mount on a requests session"""
+        return CassetteAdapter(self, **kwargs)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry['type'] == 'dom':
+                    self._dom[entry['name']] = entry['html']
+                else:
+                    entry['used'] = False
+                    self._http.append(entry)
+
+    def _append(self, entry: Dict):
+        with self._lock:
+            # The first entry of a recording replaces the previous cassette
+            if not self._started:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                open(self.path, 'wb').close()
+                self._started = True
+            with gzip.open(self.path, 'ab') as f:
+                f.write((json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+
+    def record_http(self, request: requests.PreparedRequest, status: int, reason: str,
+                    headers: Dict[str, str], body: bytes):
+        try:
+            payload = {'text': body.decode('utf-8')}
+        except UnicodeDecodeError:
+            payload = {'base64': base64.b64encode(body).decode('ascii')}
+        self._append(dict(
+            payload,
+            type='http',
+            method=request.method,
+            url=request.url,
+            body_hash=_body_hash(request.body),
+            status=status,
+            reason=reason,
+            headers={k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS}
+        ))
+
+    def match(self, request: requests.PreparedRequest) -> Optional[Dict]:
+        """Next unused recorded response for a request"""
+        body_hash = _body_hash(request.body)
+        with self._lock:
+            same_url = [e for e in self._http if not e['used'] and e['method'] == request.method and e['url'] == request.url]
+            exact = [e for e in same_url if e['body_hash'] == body_hash]
+            entry = (exact or same_url or [None])[0]
+            if entry is not None:
+                entry['used'] = True
+            return entry
+
+    def record_dom(self, name: str, html: str):
+        """Save a browser page's rendered HTML under `name`"""
+        self._append({'type': 'dom', 'name': name, 'html': html})
+
+    def dom(self, name: str) -> Optional[str]:
+        return self._dom.get(name)
+
+
+def _body_hash(body) -> str:
+    if body is None:
+        return ''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha256(body).hexdigest() if isinstance(body, bytes) else ''
+
+
+def _entry_body(entry: Dict) -> bytes:
+    if 'base64' in entry:
+        return base64.b64decode(entry['base64'])
+    return entry['text'].encode('utf-8')
+
+
+class CassetteAdapter(HTTPAdapter):
+    """HTTPAdapter that records responses to, or replays them from, a Cassette.
+
+    Responses are rebuilt from the stored body in both modes, so `response.raw`
+    stays readable for streaming parsers (e.g. ijson) while recording too. A
+    replayed request with no recording raises requests.ConnectionError, which
+    scrapers already handle like a network failure.
+    """
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if self.cassette.replaying:
+            entry = self.cassette.match(request)
+            if entry is None:
+                raise requests.ConnectionError(f"No cassette entry for {request.method} {request.url}", request=request)
+            return self._build(request, entry['status'], entry['reason'], entry['headers'], _entry_body(entry))
+
+        response = super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        try:
+            body = response.content
+        finally:
+            response.close()
+        self.cassette.record_http(request, response.status_code, response.reason, dict(response.headers), body)
+        return self._build(request, response.status_code, response.reason, response.headers, body)
+
+    def _build(self, request, status: int, reason: str, headers, body: bytes) -> requests.Response:
+        headers = {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS}
+        headers['Content-Length'] = str(len(body))
+        raw = HTTPResponse(body=io.BytesIO(body), headers=headers, status=status, reason=reason,
+                           preload_content=False, decode_content=False)
+        return self.build_response(request, raw)
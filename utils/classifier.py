@@ -0,0 +1,100 @@
+import re
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Sequence
+
+# Terms that on their own mark a title as an internship
+DEFAULT_INCLUDE = ('intern', 'interns', 'internship', 'internships', 'co-op', 'co-ops', 'coop', 'coops')
+
+# Terms that only count when the title has no seniority signal ("Summer Analyst" yes,
+# "Summer Sales Manager" no)
+DEFAULT_WEAK_INCLUDE = ('summer',)
+
+# Titles about running an internship program rather than being an intern
+DEFAULT_EXCLUDE = (
+    'internship program manager',
+    'intern program manager',
+    'internship coordinator',
+    'intern coordinator',
+    'internship recruiter',
+    'intern recruiter',
+)
+
+DEFAULT_SENIORITY = (
+    'senior', 'sr', 'staff', 'principal', 'lead', 'manager', 'director', 'head',
+    'vp', 'vice president', 'architect', 'chief',
+)
+
+
+def _term_pattern(term: str) -> str:
+    # Spaces and hyphens are interchangeable ("co-op", "co op"); word boundaries keep
+    # "intern" from matching "International" or "internal"
+    parts = re.split(r'[\s-]+', term.strip())
+    return r'\b' + r'[\s-]*'.join(re.escape(part) for part in parts) + r'\b'
+
+
+def _alternation(terms: Iterable[str]) -> str:
+    # Longest first so multi-word phrases win over their prefixes
+    return '|'.join(_term_pattern(t) for t in sorted(set(terms), key=len, reverse=True))
+
+
+class InternshipClassifier:
+    """Decides whether job titles are internships using one precompiled regex.
+
+    A title is an internship if it contains an include term and no exclude phrase, or a
+    weak include term and no seniority signal.
+    """
+
+    def __init__(
+        self,
+        include: Sequence[str] = DEFAULT_INCLUDE,
+        weak_include: Sequence[str] = DEFAULT_WEAK_INCLUDE,
+        exclude: Sequence[str] = DEFAULT_EXCLUDE,
+        seniority: Sequence[str] = DEFAULT_SENIORITY
+    ):
+        groups = []
+        for name, terms in (('exclude', exclude), ('include', include),
+                            ('weak', weak_include), ('senior', seniority)):
+            if terms:
+                groups.append(f'(?P<{name}>{_alternation(terms)})')
+        self._pattern = re.compile('|'.join(groups) or r'(?!x)x', re.IGNORECASE)
+
+    def is_internship(self, title: Optional[str]) -> bool:
+        """Classify a single title"""
+        if not title:
+            return False
+        return self._decide({match.lastgroup for match in self._pattern.finditer(title)})
+
+    def classify_batch(self, titles: Sequence[Optional[str]]) -> List[bool]:
+        """Classify many titles with a single regex scan over all of them"""
+        if not titles:
+            return []
+
+        # Join into one string and map match offsets back to title indexes. The NUL
+        # separator is neither a word character nor matched by the [\s-]* between the
+        # words of a term, so no match can span two titles
+        starts = []
+        offset = 0
+        cleaned = []
+        for title in titles:
+            text = (title or '').replace('\x00', ' ')
+            starts.append(offset)
+            cleaned.append(text)
+            offset += len(text) + 1
+
+        signals = [set() for _ in titles]
+        for match in self._pattern.finditer('\x00'.join(cleaned)):
+            signals[bisect_right(starts, match.start()) - 1].add(match.lastgroup)
+
+        return [self._decide(found) for found in signals]
+
+    @staticmethod
+    def _decide(signals: set) -> bool:
+        if 'exclude' in signals:
+            return False
+        if 'include' in signals:
+            return True
+        return 'weak' in signals and 'senior' not in signals
+
+
+# Shared default instance; the pattern is compiled once per process
+default_classifier = InternshipClassifier()
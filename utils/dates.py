@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional, Union
+
+try:
+    from dateutil import parser as date_parser
+except Exception:
+    date_parser = None
+
+# Formats seen on career sites that fromisoformat/RFC 2822 don't cover, tried before dateutil
+_STRPTIME_FORMATS = (
+    '%m/%d/%Y',
+    '%b %d, %Y',
+    '%B %d, %Y',
+    '%d %b %Y',
+    '%d %B %Y',
+)
+
+# Distinct posted_date strings per crawl are few; this comfortably holds them all
+CACHE_SIZE = 4096
+
+
+def utc_now() -> datetime:
+    """Current time as a timezone-aware UTC datetime"""
+    return datetime.now(timezone.utc)
+
+
+def normalize_datetime(value: datetime) -> datetime:
+    """Convert to timezone-aware UTC; naive values are taken to be UTC already
+
+    Scraped dates without an offset ("May 1, 2024") must not shift with the crawl
+    host's timezone. Convert local naive times with astimezone() before passing them.
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def parse_date(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """Parse a scraped or stored date into a timezone-aware UTC datetime.
+
+    Strict ISO-8601 and RFC 2822 are tried first, then a few common site formats, and
+    dateutil only for anything else. Results are memoized since the same timestamps
+    repeat across jobs and rows. Returns None for empty or unparseable values.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return normalize_datetime(value)
+    return _parse_date_str(value.strip())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_date_str(value: str) -> Optional[datetime]:
+    if not value:
+        return None
+
+    parsed = _parse_fast(value)
+    if parsed is None and date_parser is not None:
+        try:
+            parsed = date_parser.parse(value)
+        except (ValueError, OverflowError):
+            parsed = None
+
+    return normalize_datetime(parsed) if parsed is not None else None
+
+
+def _parse_fast(value: str) -> Optional[datetime]:
+    # ISO-8601; fromisoformat only accepts a trailing 'Z' from Python 3.11
+    iso = value[:-1] + '+00:00' if value[-1] in 'Zz' else value
+    try:
+        return datetime.fromisoformat(iso)
+    except ValueError:
+        pass
+
+    # RFC 2822 / HTTP dates, e.g. 'Wed, 01 May 2024 12:00:00 GMT'
+    if ',' in value or value[:3].isalpha():
+        try:
+            return parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            pass
+
+    for fmt in _STRPTIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+
+    return None
@@ -0,0 +1,208 @@
+import re
+from typing import Dict, List, Optional
+
+# Offline gazetteer: country, region and city aliases -> ISO 3166-1 alpha-2 codes.
+# Names are matched after normalize(): lowercase, dots dropped, other punctuation as spaces.
+
+COUNTRIES = {
+    'AE': ['united arab emirates', 'uae'],
+    'AR': ['argentina'],
+    'AT': ['austria'],
+    'AU': ['australia'],
+    'BD': ['bangladesh'],
+    'BE': ['belgium'],
+    'BG': ['bulgaria'],
+    'BR': ['brazil', 'brasil'],
+    'CA': ['canada'],
+    'CH': ['switzerland'],
+    'CL': ['chile'],
+    'CN': ['china', 'prc', "people's republic of china"],
+    'CO': ['colombia'],
+    'CR': ['costa rica'],
+    'CZ': ['czech republic', 'czechia'],
+    'DE': ['germany', 'deutschland'],
+    'DK': ['denmark'],
+    'EE': ['estonia'],
+    'EG': ['egypt'],
+    'ES': ['spain', 'espana'],
+    'FI': ['finland'],
+    'FR': ['france'],
+    'GB': ['united kingdom', 'uk', 'great britain', 'britain', 'england', 'scotland', 'wales', 'northern ireland'],
+    'GH': ['ghana'],
+    'GR': ['greece'],
+    'HK': ['hong kong'],
+    'HU': ['hungary'],
+    'ID': ['indonesia'],
+    'IE': ['ireland', 'republic of ireland'],
+    'IL': ['israel'],
+    'IN': ['india'],
+    'IT': ['italy', 'italia'],
+    'JP': ['japan'],
+    'KE': ['kenya'],
+    'KR': ['south korea', 'korea', 'republic of korea'],
+    'LT': ['lithuania'],
+    'LU': ['luxembourg'],
+    'MX': ['mexico'],
+    'MY': ['malaysia'],
+    'NG': ['nigeria'],
+    'NL': ['netherlands', 'the netherlands', 'holland'],
+    'NO': ['norway'],
+    'NZ': ['new zealand'],
+    'PE': ['peru'],
+    'PH': ['philippines'],
+    'PK': ['pakistan'],
+    'PL': ['poland'],
+    'PT': ['portugal'],
+    'RO': ['romania'],
+    'RS': ['serbia'],
+    'SA': ['saudi arabia'],
+    'SE': ['sweden'],
+    'SG': ['singapore'],
+    'TH': ['thailand'],
+    'TR': ['turkey', 'turkiye'],
+    'TW': ['taiwan'],
+    'UA': ['ukraine'],
+    'US': ['united states', 'united states of america', 'usa', 'us', 'america'],
+    'VN': ['vietnam', 'viet nam'],
+    'ZA': ['south africa'],
+}
+
+# First-level regions written without a country ("Austin, TX", "Toronto, ON")
+REGIONS = {
+    'US': [
+        'alabama', 'al', 'alaska', 'ak', 'arizona', 'az', 'arkansas', 'ar', 'california', 'ca',
+        'colorado', 'co', 'connecticut', 'ct', 'delaware', 'de', 'district of columbia', 'dc',
+        'florida', 'fl', 'georgia', 'ga', 'hawaii', 'hi', 'idaho', 'id', 'illinois', 'il',
+        'indiana', 'in', 'iowa', 'ia', 'kansas', 'ks', 'kentucky', 'ky', 'louisiana', 'la',
+        'maine', 'me', 'maryland', 'md', 'massachusetts', 'ma', 'michigan', 'mi', 'minnesota', 'mn',
+        'mississippi', 'ms', 'missouri', 'mo', 'montana', 'mt', 'nebraska', 'ne', 'nevada', 'nv',
+        'new hampshire', 'nh', 'new jersey', 'nj', 'new mexico', 'nm', 'new york', 'ny',
+        'north carolina', 'nc', 'north dakota', 'nd', 'ohio', 'oh', 'oklahoma', 'ok', 'oregon', 'or',
+        'pennsylvania', 'pa', 'rhode island', 'ri', 'south carolina', 'sc', 'south dakota', 'sd',
+        'tennessee', 'tn', 'texas', 'tx', 'utah', 'ut', 'vermont', 'vt', 'virginia', 'va',
+        'washington', 'wa', 'west virginia', 'wv', 'wisconsin', 'wi', 'wyoming', 'wy',
+    ],
+    'CA': [
+        'alberta', 'ab', 'british columbia', 'bc', 'manitoba', 'mb', 'new brunswick', 'nb',
+        'newfoundland and labrador', 'nl', 'nova scotia', 'ns', 'ontario', 'on', 'prince edward island',
+        'pe', 'quebec', 'qc', 'saskatchewan', 'sk',
+    ],
+    'AU': ['new south wales', 'nsw', 'victoria', 'vic', 'queensland', 'qld', 'western australia'],
+    'IN': ['karnataka', 'telangana', 'maharashtra', 'tamil nadu', 'haryana', 'uttar pradesh', 'delhi'],
+}
+
+# Cities that listings often name on their own
+CITIES = {
+    'US': [
+        'new york city', 'nyc', 'san francisco', 'sf', 'seattle', 'mountain view', 'menlo park',
+        'sunnyvale', 'palo alto', 'san jose', 'cupertino', 'redmond', 'bellevue', 'austin', 'boston',
+        'cambridge ma', 'chicago', 'los angeles', 'atlanta', 'pittsburgh', 'denver', 'boulder',
+        'kirkland', 'san diego', 'raleigh', 'durham', 'ann arbor', 'miami', 'dallas', 'houston',
+        'washington dc', 'arlington', 'reston', 'salt lake city', 'portland', 'philadelphia',
+    ],
+    'CA': ['toronto', 'montreal', 'vancouver', 'waterloo', 'ottawa', 'calgary', 'kitchener'],
+    'GB': ['london', 'manchester', 'edinburgh', 'cambridge uk', 'oxford', 'bristol', 'belfast'],
+    'IE': ['dublin', 'cork'],
+    'DE': ['berlin', 'munich', 'munchen', 'hamburg', 'frankfurt'],
+    'FR': ['paris', 'grenoble'],
+    'NL': ['amsterdam', 'delft', 'eindhoven'],
+    'CH': ['zurich', 'geneva', 'lausanne'],
+    'ES': ['madrid', 'barcelona'],
+    'PL': ['warsaw', 'krakow', 'wroclaw'],
+    'SE': ['stockholm'],
+    'IL': ['tel aviv', 'haifa', 'herzliya'],
+    'IN': ['bangalore', 'bengaluru', 'hyderabad', 'pune', 'gurgaon', 'gurugram', 'mumbai', 'chennai', 'noida'],
+    'JP': ['tokyo', 'osaka'],
+    'KR': ['seoul'],
+    'CN': ['beijing', 'shanghai', 'shenzhen'],
+    'TW': ['taipei'],
+    'AU': ['sydney', 'melbourne', 'brisbane'],
+    'BR': ['sao paulo', 'belo horizonte'],
+    'MX': ['mexico city'],
+    'AE': ['dubai', 'abu dhabi'],
+}
+
+_COUNTRY_ALIASES: Dict[str, str] = {}
+_REGION_ALIASES: Dict[str, str] = {}
+_CITY_ALIASES: Dict[str, str] = {}
+
+# Separators between the locations of a multi-location posting ("A; B; +", "A | B")
+_LOCATION_SEPARATORS = re.compile(r'\s*(?:;|\||/|\bor\b|\n)\s*')
+_PUNCTUATION = re.compile(r"[^\w\s,']+")
+_SPACES = re.compile(r'\s+')
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop dots ("U.S." -> "us") and turn other punctuation into spaces"""
+    text = _PUNCTUATION.sub(' ', (text or '').lower().replace('.', ''))
+    return _SPACES.sub(' ', text).strip()
+
+
+def _build():
+    for code, names in COUNTRIES.items():
+        _COUNTRY_ALIASES[code.lower()] = code
+        for name in names:
+            _COUNTRY_ALIASES[normalize(name)] = code
+    for code, names in REGIONS.items():
+        for name in names:
+            _REGION_ALIASES.setdefault(normalize(name), code)
+    for code, names in CITIES.items():
+        for name in names:
+            _CITY_ALIASES[normalize(name)] = code
+
+
+_build()
+
+
+def country_code(name: str) -> Optional[str]:
+    """ISO code for a country name, alias or code ("USA", "united states", "us" -> "US")"""
+    return _COUNTRY_ALIASES.get(normalize(name))
+
+
+def _part_country(part: str) -> Optional[str]:
+    segments = [segment.strip() for segment in normalize(part).split(',') if segment.strip()]
+    if not segments:
+        return None
+
+    last = segments[-1]
+    if len(segments) > 1:
+        # "City, ST" / "City, Region" is the usual US/Canada form; a two-letter country
+        # code only wins if it isn't also a region abbreviation
+        if last in _REGION_ALIASES:
+            return _REGION_ALIASES[last]
+        if last in _COUNTRY_ALIASES:
+            return _COUNTRY_ALIASES[last]
+    elif last in _COUNTRY_ALIASES:
+        return _COUNTRY_ALIASES[last]
+
+    for segment in reversed(segments):
+        for aliases in (_COUNTRY_ALIASES, _CITY_ALIASES, _REGION_ALIASES):
+            # Full-name matches only; two-letter aliases are too ambiguous out of position
+            if segment in aliases and (len(segment) > 2 or aliases is _CITY_ALIASES):
+                return aliases[segment]
+
+    # Free text such as "Remote - Canada": look for a multi-letter country name inside
+    words = last.split()
+    for size in (4, 3, 2, 1):
+        for start in range(len(words) - size + 1):
+            phrase = ' '.join(words[start:start + size])
+            if len(phrase) > 2 and phrase in _COUNTRY_ALIASES:
+                return _COUNTRY_ALIASES[phrase]
+    return None
+
+
+def location_countries(location: str) -> List[str]:
+    """Distinct ISO country codes mentioned by a posting's location string.
+
+    Handles multi-location strings such as Google's "Mountain View, CA, USA; London, UK; +".
+    Unrecognized parts are skipped.
+    """
+    codes = []
+    for part in _LOCATION_SEPARATORS.split(location or ''):
+        part = part.strip().strip('+').strip()
+        if not part:
+            continue
+        code = _part_country(part)
+        if code and code not in codes:
+            codes.append(code)
+    return codes
@@ -0,0 +1,220 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+# Bucket upper bounds (seconds) - spans fast DB writes up to slow browser crawls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: Tuple, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(key) + sorted((extra or {}).items())
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """Cumulative histogram with per-label-set buckets, count, sum and max"""
+
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0, 'max': 0.0}
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['count'] += 1
+            series['sum'] += value
+            series['max'] = max(series['max'], value)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series['buckets']):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, {'le': repr(bound)})} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, {'le': '+Inf'})} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return "\n".join(lines)
+
+    def summary(self) -> list:
+        with self._lock:
+            return [
+                {
+                    'labels': dict(key),
+                    'count': series['count'],
+                    'sum': round(series['sum'], 6),
+                    'max': round(series['max'], 6),
+                }
+                for key, series in sorted(self._series.items())
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+
+class Counter:
+    """Monotonic counter with label sets"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return "\n".join(lines)
+
+    def summary(self) -> list:
+        with self._lock:
+            return [{'labels': dict(key), 'value': value} for key, value in sorted(self._values.items())]
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+
+class MetricsRegistry:
+    """Process-wide registry of crawler metrics"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str = "", buckets=DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, help_text, buckets)
+            return self._metrics[name]
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter(name, help_text)
+            return self._metrics[name]
+
+    @contextmanager
+    def timer(self, name: str, help_text: str = "", **labels):
+        """Time the enclosed block and record it in histogram `name`"""
+        histogram = self.histogram(name, help_text)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start, **labels)
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+    def summary(self) -> Dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metric.summary() for name, metric in sorted(metrics.items())}
+
+    def reset(self):
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.reset()
+
+
+# Shared registry used by the crawler, scrapers, database and API
+registry = MetricsRegistry()
+
+STAGE_SECONDS = "crawler_stage_duration_seconds"
+DB_SECONDS = "crawler_db_operation_duration_seconds"
+ITEMS_TOTAL = "crawler_items_total"
+
+
+def stage_timer(stage: str, scraper: str = ""):
+    """Time a crawl stage, optionally attributed to a scraper"""
+    return registry.timer(STAGE_SECONDS, "Time spent in each crawl stage", stage=stage, scraper=scraper)
+
+
+def db_timer(operation: str):
+    """Time a database operation"""
+    return registry.timer(DB_SECONDS, "Time spent in database operations", operation=operation)
+
+
+def db_timed(operation: str):
+    """Decorator form of db_timer for Database methods"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with db_timer(operation):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_items(scraper: str, result: str, amount: int = 1):
+    """Count postings seen/new per scraper"""
+    registry.counter(ITEMS_TOTAL, "Postings processed by the crawler").inc(amount, scraper=scraper, result=result)
+
+
+def write_run_summary(path: str, started_at: datetime, finished_at: datetime):
+    """Write the current registry as a per-run JSON summary"""
+    summary = {
+        'started_at': started_at.isoformat(),
+        'finished_at': finished_at.isoformat(),
+        'duration_seconds': (finished_at - started_at).total_seconds(),
+        'metrics': registry.summary(),
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def render_run_summary(summary: Dict) -> str:
+    """Render a per-run JSON summary (written by the crawler) as Prometheus gauges"""
+    lines = [
+        "# HELP crawler_last_run_duration_seconds Duration of the last completed crawl",
+        "# TYPE crawler_last_run_duration_seconds gauge",
+        f"crawler_last_run_duration_seconds {summary.get('duration_seconds', 0)}",
+    ]
+    for name, series_list in summary.get('metrics', {}).items():
+        gauge = f"crawler_last_run_{name.replace('crawler_', '', 1)}"
+        for series in series_list:
+            key = _label_key(series.get('labels', {}))
+            if 'value' in series:
+                lines.append(f"{gauge}{_format_labels(key)} {series['value']}")
+            else:
+                lines.append(f"{gauge}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{gauge}_count{_format_labels(key)} {series['count']}")
+                lines.append(f"{gauge}_max{_format_labels(key)} {series['max']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Iterable, Optional
+
+# CRAWLER_PARSE_WORKERS=N parses downloaded pages in N worker processes; 0 or unset
+# parses in the fetching thread
+PARSE_WORKERS_ENV = "CRAWLER_PARSE_WORKERS"
+
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+
+def _parse_file(func: Callable, path: str, args: tuple):
+    # Runs in the worker: parse the spooled payload, then drop it
+    try:
+        return func(path, *args)
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class ParsePool:
+    """Offloads CPU-bound parsing from the fetching threads to worker processes.
+
+    Fetchers spool raw payloads to temp files and only the file path (plus small
+    arguments such as selectors) is sent to a worker, which reads and parses the file
+    and returns the extracted postings. This keeps large response bodies out of the
+    pickling path and lets parsing use every core instead of contending for the GIL
+    with network I/O.
+
+    Parse functions must be importable module-level callables taking the payload path
+    as their first argument.
+    """
+
+    def __init__(self, workers: int = 0, spool_dir: Optional[str] = None):
+        self.workers = max(0, workers)
+        self._spool_root = spool_dir
+        self._spool_dir = None
+        self._executor = None
+
+    @classmethod
+    def from_env(cls, workers: Optional[int] = None):
+        """Build a pool from an explicit worker count, falling back to the environment"""
+        if workers is None:
+            value = os.environ.get(PARSE_WORKERS_ENV, "")
+            workers = int(value) if value.isdigit() else 0
+        return cls(workers)
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _ensure_started(self):
+        if self._executor is None:
+            # Spawned workers don't inherit the crawler's threads or locks the way forked ones would
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            self._spool_dir = tempfile.mkdtemp(prefix="crawler-spool-", dir=self._spool_root)
+
+    def spool(self, chunks: Iterable[bytes], suffix: str = "") -> str:
+        """Write a payload to a temp file and return its path"""
+        self._ensure_started()
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self._spool_dir)
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                if chunk:
+                    f.write(chunk)
+        return path
+
+    def spool_response(self, response, suffix: str = "") -> str:
+        """Stream a requests response body to a temp file, closing the response"""
+        try:
+            if hasattr(response, 'iter_content'):
+                return self.spool(response.iter_content(SPOOL_CHUNK_SIZE), suffix)
+            return self.spool([response.content], suffix)
+        finally:
+            close = getattr(response, 'close', None)
+            if close:
+                close()
+
+    def submit(self, func: Callable, path: str, *args) -> Future:
+        """Parse a spooled payload in a worker; the file is removed once parsed"""
+        self._ensure_started()
+        return self._executor.submit(_parse_file, func, path, args)
+
+    def parse(self, func: Callable, path: str, *args):
+        """Parse a spooled payload in a worker and wait for the result"""
+        return self.submit(func, path, *args).result()
+
+    def shutdown(self):
+        """Stop the workers and remove any payloads left in the spool directory"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._spool_dir is not None:
+            shutil.rmtree(self._spool_dir, ignore_errors=True)
+            self._spool_dir = None
@@ -0,0 +1,99 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# CRAWLER_PROFILE=scrapers profiles each scraper.scrape(); CRAWLER_PROFILE=all also
+# profiles the persistence and notification phases
+PROFILE_ENV = "CRAWLER_PROFILE"
+PROFILE_DIR_ENV = "CRAWLER_PROFILE_DIR"
+
+PHASES = {
+    'scrapers': {'scrape'},
+    'all': {'scrape', 'persist', 'notify'},
+}
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_') or 'profile'
+
+
+class CrawlProfiler:
+    """Wraps crawl phases in cProfile and writes .prof files plus top-N hotspot summaries"""
+
+    def __init__(self, mode: Optional[str] = None, output_dir: Optional[str] = None, top_n: int = 25):
+        self.phases = PHASES.get(mode or "", set())
+        self.enabled = bool(self.phases)
+        self.top_n = top_n
+        self.output_dir = output_dir or os.path.join(
+            "profiles", datetime.now().strftime("%Y%m%d-%H%M%S")
+        )
+        self._profiles = {}
+
+    @classmethod
+    def from_env(cls, mode: Optional[str] = None, output_dir: Optional[str] = None, top_n: int = 25):
+        """Build a profiler from explicit arguments, falling back to the environment"""
+        return cls(
+            mode=mode or os.environ.get(PROFILE_ENV),
+            output_dir=output_dir or os.environ.get(PROFILE_DIR_ENV),
+            top_n=top_n
+        )
+
+    def profile(self, phase: str, name: str):
+        """Context manager profiling `name` if `phase` is enabled, otherwise a no-op"""
+        if phase not in self.phases:
+            return nullcontext()
+        return self._profile(f"{phase}_{name}" if name else phase)
+
+    @contextmanager
+    def _profile(self, name: str):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # From Python 3.12 profilers share one sys.monitoring slot for all threads, so
+            # only the first of the phases running concurrently can be profiled
+            logger.warning("Not profiling %s: %s", name, e, extra={'stage': 'profile'})
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._save(_safe_name(name), profiler)
+
+    def _save(self, name: str, profiler: cProfile.Profile):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{name}.prof")
+        profiler.dump_stats(path)
+        self._profiles[name] = path
+
+        with open(os.path.join(self.output_dir, f"{name}.txt"), 'w', encoding='utf-8') as f:
+            f.write(self._hotspots(pstats.Stats(path), 'cumulative'))
+
+    def _hotspots(self, stats: pstats.Stats, sort_key: str) -> str:
+        out = io.StringIO()
+        stats.stream = out
+        stats.strip_dirs().sort_stats(sort_key).print_stats(self.top_n)
+        return out.getvalue()
+
+    def write_summary(self) -> Optional[str]:
+        """Merge all profiles of this run into a single top-N hotspot summary"""
+        if not self._profiles:
+            return None
+
+        stats = pstats.Stats(*self._profiles.values())
+        path = os.path.join(self.output_dir, "summary.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Profiles: {', '.join(sorted(self._profiles))}\n\n")
+            f.write(f"Top {self.top_n} functions by own time\n")
+            f.write(self._hotspots(stats, 'tottime'))
+        return path
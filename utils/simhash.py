@@ -0,0 +1,82 @@
+import hashlib
+import re
+from typing import Dict, List
+
+# Signatures within this many differing bits are near-duplicates
+MAX_DISTANCE = 3
+# The 64-bit signature is split into this many 16-bit bands. Two signatures within
+# MAX_DISTANCE bits must agree exactly on at least one band (pigeonhole), so an exact
+# (band, bucket) index lookup finds every candidate without scanning.
+BANDS = 4
+_BAND_BITS = 64 // BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def _features(text: str) -> Dict[str, int]:
+    # Words and word bigrams, so reordering and small edits only move a few features
+    words = _TOKEN.findall(text.lower())
+    features: Dict[str, int] = {}
+    for word in words:
+        features[word] = features.get(word, 0) + 1
+    for pair in zip(words, words[1:]):
+        key = ' '.join(pair)
+        features[key] = features.get(key, 0) + 1
+    return features
+
+
+def simhash(text: str, weighted: Dict[str, int] = None) -> int:
+    """64-bit SimHash of a text; optional extra features with their weights"""
+    features = _features(text)
+    for feature, weight in (weighted or {}).items():
+        features[feature] = features.get(feature, 0) + weight
+
+    # Sum weights per (byte position, byte value) first, then expand to bits once per
+    # distinct byte, instead of touching all 64 bits for every feature
+    lanes = [{} for _ in range(8)]
+    for feature, weight in features.items():
+        digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+        for lane, value in zip(lanes, digest):
+            lane[value] = lane.get(value, 0) + weight
+
+    totals = [0] * 64
+    for position, lane in enumerate(lanes):
+        for value, weight in lane.items():
+            for bit in range(8):
+                totals[position * 8 + bit] += weight if value >> bit & 1 else -weight
+
+    signature = 0
+    for bit, total in enumerate(totals):
+        if total > 0:
+            signature |= 1 << bit
+    return signature
+
+
+def posting_signature(title: str) -> int:
+    """Signature of a posting's normalized title, compared within one company.
+
+    Descriptions are left out: on career pages they are mostly the company's own
+    boilerplate, which made different roles of one company look alike. Location is left
+    out too, so the per-location variants of one role still group together.
+    """
+    return simhash(title)
+
+
+def bands(signature: int) -> List[int]:
+    """The signature's per-band buckets, for the (band, bucket) index"""
+    return [signature >> (band * _BAND_BITS) & _BAND_MASK for band in range(BANDS)]
+
+
+def distance(a: int, b: int) -> int:
+    """Number of differing bits"""
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count('1')
+
+
+def to_signed(signature: int) -> int:
+    """Store a 64-bit signature in SQLite's signed INTEGER"""
+    return signature - (1 << 64) if signature >= 1 << 63 else signature
+
+
+def from_signed(value: int) -> int:
+    return value & 0xFFFFFFFFFFFFFFFF
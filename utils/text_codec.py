@@ -0,0 +1,128 @@
+import logging
+import os
+import re
+import struct
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Optional, Union
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Codec for newly compressed text: 'zlib' (default) or 'zstd' (needs zstandard, on every
+# process that reads the database too). Stored values name their codec, so both can mix.
+TEXT_CODEC_ENV = "CRAWLER_TEXT_CODEC"
+
+ZLIB = 1
+ZSTD = 2
+_CODECS = {'zlib': ZLIB, 'zstd': ZSTD}
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+
+# Shorter texts stay plain: the header and codec framing eat most of the saving
+MIN_COMPRESS_CHARS = 256
+
+# zlib only looks back 32 KiB, so a larger preset dictionary would be wasted
+DICTIONARY_SIZE = 32 * 1024
+# Sentences shorter than this are cheaper to match from the text itself
+MIN_PHRASE_CHARS = 24
+
+# codec, dictionary id (0 = none)
+_HEADER = struct.Struct('>BI')
+_SENTENCES = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def train_dictionary(samples: Iterable[str], size: int = DICTIONARY_SIZE) -> bytes:
+    """Raw-content dictionary of the sentences that recur across postings.
+
+    Descriptions repeat company boilerplate (benefits, equal-opportunity statements,
+    application steps) far more than they repeat within themselves, which is what a
+    preset dictionary captures. Sentences are ranked by how many samples contain
+    them times their length; the best go last, where zlib and zstd match them
+    most cheaply. The same bytes serve as a zlib zdict and a zstd raw-content dictionary.
+    """
+    counts = Counter()
+    for sample in samples:
+        counts.update({sentence.strip() for sentence in _SENTENCES.split(sample or '')
+                       if len(sentence.strip()) >= MIN_PHRASE_CHARS})
+
+    ranked = sorted((phrase for phrase, count in counts.items() if count > 1),
+                    key=lambda phrase: counts[phrase] * len(phrase), reverse=True)
+    chosen = []
+    total = 0
+    for phrase in ranked:
+        encoded = phrase.encode('utf-8') + b'\n'
+        if total + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        total += len(encoded)
+    return b''.join(reversed(chosen))
+
+
+class TextCodec:
+    """Compresses long text fields for storage, with optional preset dictionaries.
+
+    Encoded values are bytes: a header naming the codec and dictionary id, then the
+    compressed payload. Anything else (short text, legacy rows, NULL) is stored and
+    returned as is, so plain and compressed rows can share a column.
+    """
+
+    def __init__(self, dictionaries: Optional[Dict[int, bytes]] = None, codec: Optional[str] = None):
+        self.dictionaries = dict(dictionaries or {})
+        name = (codec or os.environ.get(TEXT_CODEC_ENV) or 'zlib').lower()
+        if name not in _CODECS:
+            raise ValueError(f"Unknown text codec: {name}")
+        if name == 'zstd' and zstandard is None:
+            logger.warning("zstandard is not installed, compressing with zlib", extra={'stage': 'storage'})
+            name = 'zlib'
+        self.codec = _CODECS[name]
+
+    @property
+    def dictionary_id(self) -> int:
+        """Dictionary used for new values: the latest trained, or 0 for none"""
+        return max(self.dictionaries, default=0)
+
+    def encode(self, text: Optional[str]) -> Union[str, bytes, None]:
+        if not text or len(text) < MIN_COMPRESS_CHARS:
+            return text
+
+        raw = text.encode('utf-8')
+        dictionary_id = self.dictionary_id
+        dictionary = self.dictionaries.get(dictionary_id)
+        if self.codec == ZSTD:
+            dict_data = zstandard.ZstdCompressionDict(dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT) \
+                if dictionary else None
+            payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(raw)
+        else:
+            compressor = zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary) \
+                if dictionary else zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+            payload = compressor.compress(raw) + compressor.flush()
+
+        if _HEADER.size + len(payload) >= len(raw):
+            return text
+        return _HEADER.pack(self.codec, dictionary_id) + payload
+
+    def decode(self, value: Union[str, bytes, None]) -> Optional[str]:
+        """Text of a stored value; raises KeyError for a dictionary this codec hasn't loaded"""
+        if not isinstance(value, bytes):
+            return value
+
+        codec, dictionary_id = _HEADER.unpack_from(value)
+        dictionary = self.dictionaries[dictionary_id] if dictionary_id else None
+        payload = value[_HEADER.size:]
+        if codec == ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstandard is needed to read zstd-compressed text")
+            dict_data = zstandard.ZstdCompressionDict(dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT) \
+                if dictionary else None
+            raw = zstandard.ZstdDecompressor(dict_data=dict_data).decompress(payload)
+        else:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS, zdict=dictionary) \
+                if dictionary else zlib.decompressobj(-zlib.MAX_WBITS)
+            raw = decompressor.decompress(payload) + decompressor.flush()
+        return raw.decode('utf-8')